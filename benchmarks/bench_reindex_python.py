@@ -0,0 +1,239 @@
+"""Measures the throughput of python revisions against an in-process fake OpenSearch.
+
+Run from the repository root, e.g.:
+
+    python -m benchmarks.bench_reindex_python --docs 50000 --batch-sizes 500,2000 --concurrency 1,4
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from rich import print
+from rich.table import Table
+
+from benchmarks.fake_opensearch import FakeOpenSearch
+from opensearch_reindexer.base import BaseMigration, Config, Language, Reader
+
+SOURCE_INDEX = "benchmark-source"
+
+ENV = """import os
+
+from opensearchpy import OpenSearch
+
+VERSION_CONTROL_INDEX = "reindexer_version"
+source_client = OpenSearch(hosts=[os.environ["BENCHMARK_OPENSEARCH_URL"]], timeout=60)
+destination_client = source_client
+"""
+
+
+def _documents(count: int, size: int) -> List[dict]:
+    padding = "x" * max(size - 100, 0)
+    return [
+        {
+            "id": i,
+            "name": f"document {i}",
+            "price": i * 0.5,
+            "tags": ["a", "b", "c"],
+            "attributes": {"color": "red", "size": i % 10},
+            "description": padding,
+        }
+        for i in range(count)
+    ]
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * percentile), len(values) - 1)]
+
+
+def _peak_rss_bytes() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _run_scenario(scenario: dict) -> dict:
+    """Runs one python revision in a fresh process, so that its peak RSS is its own."""
+    latencies = []
+    transform_cost = scenario.pop("transform_cost") / 1e6
+
+    class BenchmarkMigration(BaseMigration):
+        def transform_document(self, doc):
+            if transform_cost:
+                deadline = time.perf_counter() + transform_cost
+                while time.perf_counter() < deadline:
+                    pass
+            return doc
+
+        def transform_batch_hits(self, batch):
+            batch.started_at = time.perf_counter()
+            return super().transform_batch_hits(batch)
+
+        def on_batch_indexed(self, batch, success, errors):
+            latencies.append(time.perf_counter() - batch.started_at)
+            super().on_batch_indexed(batch, success, errors)
+
+    migration = BenchmarkMigration(
+        Config(
+            source_index=SOURCE_INDEX,
+            destination_index=scenario.pop("destination_index"),
+            language=Language.python,
+            reader=Reader[scenario.pop("reader")],
+            **scenario,
+        )
+    )
+    started = time.perf_counter()
+    # the library's own output is part of the measured work, but not of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        migration.reindex()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "seconds": elapsed,
+        "batches": len(latencies),
+        "p50_batch_latency": _percentile(latencies, 0.5),
+        "p99_batch_latency": _percentile(latencies, 0.99),
+        "peak_rss_bytes": _peak_rss_bytes(),
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=20_000)
+    parser.add_argument(
+        "--doc-size", type=int, default=512, help="Approximate bytes per document."
+    )
+    parser.add_argument("--batch-sizes", default="500,2000")
+    parser.add_argument(
+        "--concurrency", default="1,4", help="Values of Config.bulk_concurrency."
+    )
+    parser.add_argument(
+        "--transform-costs",
+        default="0,50",
+        help="CPU time spent transforming each document, in microseconds.",
+    )
+    parser.add_argument("--slices", type=int, default=1)
+    parser.add_argument(
+        "--reader", choices=["scroll", "point_in_time"], default="scroll"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.002, help="Seconds added to every request."
+    )
+    parser.add_argument(
+        "--bulk-latency-per-doc",
+        type=float,
+        default=0.00001,
+        help="Seconds added to a bulk request per document.",
+    )
+    parser.add_argument(
+        "--rejection-rate",
+        type=float,
+        default=0.0,
+        help="Probability of a bulk item being rejected with HTTP 429, which is retried.",
+    )
+    parser.add_argument("--adaptive-bulk", action="store_true")
+    parser.add_argument(
+        "--json", action="store_true", help="Print one JSON object per scenario."
+    )
+    args = parser.parse_args(argv)
+
+    server = FakeOpenSearch(
+        latency=args.latency,
+        bulk_latency_per_doc=args.bulk_latency_per_doc,
+        rejection_rate=args.rejection_rate,
+    )
+    server.load(SOURCE_INDEX, _documents(args.docs, args.doc_size))
+
+    table = Table(title=f"reindex_python, {args.docs} documents")
+    for column in (
+        "batch_size",
+        "concurrency",
+        "transform µs/doc",
+        "docs/s",
+        "p50 batch",
+        "p99 batch",
+        "peak RSS",
+    ):
+        table.add_column(column, justify="right")
+
+    scenarios = itertools.product(
+        [int(v) for v in args.batch_sizes.split(",")],
+        [int(v) for v in args.concurrency.split(",")],
+        [float(v) for v in args.transform_costs.split(",")],
+    )
+    with server, tempfile.TemporaryDirectory() as directory:
+        os.makedirs(os.path.join(directory, "migrations"))
+        open(os.path.join(directory, "migrations", "__init__.py"), "w").close()
+        with open(os.path.join(directory, "migrations", "env.py"), "w") as file:
+            file.write(ENV)
+        os.environ["BENCHMARK_OPENSEARCH_URL"] = server.url
+        os.chdir(directory)
+
+        for i, (batch_size, concurrency, transform_cost) in enumerate(scenarios):
+            scenario = {
+                "destination_index": f"benchmark-destination-{i}",
+                "batch_size": batch_size,
+                "bulk_concurrency": concurrency,
+                "transform_cost": transform_cost,
+                "slices": args.slices,
+                "reader": args.reader,
+                "adaptive_bulk": args.adaptive_bulk,
+            }
+            result = _measure(scenario)
+            # keep the benchmark process, which the next scenario is forked from, from growing
+            indexed = len(server.indices.pop(scenario["destination_index"]))
+            if indexed != args.docs:
+                print(
+                    f"[bold red]Scenario {i} indexed {indexed} of {args.docs} documents[/bold red]"
+                )
+            docs_per_second = args.docs / result["seconds"]
+
+            if args.json:
+                sys.stdout.write(
+                    json.dumps(
+                        {
+                            "batch_size": batch_size,
+                            "bulk_concurrency": concurrency,
+                            "transform_cost_us": transform_cost,
+                            "docs_per_second": docs_per_second,
+                            **result,
+                        }
+                    )
+                    + "\n"
+                )
+            else:
+                table.add_row(
+                    str(batch_size),
+                    str(concurrency),
+                    f"{transform_cost:g}",
+                    f"{docs_per_second:,.0f}",
+                    f"{result['p50_batch_latency'] * 1000:.1f}ms",
+                    f"{result['p99_batch_latency'] * 1000:.1f}ms",
+                    f"{result['peak_rss_bytes'] / 2**20:.0f}MB",
+                )
+
+    if not args.json:
+        print(table)
+
+
+def _measure(scenario: dict) -> dict:
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("fork")
+    ) as executor:
+        return executor.submit(_run_scenario, scenario).result()
+
+
+if __name__ == "__main__":
+    main()
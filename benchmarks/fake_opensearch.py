@@ -0,0 +1,722 @@
+import json
+import random
+import re
+import threading
+import time
+import uuid
+import zlib
+from functools import cmp_to_key
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+DEFAULT_SETTINGS = {
+    "index.number_of_shards": "1",
+    "index.number_of_replicas": "1",
+    "index.refresh_interval": "1s",
+}
+
+
+def _nest(flat: dict) -> dict:
+    nested = {}
+    for key, value in flat.items():
+        node = nested
+        *parents, leaf = key.split(".")
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[leaf] = value
+    return nested
+
+
+# Cluster health statuses, from worst to best
+HEALTH = ["red", "yellow", "green"]
+
+
+def _field(source: dict, field: str):
+    """The value of a possibly dotted field of a document, None if it's missing."""
+    for key in field.split("."):
+        if not isinstance(source, dict):
+            return None
+        source = source.get(key)
+    return source
+
+
+def _aggregate(hits: List[dict], agg: dict) -> dict:
+    """The result of a ``max`` aggregation of ``hits``."""
+    if set(agg) != {"max"}:
+        raise ValueError(f"Unsupported aggregation {agg}")
+    values = [_field(hit["_source"], agg["max"]["field"]) for hit in hits]
+    values = [value for value in values if value is not None]
+    return {"value": max(values) if values else None}
+
+
+def _matches(source: dict, query: Optional[dict]) -> bool:
+    """Whether a document matches a ``match_all``, ``term``, ``terms``, ``range``, ``exists``, ``bool``
+    or ``function_score`` query, whose scores are ignored."""
+    if not query:
+        return True
+    ((kind, clause),) = query.items()
+    if kind == "match_all":
+        return True
+    if kind == "function_score":
+        return _matches(source, clause.get("query"))
+    if kind == "bool":
+        clauses = lambda occur: (
+            clause.get(occur, [])
+            if isinstance(clause.get(occur, []), list)
+            else [clause[occur]]
+        )
+        return (
+            all(_matches(source, q) for q in clauses("filter") + clauses("must"))
+            and not any(_matches(source, q) for q in clauses("must_not"))
+            and (
+                not clauses("should")
+                or any(_matches(source, q) for q in clauses("should"))
+            )
+        )
+    if kind == "exists":
+        return _field(source, clause["field"]) is not None
+    ((field, condition),) = clause.items()
+    value = _field(source, field)
+    if kind == "term":
+        return value == (
+            condition["value"] if isinstance(condition, dict) else condition
+        )
+    if kind == "terms":
+        return value in condition
+    if kind == "range":
+        operators = {
+            "gt": lambda a, b: a > b,
+            "gte": lambda a, b: a >= b,
+            "lt": lambda a, b: a < b,
+            "lte": lambda a, b: a <= b,
+        }
+        return value is not None and all(
+            operators[operator](value, bound)
+            for operator, bound in condition.items()
+            if operator in operators
+        )
+    raise ValueError(f'"{kind}" queries are not supported')
+
+
+def _flatten(settings: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in settings.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            key = prefix + key
+            flat[key if key.startswith("index.") else "index." + key] = str(value)
+    return flat
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # keep connections alive, like a real cluster
+    protocol_version = "HTTP/1.1"
+    server: "ThreadingHTTPServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _handle(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+
+        status, response = self.server.fake.handle(
+            self.command, unquote(url.path), params, body
+        )
+        data = b"" if response is None else json.dumps(response).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = _handle
+
+
+class FakeOpenSearch:
+    """An in-process HTTP stand-in for the part of the OpenSearch REST API used by opensearch-reindexer:
+    index, settings, alias and document APIs, ``_close``, ``_search`` with scrolls, slices, points in time
+    and ``max`` aggregations, ``_count``, ``_bulk``, ``_delete_by_query``, ``_reindex`` and ``_tasks``. Simple
+    queries are matched, see ``_matches``, mappings and scripts are ignored. Points in time are sorted by the
+    fields of documents, or by their position in the point in time for ``_shard_doc``. Bulk items of the
+    documents in ``failing`` fail with a mapping error.
+
+    Arguments:
+        latency (float): Seconds added to every request.
+        bulk_latency_per_doc (float): Seconds added to a bulk request for each of its documents.
+        rejection_rate (float): Probability of a bulk item being rejected with HTTP 429.
+        reindex_docs_per_second (float): How fast ``_reindex`` tasks copy documents.
+        seed (int): Seed of the rejections.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        bulk_latency_per_doc: float = 0.0,
+        rejection_rate: float = 0.0,
+        reindex_docs_per_second: float = 100_000.0,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.bulk_latency_per_doc = bulk_latency_per_doc
+        self.rejection_rate = rejection_rate
+        self.reindex_docs_per_second = reindex_docs_per_second
+        self.random = random.Random(seed)
+
+        self.indices: Dict[str, Dict[str, dict]] = {}
+        self.settings: Dict[str, dict] = {}
+        # scroll id -> [hits, position, size]
+        self.scrolls: Dict[str, list] = {}
+        # point in time id -> ids of the index when it was opened
+        self.pits: Dict[str, Tuple[str, List[str]]] = {}
+        self.tasks: Dict[str, dict] = {}
+        # the bodies of the _reindex requests received
+        self.reindex_requests: List[dict] = []
+        # alias -> the indices it points to
+        self.aliases: Dict[str, set] = {}
+        # indices closed by the close index API
+        self.closed: set = set()
+        # the status returned by the cluster health API
+        self.health = "green"
+        # ids of the documents whose bulk items fail with a mapping error
+        self.failing: set = set()
+        self.requests = 0
+        self.rejections = 0
+        self.lock = threading.RLock()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.daemon_threads = True
+        self.server.fake = self
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOpenSearch":
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def create_index(self, index: str, settings: Optional[dict] = None) -> None:
+        with self.lock:
+            self.indices.setdefault(index, {})
+            self.settings[index] = {**DEFAULT_SETTINGS, **_flatten(settings or {})}
+
+    def load(self, index: str, docs: List[dict]) -> None:
+        """Indexes ``docs`` into ``index`` with ids "0", "1", ..."""
+        self.create_index(index)
+        with self.lock:
+            self.indices[index].update((str(i), doc) for i, doc in enumerate(docs))
+
+    def handle(
+        self, method: str, path: str, params: dict, body: bytes
+    ) -> Tuple[int, Optional[dict]]:
+        with self.lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        for route_method, pattern, handler in self.routes:
+            match = re.fullmatch(pattern, path)
+            if match and method == route_method:
+                return handler(self, params, body, *match.groups())
+        return 400, {"error": f"{method} {path} is not supported", "status": 400}
+
+    @staticmethod
+    def _json(body: bytes) -> dict:
+        return json.loads(body) if body else {}
+
+    def _missing(self, index: str) -> Tuple[int, dict]:
+        return 404, {
+            "error": {"type": "index_not_found_exception", "index": index},
+            "status": 404,
+        }
+
+    def _info(self, params, body):
+        return 200, {"version": {"distribution": "opensearch", "number": "2.11.0"}}
+
+    def _exists(self, params, body, index):
+        return (200 if index in self.indices else 404), None
+
+    def _create(self, params, body, index):
+        if index in self.indices:
+            return 400, {
+                "error": {"type": "resource_already_exists_exception"},
+                "status": 400,
+            }
+        self.create_index(index, self._json(body).get("settings"))
+        return 200, {"acknowledged": True, "index": index}
+
+    def _delete_index(self, params, body, index):
+        with self.lock:
+            self.indices.pop(index, None)
+            self.settings.pop(index, None)
+            self.closed.discard(index)
+            for indices in self.aliases.values():
+                indices.discard(index)
+        return 200, {"acknowledged": True}
+
+    def _close(self, params, body, index):
+        if index not in self.indices:
+            return self._missing(index)
+        with self.lock:
+            self.closed.add(index)
+        return 200, {"acknowledged": True}
+
+    def _exists_alias(self, params, body, alias):
+        return (200 if self.aliases.get(alias) else 404), None
+
+    def _get_alias(self, params, body, alias):
+        indices = self.aliases.get(alias)
+        if not indices:
+            return 404, {"error": f"alias [{alias}] missing", "status": 404}
+        return 200, {index: {"aliases": {alias: {}}} for index in sorted(indices)}
+
+    def _put_alias(self, params, body, index, alias):
+        if index not in self.indices:
+            return self._missing(index)
+        with self.lock:
+            self.aliases.setdefault(alias, set()).add(index)
+        return 200, {"acknowledged": True}
+
+    def _update_aliases(self, params, body):
+        actions = [next(iter(action.items())) for action in self._json(body)["actions"]]
+        # all actions are applied at once, or none if an index is missing
+        with self.lock:
+            for _, action in actions:
+                if action["index"] not in self.indices:
+                    return self._missing(action["index"])
+            for type, action in actions:
+                indices = self.aliases.setdefault(action["alias"], set())
+                if type == "add":
+                    indices.add(action["index"])
+                else:
+                    indices.discard(action["index"])
+        return 200, {"acknowledged": True}
+
+    def _get_settings(self, params, body, index):
+        if index not in self.indices:
+            return self._missing(index)
+        settings = self.settings[index]
+        if params.get("flat_settings") != "true":
+            settings = _nest(settings)
+        return 200, {index: {"settings": settings}}
+
+    def _put_settings(self, params, body, index):
+        with self.lock:
+            self.settings[index].update(_flatten(self._json(body)))
+        return 200, {"acknowledged": True}
+
+    def _ok(self, params, body, *groups):
+        return 200, {"acknowledged": True}
+
+    def _health(self, params, body, *groups):
+        wanted = params.get("wait_for_status")
+        if wanted is None or HEALTH.index(self.health) >= HEALTH.index(wanted):
+            return 200, {"status": self.health, "timed_out": False}
+        # the health never changes while waiting
+        value, unit = re.fullmatch(
+            r"(\d+)(ms|s|m)", params.get("timeout", "30s")
+        ).groups()
+        time.sleep(int(value) * {"ms": 1e-3, "s": 1, "m": 60}[unit])
+        return 408, {"status": self.health, "timed_out": True}
+
+    def _count(self, params, body, index):
+        if index not in self.indices:
+            return self._missing(index)
+        query = self._json(body).get("query")
+        with self.lock:
+            count = sum(
+                _matches(source, query) for source in self.indices[index].values()
+            )
+        return 200, {"count": count}
+
+    def _get_doc(self, params, body, index, id):
+        source = self.indices.get(index, {}).get(id)
+        if source is None:
+            return 404, {"_index": index, "_id": id, "found": False}
+        return 200, {"_index": index, "_id": id, "found": True, "_source": source}
+
+    def _index_doc(self, params, body, index, id=None):
+        id = id or uuid.uuid4().hex
+        if index not in self.indices:
+            self.create_index(index)
+        with self.lock:
+            result = "updated" if id in self.indices[index] else "created"
+            self.indices[index][id] = self._json(body)
+        return 200, {"_index": index, "_id": id, "result": result}
+
+    def _delete_doc(self, params, body, index, id):
+        with self.lock:
+            found = self.indices.get(index, {}).pop(id, None) is not None
+        return (200 if found else 404), {"_id": id, "result": "deleted"}
+
+    def _hits(
+        self, index: str, slice_body: Optional[dict], query: Optional[dict] = None
+    ) -> List[dict]:
+        with self.lock:
+            docs = [
+                (id, source)
+                for id, source in self.indices[index].items()
+                if _matches(source, query)
+            ]
+        if slice_body is not None:
+            docs = [
+                (id, source)
+                for id, source in docs
+                if zlib.crc32(id.encode()) % slice_body["max"] == slice_body["id"]
+            ]
+        return [
+            {"_index": index, "_id": id, "_score": None, "_source": source}
+            for id, source in docs
+        ]
+
+    def _search(self, params, body, index=None):
+        request = self._json(body)
+        if "pit" in request:
+            return self._search_pit(request)
+        if index not in self.indices:
+            return self._missing(index)
+
+        size = int(params.get("size", request.get("size", 10)))
+        hits = self._hits(index, request.get("slice"), request.get("query"))
+        response = {
+            "_shards": {"total": 1, "successful": 1, "skipped": 0, "failed": 0},
+            "hits": {"total": {"value": len(hits)}, "hits": hits[:size]},
+        }
+        aggs = request.get("aggs", request.get("aggregations", {}))
+        if aggs:
+            response["aggregations"] = {
+                name: _aggregate(hits, agg) for name, agg in aggs.items()
+            }
+        if "scroll" in params:
+            scroll_id = uuid.uuid4().hex
+            with self.lock:
+                self.scrolls[scroll_id] = [hits, size, size]
+            response["_scroll_id"] = scroll_id
+        return 200, response
+
+    def _scroll(self, params, body):
+        scroll_id = self._json(body).get("scroll_id") or params.get("scroll_id")
+        with self.lock:
+            scroll = self.scrolls.get(scroll_id)
+            if scroll is None:
+                return 404, {"error": {"type": "search_context_missing_exception"}}
+            hits, position, size = scroll
+            scroll[1] = position + size
+        return 200, {
+            "_scroll_id": scroll_id,
+            "_shards": {"total": 1, "successful": 1, "skipped": 0, "failed": 0},
+            "hits": {"hits": hits[position : position + size]},
+        }
+
+    def _clear_scroll(self, params, body, scroll_id=None):
+        scroll_ids = self._json(body).get("scroll_id") or scroll_id or []
+        if isinstance(scroll_ids, str):
+            scroll_ids = scroll_ids.split(",")
+        with self.lock:
+            for scroll_id in scroll_ids:
+                self.scrolls.pop(scroll_id, None)
+        return 200, {"succeeded": True, "num_freed": len(scroll_ids)}
+
+    def _open_pit(self, params, body, index):
+        if index not in self.indices:
+            return self._missing(index)
+        pit_id = uuid.uuid4().hex
+        with self.lock:
+            self.pits[pit_id] = (index, list(self.indices[index]))
+        return 200, {"pit_id": pit_id, "creation_time": int(time.time() * 1000)}
+
+    def _delete_pit(self, params, body):
+        with self.lock:
+            for pit_id in self._json(body).get("pit_id", []):
+                self.pits.pop(pit_id, None)
+        return 200, {"pits": []}
+
+    @staticmethod
+    def _sort_key(sort: List[dict]):
+        """Orders the sort values of hits, ascending or descending per field, missing values last."""
+
+        def compare(a: list, b: list) -> int:
+            for spec, x, y in zip(sort, a, b):
+                if x == y:
+                    continue
+                if x is None or y is None:
+                    return 1 if x is None else -1
+                order = next(iter(spec.values())) if isinstance(spec, dict) else "asc"
+                if isinstance(order, dict):
+                    order = order.get("order", "asc")
+                return (1 if x > y else -1) * (-1 if order == "desc" else 1)
+            return 0
+
+        return cmp_to_key(compare)
+
+    def _search_pit(self, request: dict):
+        pit_id = request["pit"]["id"]
+        index, ids = self.pits[pit_id]
+        sort = request.get("sort") or [{"_shard_doc": "asc"}]
+        fields = [next(iter(spec)) if isinstance(spec, dict) else spec for spec in sort]
+        search_after = request.get("search_after")
+        slice_body = request.get("slice")
+        size = request.get("size", 10)
+        # in _shard_doc order pages are read straight from the point in time
+        in_order = sort == [{"_shard_doc": "asc"}]
+
+        hits = []
+        with self.lock:
+            documents = self.indices[index]
+            start = search_after[0] + 1 if in_order and search_after else 0
+            for position in range(start, len(ids)):
+                id = ids[position]
+                if slice_body is not None and (
+                    zlib.crc32(id.encode()) % slice_body["max"] != slice_body["id"]
+                ):
+                    continue
+                source = documents[id]
+                if not _matches(source, request.get("query")):
+                    continue
+                # the position of a document in the point in time stands in for its _shard_doc
+                values = [
+                    position if field == "_shard_doc" else _field(source, field)
+                    for field in fields
+                ]
+                hits.append(
+                    {"_index": index, "_id": id, "_source": source, "sort": values}
+                )
+                if in_order and len(hits) == size:
+                    break
+
+        if not in_order:
+            key = self._sort_key(sort)
+            hits.sort(key=lambda hit: key(hit["sort"]))
+            if search_after is not None:
+                after = key(search_after)
+                hits = [hit for hit in hits if key(hit["sort"]) > after]
+        return 200, {"pit_id": pit_id, "hits": {"hits": hits[:size]}}
+
+    def _bulk(self, params, body, index=None):
+        lines = body.decode().splitlines()
+        items = []
+        errors = False
+        i = 0
+        while i < len(lines):
+            action = json.loads(lines[i])
+            ((op_type, meta),) = action.items()
+            i += 1
+            source = None
+            if op_type != "delete":
+                source = json.loads(lines[i])
+                i += 1
+                if op_type == "update":
+                    source = source.get("doc", {})
+
+            target = meta.get("_index", index)
+            id = meta.get("_id") or uuid.uuid4().hex
+            if self.rejection_rate and self.random.random() < self.rejection_rate:
+                errors = True
+                self.rejections += 1
+                items.append(
+                    {
+                        op_type: {
+                            "_index": target,
+                            "_id": id,
+                            "status": 429,
+                            "error": {"type": "es_rejected_execution_exception"},
+                        }
+                    }
+                )
+                continue
+            if id in self.failing:
+                errors = True
+                items.append(
+                    {
+                        op_type: {
+                            "_index": target,
+                            "_id": id,
+                            "status": 400,
+                            "error": {"type": "mapper_parsing_exception"},
+                        }
+                    }
+                )
+                continue
+
+            with self.lock:
+                documents = self.indices.setdefault(target, {})
+                if target not in self.settings:
+                    self.settings[target] = dict(DEFAULT_SETTINGS)
+                if op_type == "create" and id in documents:
+                    status = 409
+                    errors = True
+                elif op_type == "delete":
+                    status = 200 if documents.pop(id, None) is not None else 404
+                else:
+                    status = 200 if id in documents else 201
+                    documents[id] = source
+            items.append({op_type: {"_index": target, "_id": id, "status": status}})
+
+        if self.bulk_latency_per_doc:
+            time.sleep(self.bulk_latency_per_doc * len(items))
+        return 200, {"took": 1, "errors": errors, "items": items}
+
+    def _delete_by_query(self, params, body, index):
+        if index not in self.indices:
+            return self._missing(index)
+        query = self._json(body).get("query")
+        with self.lock:
+            documents = self.indices[index]
+            deleted = [
+                id for id, source in documents.items() if _matches(source, query)
+            ]
+            for id in deleted:
+                del documents[id]
+        return 200, {"deleted": len(deleted), "failures": []}
+
+    def _reindex(self, params, body):
+        request = self._json(body)
+        self.reindex_requests.append(request)
+        # a "remote" source is read from this cluster
+        source, dest = request["source"]["index"], request["dest"]["index"]
+        if source not in self.indices:
+            return self._missing(source)
+
+        task_id = f"fake:{len(self.tasks) + 1}"
+        task = {
+            "started": time.monotonic(),
+            "status": {
+                "total": len(self.indices[source]),
+                "created": 0,
+                "updated": 0,
+                "deleted": 0,
+                "batches": 0,
+                "version_conflicts": 0,
+                "noops": 0,
+                "requests_per_second": float(params.get("requests_per_second", -1)),
+            },
+            "cancelled": False,
+            "completed": False,
+        }
+        self.tasks[task_id] = task
+        thread = threading.Thread(
+            target=self._run_reindex, args=(task, source, dest), daemon=True
+        )
+        thread.start()
+        if params.get("wait_for_completion") == "false":
+            return 200, {"task": task_id}
+        thread.join()
+        return 200, task["response"]
+
+    def _run_reindex(self, task: dict, source: str, dest: str) -> None:
+        if dest not in self.indices:
+            self.create_index(dest)
+        with self.lock:
+            documents = list(self.indices[source].items())
+        status = task["status"]
+        for start in range(0, len(documents), 1000):
+            if task["cancelled"]:
+                break
+            batch = documents[start : start + 1000]
+            time.sleep(len(batch) / self.reindex_docs_per_second)
+            with self.lock:
+                for id, doc in batch:
+                    key = "updated" if id in self.indices[dest] else "created"
+                    self.indices[dest][id] = doc
+                    status[key] += 1
+            status["batches"] += 1
+
+        task["response"] = {
+            "took": int((time.monotonic() - task["started"]) * 1000),
+            "timed_out": False,
+            **status,
+            "failures": [],
+        }
+        task["completed"] = True
+
+    def _get_task(self, params, body, task_id):
+        task = self.tasks.get(task_id)
+        if task is None:
+            return 404, {"error": {"type": "resource_not_found_exception"}}
+        response = {
+            "completed": task["completed"],
+            "task": {
+                "id": task_id,
+                "action": "indices:data/write/reindex",
+                "status": dict(task["status"]),
+                "running_time_in_nanos": int(
+                    (time.monotonic() - task["started"]) * 1e9
+                ),
+                "cancellable": True,
+            },
+        }
+        if task["completed"]:
+            response["response"] = task["response"]
+        return 200, response
+
+    def _cancel_task(self, params, body, task_id):
+        if task_id in self.tasks:
+            self.tasks[task_id]["cancelled"] = True
+        return 200, {"nodes": {}}
+
+    def _rethrottle(self, params, body, task_id):
+        if task_id in self.tasks:
+            self.tasks[task_id]["status"]["requests_per_second"] = float(
+                params["requests_per_second"]
+            )
+        return 200, {"nodes": {}}
+
+    routes = [
+        ("GET", r"/", _info),
+        ("POST", r"/_bulk", _bulk),
+        ("POST", r"/_reindex", _reindex),
+        ("POST", r"/_reindex/([^/]+)/_rethrottle", _rethrottle),
+        ("GET", r"/_tasks/([^/]+)", _get_task),
+        ("POST", r"/_tasks/([^/]+)/_cancel", _cancel_task),
+        ("GET", r"/_cluster/health(?:/[^/]+)?", _health),
+        ("POST", r"/_search", _search),
+        ("GET", r"/_search", _search),
+        ("POST", r"/_search/scroll", _scroll),
+        ("GET", r"/_search/scroll", _scroll),
+        ("DELETE", r"/_search/scroll", _clear_scroll),
+        ("DELETE", r"/_search/scroll/([^/]+)", _clear_scroll),
+        ("DELETE", r"/_search/point_in_time", _delete_pit),
+        ("HEAD", r"/_alias/([^/]+)", _exists_alias),
+        ("GET", r"/_alias/([^/]+)", _get_alias),
+        ("POST", r"/_aliases", _update_aliases),
+        ("HEAD", r"/([^/_][^/]*)", _exists),
+        ("PUT", r"/([^/_][^/]*)", _create),
+        ("DELETE", r"/([^/_][^/]*)", _delete_index),
+        ("GET", r"/([^/]+)/_settings(?:/[^/]+)?", _get_settings),
+        ("PUT", r"/([^/]+)/_settings", _put_settings),
+        ("POST", r"/([^/]+)/_refresh", _ok),
+        ("POST", r"/([^/]+)/_close", _close),
+        ("PUT", r"/([^/]+)/_alias/([^/]+)", _put_alias),
+        ("GET", r"/([^/]+)/_count", _count),
+        ("POST", r"/([^/]+)/_count", _count),
+        ("POST", r"/([^/]+)/_delete_by_query", _delete_by_query),
+        ("POST", r"/([^/]+)/_search/point_in_time", _open_pit),
+        ("POST", r"/([^/]+)/_search", _search),
+        ("GET", r"/([^/]+)/_search", _search),
+        ("POST", r"/([^/]+)/_bulk", _bulk),
+        ("PUT", r"/([^/]+)/_bulk", _bulk),
+        ("GET", r"/([^/]+)/_doc/([^/]+)", _get_doc),
+        ("PUT", r"/([^/]+)/_doc/([^/]+)", _index_doc),
+        ("POST", r"/([^/]+)/_doc/([^/]+)", _index_doc),
+        ("POST", r"/([^/]+)/_doc", _index_doc),
+        ("DELETE", r"/([^/]+)/_doc/([^/]+)", _delete_doc),
+    ]
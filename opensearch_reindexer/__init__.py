@@ -5,6 +5,7 @@ import typer
 from rich import print
 
 from opensearch_reindexer.base import BaseMigration, Language
+from opensearch_reindexer.progress import ProgressMode
 
 app = typer.Typer()
 
@@ -104,6 +105,20 @@ source_client = OpenSearch(
 )
 
 destination_client = source_client
+
+# Optionally, define async clients to run python revisions with "use_async=True".
+# Requires "pip install opensearch-py[async]".
+# from opensearchpy import AsyncOpenSearch
+#
+# async_source_client = AsyncOpenSearch(
+#     hosts=[{"host": OPENSEARCH_HOST, "port": OPENSEARCH_PORT}],
+#     http_compress=True,
+#     http_auth=(OPENSEARCH_USERNAME, OPENSEARCH_PASSWORD),
+#     use_ssl=OPENSEARCH_USE_SSL,
+#     verify_certs=OPENSEARCH_VERIFY_CERTS,
+#     ssl_show_warn=False,
+# )
+# async_destination_client = async_source_client
     """
     )
 
@@ -178,13 +193,90 @@ def list():
         print(rev)
 
 
-@app.command()
-def run():
+def run(
+    resume: bool = False,
+    concurrency: int = 1,
+    progress: ProgressMode = ProgressMode.bar,
+):
     """
     Runs 0 or many migrations returned by `BaseMigration().get_revisions_to_execute()
     """
     verify_reindexer_init_execution()
-    BaseMigration().handle_migration()
+    BaseMigration().handle_migration(
+        resume=resume, concurrency=concurrency, progress=progress
+    )
+
+
+@app.command("run")
+def run_command(
+    resume: bool = typer.Option(
+        False,
+        help="Continue a failed python revision from its last checkpoint.",
+    ),
+    concurrency: int = typer.Option(
+        1,
+        min=1,
+        help="Number of independent revisions to run at the same time.",
+    ),
+    progress: ProgressMode = typer.Option(
+        ProgressMode.bar.value,
+        help="How the progress of python revisions is shown. Use json or quiet for CI logs.",
+    ),
+):
+    """
+    Runs 0 or many migrations returned by `BaseMigration().get_revisions_to_execute()
+    """
+    # typer's defaults are OptionInfo objects, so the command is kept apart from run, which is also
+    # called from python
+    run(resume=resume, concurrency=concurrency, progress=progress)
+
+
+@app.command()
+def rethrottle(
+    requests_per_second: float = typer.Option(
+        ...,
+        help="The new throttle of running painless revisions, -1 removes it.",
+    ),
+):
+    """
+    Changes the throttle of the reindex tasks of running painless revisions.
+    """
+    verify_reindexer_init_execution()
+    from opensearch_reindexer.db import dynamically_import_migrations
+    from opensearch_reindexer.task import stored_tasks
+
+    (
+        source_client,
+        destination_client,
+        version_control_index,
+    ) = dynamically_import_migrations()
+    tasks = stored_tasks(source_client, version_control_index)
+    if len(tasks) == 0:
+        print("No painless revision is running.")
+        exit(1)
+
+    for version, task in tasks.items():
+        client = destination_client if task.get("remote") else source_client
+        client.reindex_rethrottle(
+            task_id=task["task"], requests_per_second=requests_per_second
+        )
+        print(
+            f"Revision {version}: reindex task {task['task']} throttled to {requests_per_second} requests per second"
+        )
+
+
+@app.command()
+def replay_dead_letter(
+    version: int = typer.Argument(
+        ...,
+        help="The version of the python revision whose documents are replayed.",
+    ),
+):
+    """
+    Transforms and indexes again the documents a python revision set aside in its "dead_letter".
+    """
+    verify_reindexer_init_execution()
+    BaseMigration().handle_replay_dead_letter(version)
 
 
 def verify_reindexer_init_execution():
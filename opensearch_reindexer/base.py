@@ -1,14 +1,56 @@
+import asyncio
+import inspect
+import json
+import multiprocessing
 import os
+import pickle
 import re
 import shutil
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional
+from fnmatch import fnmatch
+from functools import cached_property, partial
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 import opensearchpy.exceptions
 from opensearchpy import OpenSearch
-from opensearchpy.helpers import bulk
 from rich import print
+from rich.progress import Progress
+
+from opensearch_reindexer.checkpoint import Checkpoint
+from opensearch_reindexer.columnar import (
+    arrow_to_hits,
+    columns_to_hits,
+    hits_to_arrow,
+    hits_to_columns,
+)
+from opensearch_reindexer.dead_letter import DeadLetter, DeadLetterFile, DeadLetterIndex
+from opensearch_reindexer.delta import (
+    SEQ_NO,
+    Mark,
+    Watermark,
+    delete_watermark,
+    store_watermark,
+    stored_watermark,
+)
+from opensearch_reindexer.helper import (
+    create_or_update_alias,
+    increment_index,
+    remote_source,
+)
+from opensearch_reindexer.pipeline import Batch, Pipeline
+from opensearch_reindexer.process_pool import TransformPool
+from opensearch_reindexer.progress import ProgressMode, ReindexProgress, create_display
+from opensearch_reindexer.reader import point_in_time_hits, scroll_hits
+from opensearch_reindexer.retry import Retry
+from opensearch_reindexer.task import ReindexTask
+from opensearch_reindexer.transforms import compile_transforms, to_painless
+from opensearch_reindexer.verify import StreamingHash, canonical, hash_pages
+from opensearch_reindexer.writer import AdaptiveBatchSize, BulkWriter
 
 
 class Language(Enum):
@@ -16,6 +58,63 @@ class Language(Enum):
     painless = "painless"
 
 
+class Reader(Enum):
+    # read the source index with the scroll API
+    scroll = "scroll"
+    # read the source index with a point in time and search_after
+    point_in_time = "point_in_time"
+
+
+class OpType(Enum):
+    # create or replace documents
+    index = "index"
+    # create documents, fail if they already exist
+    create = "create"
+    # merge into existing documents, create them if they don't exist (upsert)
+    update = "update"
+
+
+class TableFormat(Enum):
+    # a dict of column name to list of values
+    columns = "columns"
+    # a pyarrow.Table, requires pyarrow to be installed
+    arrow = "arrow"
+
+
+class RefreshPolicy(Enum):
+    # refresh the destination index on every bulk request and wait for it to complete
+    batch = "batch"
+    # refresh the destination index once after the last batch has been indexed
+    revision = "revision"
+    # never refresh, documents become visible on the index's refresh_interval
+    none = "none"
+
+
+class Verification(Enum):
+    # compare the _count of the source and destination index
+    count = "count"
+    # compare random source documents, transformed, with the destination documents of the same _id
+    sample = "sample"
+    # compare a hash of every transformed source document with a hash of every destination document
+    full = "full"
+
+
+class OldIndexPolicy(Enum):
+    # leave the index the alias pointed to before a cutover as it is
+    keep = "keep"
+    # close it, it can be reopened to roll back
+    close = "close"
+    # delete it
+    delete = "delete"
+
+
+class DeadLetterTarget(Enum):
+    # a local file, one JSON object per line
+    file = "file"
+    # an index on the destination cluster
+    index = "index"
+
+
 @dataclass
 class Config:
     source_index: str = None
@@ -24,6 +123,198 @@ class Config:
     destination_index_body: Optional[dict] = None
     language: Language = Language.painless
     reindex_body: dict = None
+    # number of slices to reindex concurrently, with sliced scrolls in python revisions and
+    # as sub-tasks of the reindex in painless revisions. "auto" uses the number of primary
+    # shards of the source index.
+    slices: Union[int, str] = 1
+    # number of batches that may wait between the read, transform and write stages
+    # of python revisions. Bounds memory use to roughly 2 * queue_size batches.
+    queue_size: int = 2
+    # how python revisions read the source index. Reader.point_in_time doesn't hold a
+    # scroll context on the source cluster and can resume from the last hit read.
+    reader: Reader = Reader.scroll
+    # how long the scroll context or point in time is kept alive between two reads
+    keep_alive: str = "2m"
+    # keep the _id and _routing of source documents in python revisions, which makes
+    # indexing a batch again idempotent
+    preserve_ids: bool = True
+    # the bulk operation python revisions write documents with
+    op_type: OpType = OpType.index
+    # when documents indexed by python revisions are made visible to search
+    refresh_policy: RefreshPolicy = RefreshPolicy.revision
+    # disable refreshes and replicas on the destination index while it is loaded.
+    # They are restored once the revision has finished, even if it failed.
+    bulk_load: bool = False
+    # how long to wait for the destination index to become green after bulk loading
+    bulk_load_timeout: str = "5m"
+    # number of bulk requests python revisions send to the destination cluster concurrently
+    bulk_concurrency: int = 1
+    # maximum size in bytes of the bulk requests in flight when bulk_concurrency > 1
+    bulk_max_bytes_in_flight: int = 100 * 1024 * 1024
+    # send the documents of python revisions in bulk requests whose size in bytes adapts to the
+    # destination cluster's latency and rejections, up to bulk_max_bytes. Large batches are split
+    # and small batches are combined.
+    adaptive_bulk: bool = False
+    bulk_max_bytes: int = 10 * 1024 * 1024
+    # desired duration in seconds of a bulk request in adaptive mode
+    bulk_target_latency: float = 1.0
+    # how many times python revisions send bulk requests, documents and searches that failed with
+    # a transient error (429, 502, 503, 504 or a lost connection) again, with exponential backoff
+    # and jitter starting at retry_backoff seconds
+    max_retries: int = 8
+    retry_backoff: float = 0.5
+    # where documents that python revisions fail to transform or index are set aside instead of
+    # failing the revision: the path of a file, or the name of an index on the destination cluster
+    # with DeadLetterTarget.index. Replay them with "reindexer replay-dead-letter".
+    dead_letter: Optional[str] = None
+    dead_letter_target: DeadLetterTarget = DeadLetterTarget.file
+    # store the progress of python revisions so that "reindexer run --resume" can continue
+    # a failed revision where it stopped. Requires Reader.point_in_time and checkpoint_sort.
+    checkpoint: bool = False
+    # the sort the source index is read in when checkpointing, e.g.
+    # [{"created_at": "asc"}, {"order_id": "asc"}]. Its fields must not change while the revision
+    # runs and must be unique together, so that a checkpoint's sort values locate the same
+    # document in the point in time of a resumed read. "_shard_doc" values are only meaningful
+    # within the point in time they were read from.
+    checkpoint_sort: Optional[List[dict]] = None
+    # minimum number of seconds between two checkpoints
+    checkpoint_interval: float = 10.0
+    # transform batches of python revisions as tables with transform_columns instead of
+    # one document at a time with transform_document
+    columnar: Optional[TableFormat] = None
+    # number of worker processes that run transform_batch in python revisions, in chunks of
+    # transform_chunk_size documents. 0 transforms documents in the reindexer's own process.
+    transform_processes: int = 0
+    transform_chunk_size: int = 100
+    # run python revisions on a single event loop with the async_source_client and
+    # async_destination_client from env.py. bulk_concurrency bulk requests share the loop.
+    use_async: bool = False
+    # declarative field operations from opensearch_reindexer.transforms applied to every
+    # document. Python revisions compile them once, painless revisions run them as the
+    # reindex script.
+    transforms: Optional[list] = None
+    # throttle of the reindex of painless revisions, in sub-requests per second. None or -1
+    # disables it. Change it during a run with "reindexer rethrottle".
+    requests_per_second: Optional[float] = None
+    # run painless revisions on the destination cluster, reading the source index with reindex
+    # from remote through the source_client's host, credentials and timeout
+    remote: bool = False
+    # versions of the revisions that must complete before this one starts when revisions run
+    # concurrently. None depends on every earlier revision that uses the same indices.
+    depends_on: Optional[List[int]] = None
+    # MetricsObserver instances, e.g. from opensearch_reindexer.metrics, that receive the
+    # timings of each stage of python revisions and the throughput of every revision
+    metrics: Optional[list] = None
+    # number of seconds between two polls of the reindex task of painless revisions
+    task_poll_interval: float = 5.0
+    # after the full reindex, copy the documents whose delta_field changed since the previous
+    # pass again, until a pass copies at most delta_max_lag documents or after delta_max_passes
+    # passes. "_seq_no" tracks the changes of each shard of the source index, python revisions only.
+    delta_field: Optional[str] = None
+    delta_max_lag: int = 1000
+    delta_max_passes: int = 10
+    # an alias pointed at the destination index, and no other index, once the revision completes
+    alias: Optional[str] = None
+    # blue/green cutover of alias: the revision reads the index alias points to (or source_index
+    # if it doesn't exist yet) and writes to a new index named by helper.increment_index, e.g.
+    # "orders-3" to "orders-4", created with destination_index_body and bulk loaded. The alias is
+    # swapped once the new index has been verified.
+    cutover: bool = False
+    # what is done with the index alias pointed to before a cutover, cutover_grace_period seconds
+    # after the swap
+    cutover_old_index: OldIndexPolicy = OldIndexPolicy.keep
+    cutover_grace_period: float = 0.0
+    # compare the destination index with the source index once the revision has completed, applying
+    # the revision's transform to source documents. None skips it, cutovers use Verification.count.
+    verify: Optional[Verification] = None
+    # number of random documents compared by Verification.sample
+    verify_sample_size: int = 1000
+    # fail the revision when the indices differ, otherwise only print a warning
+    verify_fail_on_mismatch: bool = True
+
+
+# Settings overridden on the destination index while a revision is bulk loading
+BULK_LOAD_SETTINGS = {
+    "index.refresh_interval": "-1",
+    "index.number_of_replicas": "0",
+}
+
+
+# Seconds per unit of OpenSearch time values, e.g. "5m"
+TIME_UNITS = {
+    "d": 86400.0,
+    "h": 3600.0,
+    "m": 60.0,
+    "s": 1.0,
+    "ms": 1e-3,
+    "micros": 1e-6,
+    "nanos": 1e-9,
+}
+
+
+def _time_seconds(value: str) -> float:
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([a-z]+)", value.strip())
+    if match is None or match.group(2) not in TIME_UNITS:
+        raise ValueError(f'Invalid time value "{value}", e.g. "5m"')
+    return float(match.group(1)) * TIME_UNITS[match.group(2)]
+
+
+def _flatten_settings(settings: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in settings.items():
+        key = prefix + key
+        if isinstance(value, dict):
+            flat.update(_flatten_settings(value, key + "."))
+        else:
+            flat[key if key.startswith("index.") else "index." + key] = value
+    return flat
+
+
+def _index_names(config: Config) -> List[str]:
+    names = []
+    for index in (config.source_index, config.destination_index, config.alias):
+        if isinstance(index, list):
+            # e.g. the "source" "index" of a painless revision's reindex_body
+            names += index
+        elif index is not None:
+            names += index.split(",")
+    return names
+
+
+def revision_dependencies(migrations: List["BaseMigration"]) -> Dict[int, set]:
+    """
+    Returns the versions of the revisions each revision must wait for. Revisions that set
+    ``Config.depends_on`` wait for those revisions only. Otherwise a revision depends on every
+    earlier revision that reads or writes one of the indices it reads or writes. Index patterns are
+    matched with wildcards, aliases are not resolved.
+
+    Arguments:
+        migrations (List[BaseMigration]): The revisions to run, in order.
+
+    Returns:
+        Dict[int, set]: The versions of the revisions each revision depends on, by version.
+    """
+    versions = {m.version for m in migrations}
+    dependencies = {}
+    for i, migration in enumerate(migrations):
+        if migration.config.depends_on is not None:
+            # revisions that have already been run don't need to be waited for
+            dependencies[migration.version] = (
+                set(migration.config.depends_on) & versions
+            )
+            continue
+
+        names = _index_names(migration.config)
+        dependencies[migration.version] = {
+            earlier.version
+            for earlier in migrations[:i]
+            if any(
+                fnmatch(a, b) or fnmatch(b, a)
+                for a in names
+                for b in _index_names(earlier.config)
+            )
+        }
+    return dependencies
 
 
 class BaseMigration:
@@ -44,10 +335,47 @@ class BaseMigration:
         self.source_client: OpenSearch = source_client
         self.destination_client: OpenSearch = destination_client
         self.version_control_index: str = version_control_index
+        # settings to restore on the destination index once bulk loading has finished
+        self.bulk_load_restore_settings: Optional[dict] = None
+        # the version of the revision being run, set by handle_migration
+        self.version: Optional[int] = None
+        # whether to continue from the revision's last checkpoint
+        self.resume: bool = False
+        self.checkpoint: Optional[Checkpoint] = None
+        # the checkpoint advanced by the batches being indexed, None during delta passes
+        self.batch_checkpoint: Optional[Checkpoint] = None
+        # how the progress of python revisions is shown, set by handle_migration
+        self.progress_mode: ProgressMode = ProgressMode.bar
+        self.progress: Optional[ReindexProgress] = None
+        # the live display shared by revisions that run at once, set by handle_migration
+        self.progress_display: Optional[Progress] = None
+        # where documents that fail are set aside, see Config.dead_letter
+        self.dead_letter: Optional[DeadLetter] = None
+        # the index the alias pointed to before a cutover, set by prepare_cutover
+        self.old_index: Optional[str] = None
+        self.transform_pool: Optional[TransformPool] = None
+        # set to stop the revision when it runs on another thread than the one Ctrl-C interrupts
+        self.interrupted = threading.Event()
+        # source documents python revisions didn't write, because their transform skipped them or
+        # they were set aside. By _id when documents keep it, so that documents left out by several
+        # passes are counted once, otherwise only counted. See record_left_out.
+        self.left_out_ids: set = set()
+        self.left_out_count = 0
+        self._left_out_lock = threading.Lock()
 
         if config and config.language == Language.painless:
             config.source_index = config.reindex_body["source"]["index"]
             config.destination_index = config.reindex_body["dest"]["index"]
+            if config.transforms:
+                if "script" in config.reindex_body:
+                    print(
+                        '[bold red]"transforms" can\'t be combined with a "script" in "reindex_body"[/bold red]'
+                    )
+                    exit(1)
+                config.reindex_body = {
+                    **config.reindex_body,
+                    "script": to_painless(config.transforms),
+                }
 
     def on_setup(self):
         pass
@@ -147,11 +475,35 @@ class BaseMigration:
             )
             exit(1)
 
+    @cached_property
+    def field_transform(self):
+        # compiled lazily, so that it also exists in transform worker processes
+        if not self.config.transforms:
+            return None
+        return compile_transforms(self.config.transforms)
+
     def transform_document(self, doc):
-        # by default, don't transform'
+        # by default, only apply config.transforms
+        if self.field_transform is not None:
+            return self.field_transform(doc)
         return doc
 
     def reindex(self):
+        if self.config.cutover:
+            self.prepare_cutover()
+
+        if self.config.remote:
+            if self.config.language != Language.painless:
+                print(
+                    '[bold red]"remote" is only supported by painless revisions[/bold red]'
+                )
+                exit(1)
+            if self.config.slices != 1:
+                print(
+                    '[bold red]"slices" is not supported when reindexing from "remote"[/bold red]'
+                )
+                exit(1)
+
         # Exit if source_index doesn't exist'
         if (
             self.config.source_index is not None
@@ -163,13 +515,15 @@ class BaseMigration:
             exit(1)
 
         # If the destination index does not exist, create it with the desired mappings
-        if not self.source_client.indices.exists(index=self.config.destination_index):
+        if not self.destination_index_client.indices.exists(
+            index=self.config.destination_index
+        ):
             print(
                 "Destination index "
                 + self.config.destination_index
                 + " doesn't exist. Creating it..."
             )
-            self.source_client.indices.create(
+            self.destination_index_client.indices.create(
                 index=self.config.destination_index,
                 body=self.config.destination_index_body,
             )
@@ -178,75 +532,1305 @@ class BaseMigration:
             print("Source index was None, skipping reindexing")
             return
 
+        watermark, mark = None, None
+        if self.config.delta_field:
+            watermark = self.create_watermark()
+            mark = self.load_watermark(watermark)
+
+        if self.config.bulk_load:
+            self.enable_bulk_load()
+
         if self.config.language == Language.painless:
             self.reindex_painless()
         else:
             self.reindex_python()
+        if watermark is not None:
+            self.reindex_delta(watermark, mark)
         print(
             f'Reindex from "{self.config.source_index}" to "{self.config.destination_index}" complete'
         )
 
-    def reindex_painless(self):
-        try:
-            response = self.source_client.reindex(
-                body=self.config.reindex_body,
-                refresh=True,
-            )
-            print(response)
-        except opensearchpy.exceptions.RequestError as e:
-            print(e)
-            raise e
-
-    def reindex_python(self):
-        # Init scroll by search
-        data = self.source_client.search(
+    def prepare_cutover(self):
+        """
+        Reads the index ``Config.alias`` points to, or ``source_index`` if the alias doesn't exist yet,
+        and writes to the next index as named by ``increment_index``, in bulk load mode.
+        """
+        alias = self.config.alias
+        if not alias:
+            print('[bold red]"cutover" requires "alias" to be set[/bold red]')
+            exit(1)
+
+        client = self.destination_index_client
+        if client.indices.exists_alias(name=alias):
+            indices = list(client.indices.get_alias(name=alias))
+            if len(indices) != 1:
+                print(
+                    f'[bold red]Alias "{alias}" must point to a single index for a cutover, got {", ".join(indices)}[/bold red]'
+                )
+                exit(1)
+            self.old_index = indices[0]
+        elif self.config.source_index:
+            self.old_index = self.config.source_index
+        else:
+            print(
+                f'[bold red]Alias "{alias}" doesn\'t exist, set "source_index" to the index to cut over from[/bold red]'
+            )
+            exit(1)
+
+        self.config.source_index = self.old_index
+        self.config.destination_index = increment_index(self.old_index)
+        if self.config.language == Language.painless:
+            self.config.reindex_body = {
+                **self.config.reindex_body,
+                "source": {
+                    **self.config.reindex_body["source"],
+                    "index": self.old_index,
+                },
+                "dest": {
+                    **self.config.reindex_body["dest"],
+                    "index": self.config.destination_index,
+                },
+            }
+        self.config.bulk_load = True
+        print(
+            f'Cutting "{alias}" over from "{self.old_index}" to "{self.config.destination_index}"'
+        )
+
+    def verify(self):
+        """
+        Compares the destination index with the source index, see ``Config.verify``. Exits on a mismatch
+        unless ``verify_fail_on_mismatch`` is disabled.
+        """
+        mode = self.config.verify
+        if mode is None and self.config.cutover:
+            mode = Verification.count
+        if mode is None:
+            return
+
+        source_index = self.config.source_index
+        destination_index = self.config.destination_index
+        print(
+            f'Verifying "{destination_index}" against "{source_index}" ({mode.value})'
+        )
+        self.destination_index_client.indices.refresh(index=destination_index)
+        # painless revisions may only reindex the documents matching a query
+        source_query = None
+        if self.config.language == Language.painless:
+            source_query = self.config.reindex_body["source"].get("query")
+        transform = self.verification_transform()
+        include_ids = (
+            self.config.language == Language.painless or self.config.preserve_ids
+        )
+
+        mismatch = None
+        if mode != Verification.count and transform is None:
+            print(
+                '[bold yellow]The "script" of "reindex_body" can\'t be applied to source documents, comparing counts only[/bold yellow]'
+            )
+            mode = Verification.count
+        if mode == Verification.count:
+            body = None if source_query is None else {"query": source_query}
+            source = self.source_client.count(index=source_index, body=body)["count"]
+            destination = self.destination_index_client.count(index=destination_index)[
+                "count"
+            ]
+            left_out = len(self.left_out_ids) + self.left_out_count
+            if left_out:
+                print(
+                    f'{left_out} documents of "{source_index}" were skipped or set aside by the revision'
+                )
+            if source - left_out != destination:
+                mismatch = f'"{destination_index}" has {destination} documents, "{source_index}" has {source}'
+                if left_out:
+                    mismatch += f" of which {left_out} were left out"
+        elif mode == Verification.sample:
+            if not include_ids:
+                print(
+                    f'[bold red]{Verification.sample} requires "preserve_ids"[/bold red]'
+                )
+                exit(1)
+            sampled, different = self.verify_sample(transform, source_query)
+            if different:
+                mismatch = f"{len(different)} of {sampled} sampled documents differ or are missing: {', '.join(different[:10])}"
+        else:
+            source, destination = self.verify_full(transform, source_query, include_ids)
+            if source != destination:
+                mismatch = f'"{source_index}" transformed: {source}, "{destination_index}": {destination}'
+
+        if mismatch is None:
+            print(f'Verified "{destination_index}"')
+            return
+        if self.config.verify_fail_on_mismatch:
+            print(f"[bold red]Verification failed, {mismatch}[/bold red]")
+            exit(1)
+        print(f"[bold yellow]Verification failed, {mismatch}[/bold yellow]")
+
+    def verification_transform(
+        self,
+    ) -> Optional[Callable[[List[dict]], List[Optional[dict]]]]:
+        """
+        Returns a function that transforms source hits like the revision does, None if the revision's
+        transform can only run on the cluster. Documents whose transform raises are left out.
+        """
+        if self.config.language == Language.python:
+            # the transform pool is closed once the revision has completed
+            self.transform_pool = None
+
+            def transform(hits: List[dict]) -> List[Optional[dict]]:
+                # documents set aside once transformed were never written
+                hits = [hit for hit in hits if hit.get("_id") not in self.left_out_ids]
+                return self.transform_hits_or_skip(hits)
+
+        elif self.config.transforms:
+
+            def transform(hits: List[dict]) -> List[Optional[dict]]:
+                for hit in hits:
+                    hit["_source"] = self.field_transform(hit["_source"])
+                return hits
+
+        elif "script" in self.config.reindex_body:
+            return None
+        else:
+
+            def transform(hits: List[dict]) -> List[Optional[dict]]:
+                return hits
+
+        serializer = self.destination_client.transport.serializer
+
+        def serialized(hits: List[dict]) -> List[Optional[dict]]:
+            # as stored in the destination index, e.g. with dates as strings
+            return [
+                hit
+                if hit is None
+                else {**hit, "_source": json.loads(serializer.dumps(hit["_source"]))}
+                for hit in transform(hits)
+            ]
+
+        return serialized
+
+    def verify_sample(
+        self, transform: Callable, source_query: Optional[dict] = None
+    ) -> Tuple[int, List[str]]:
+        """
+        Compares ``verify_sample_size`` random source documents, transformed, with the destination
+        documents of the same ``_id``. Returns the number of documents compared and the ids of those
+        that differ or are missing.
+        """
+        hits = self.source_client.search(
             index=self.config.source_index,
-            scroll="2m",
-            size=self.config.batch_size,
-            body={},
+            body={
+                "size": self.config.verify_sample_size,
+                "query": {
+                    "function_score": {
+                        "query": source_query or {"match_all": {}},
+                        "random_score": {},
+                    }
+                },
+            },
+        )["hits"]["hits"]
+        expected = [hit for hit in transform(hits) if hit is not None]
+        if len(expected) == 0:
+            return 0, []
+
+        docs = self.destination_index_client.mget(
+            index=self.config.destination_index,
+            body={
+                "docs": [
+                    {"_id": hit["_id"], "routing": hit["_routing"]}
+                    if hit.get("_routing") is not None
+                    else {"_id": hit["_id"]}
+                    for hit in expected
+                ]
+            },
+        )["docs"]
+        different = [
+            hit["_id"]
+            for hit, doc in zip(expected, docs)
+            if not doc.get("found")
+            or canonical(doc["_source"]) != canonical(hit["_source"])
+        ]
+        return len(expected), different
+
+    def verify_full(
+        self,
+        transform: Callable,
+        source_query: Optional[dict] = None,
+        include_ids: bool = True,
+    ) -> Tuple[StreamingHash, StreamingHash]:
+        """
+        Hashes every transformed source document and every destination document, reading both
+        indices in ``slices`` in parallel. Memory use doesn't depend on the size of the indices.
+        """
+        slices = self.get_slice_count()
+        retry = Retry(self.config.max_retries, self.config.retry_backoff)
+
+        def hash_slice(
+            client: OpenSearch,
+            index: str,
+            slice_id: int,
+            query: Optional[dict],
+            transform: Optional[Callable],
+        ) -> StreamingHash:
+            pages = scroll_hits(
+                client,
+                index,
+                self.config.batch_size,
+                self.config.keep_alive,
+                slice_body={"id": slice_id, "max": slices} if slices > 1 else None,
+                query=query,
+                retry=retry,
+            )
+            try:
+                return hash_pages(pages, include_ids, transform)
+            finally:
+                pages.close()
+
+        with ThreadPoolExecutor(
+            max_workers=2 * slices, thread_name_prefix="reindexer-verify"
+        ) as executor:
+            sources = [
+                executor.submit(
+                    hash_slice,
+                    self.source_client,
+                    self.config.source_index,
+                    slice_id,
+                    source_query,
+                    transform,
+                )
+                for slice_id in range(slices)
+            ]
+            destinations = [
+                executor.submit(
+                    hash_slice,
+                    self.destination_index_client,
+                    self.config.destination_index,
+                    slice_id,
+                    None,
+                    None,
+                )
+                for slice_id in range(slices)
+            ]
+            # slices of the two indices hold different documents, only their sums compare
+            source = sum(
+                (future.result() for future in sources), StreamingHash(include_ids)
+            )
+            destination = sum(
+                (future.result() for future in destinations),
+                StreamingHash(include_ids),
+            )
+        return source, destination
+
+    def retire_old_index(self):
+        """
+        Closes or deletes the index the alias pointed to before a cutover, see ``Config.cutover_old_index``.
+        Called once the revision has been recorded in "versionNum", so that an interrupted or failed
+        retirement doesn't cut over again on the next run. Failures only print a warning.
+        """
+        policy = self.config.cutover_old_index
+        if (
+            self.old_index is None
+            or self.old_index == self.config.destination_index
+            or policy == OldIndexPolicy.keep
+        ):
+            return
+
+        if self.config.cutover_grace_period > 0:
+            print(
+                f'Waiting {self.config.cutover_grace_period} seconds before {policy.value[:-1]}ing "{self.old_index}"'
+            )
+            time.sleep(self.config.cutover_grace_period)
+        try:
+            if policy == OldIndexPolicy.close:
+                self.destination_index_client.indices.close(index=self.old_index)
+            else:
+                self.destination_index_client.indices.delete(index=self.old_index)
+        except opensearchpy.exceptions.TransportError as e:
+            print(
+                f'[bold yellow]Failed to {policy.value} "{self.old_index}", {policy.value} it manually: {e}[/bold yellow]'
+            )
+            return
+        print(f'{policy.value.capitalize()}d "{self.old_index}"')
+
+    def create_watermark(self) -> Watermark:
+        if (
+            self.config.delta_field == SEQ_NO
+            and self.config.language != Language.python
+        ):
+            print(
+                f'[bold red]"delta_field" "{SEQ_NO}" is only supported by python revisions[/bold red]'
+            )
+            exit(1)
+        if self.config.language == Language.python:
+            # delta passes copy changed documents again, over the copies of the full reindex
+            if not self.config.preserve_ids:
+                print(
+                    '[bold red]"delta_field" requires "preserve_ids", otherwise delta passes duplicate every changed document[/bold red]'
+                )
+                exit(1)
+            if self.config.op_type == OpType.create:
+                print(
+                    f'[bold red]"delta_field" can\'t be combined with "op_type" {OpType.create}, which fails for every changed document[/bold red]'
+                )
+                exit(1)
+        watermark = Watermark(
+            self.source_client, self.config.source_index, self.config.delta_field
         )
+        if self.config.delta_field == SEQ_NO:
+            try:
+                watermark.shards()
+            except ValueError as e:
+                print(f"[bold red]{e}[/bold red]")
+                exit(1)
+        return watermark
 
-        # Get the scroll ID
-        sid = data["_scroll_id"]
-        scroll_size = len(data["hits"]["hits"])
+    def load_watermark(self, watermark: Watermark) -> Mark:
+        """
+        Returns the mark the first delta pass copies changes from. Resuming, this is the mark stored by
+        the failed run, so that documents changed after it are copied even if they were copied before.
+        Otherwise a new mark is taken and stored before the full reindex, whose changes are copied by
+        the first delta pass.
+        """
+        if self.resume:
+            stored = stored_watermark(
+                self.source_client, self.version_control_index, self.version
+            )
+            if stored is not None and stored["field"] == self.config.delta_field:
+                print(
+                    f"Resuming the delta passes of revision {self.version} from {stored['watermark']}"
+                )
+                return stored["watermark"]
 
-        while scroll_size > 0:
+        mark = watermark.take()
+        store_watermark(
+            self.source_client,
+            self.version_control_index,
+            self.version,
+            self.config.delta_field,
+            mark,
+        )
+        return mark
+
+    def reindex_delta(self, watermark: Watermark, mark: Mark):
+        """
+        Copies the documents changed since ``mark`` again, one pass at a time, until a pass copies at
+        most ``delta_max_lag`` documents. The mark a pass copied changes up to is stored after each pass.
+        """
+        for n in range(1, self.config.delta_max_passes + 1):
+            next_mark = watermark.take()
+            changed = watermark.changed(mark)
+            print(
+                f'Delta pass {n}: {changed} documents of "{self.config.source_index}" changed since {mark}'
+            )
+            if changed > 0:
+                queries = watermark.queries(mark)
+                if self.config.language == Language.painless:
+                    for _, query in queries:
+                        self.reindex_painless(query)
+                else:
+                    self.reindex_python(
+                        [
+                            {"query": query, "preference": preference}
+                            for preference, query in queries
+                        ],
+                        total=changed,
+                    )
+            mark = next_mark
+            store_watermark(
+                self.source_client,
+                self.version_control_index,
+                self.version,
+                self.config.delta_field,
+                mark,
+            )
+            if changed <= self.config.delta_max_lag:
+                return
+        print(
+            f"[bold yellow]{changed} documents changed during the last of {self.config.delta_max_passes} delta passes[/bold yellow]"
+        )
+
+    def swap_alias(self):
+        """Points ``Config.alias`` at the destination index, and away from any other index."""
+        if not self.config.alias:
+            return
+        create_or_update_alias(
+            self.destination_index_client,
+            self.config.alias,
+            self.config.destination_index,
+        )
+        print(
+            f'Alias "{self.config.alias}" now points to "{self.config.destination_index}"'
+        )
+
+    @property
+    def destination_index_client(self) -> OpenSearch:
+        # painless revisions are reindexed by, and written to, the source cluster unless reindexing from remote
+        if self.config.language == Language.painless and not self.config.remote:
+            return self.source_client
+        return self.destination_client
+
+    def enable_bulk_load(self):
+        """
+        Disables refreshes and replicas on the destination index and remembers the settings to restore
+        afterwards. Settings in ``destination_index_body`` take precedence over the index's previous settings.
+        """
+        index = self.config.destination_index
+        response = self.destination_index_client.indices.get_settings(
+            index=index, include_defaults=True, flat_settings=True
+        )[index]
+        previous = {**response.get("defaults", {}), **response["settings"]}
+        desired = _flatten_settings(
+            (self.config.destination_index_body or {}).get("settings", {})
+        )
+        self.bulk_load_restore_settings = {
+            key: desired.get(key, previous.get(key)) for key in BULK_LOAD_SETTINGS
+        }
+
+        print(f'Enabling bulk load mode on "{index}": {BULK_LOAD_SETTINGS}')
+        self.destination_index_client.indices.put_settings(
+            index=index, body=BULK_LOAD_SETTINGS
+        )
+
+    def restore_bulk_load(self):
+        """
+        Restores the settings changed by ``enable_bulk_load`` and waits for the destination index to become green.
+        Does nothing if bulk load mode was not enabled.
+        """
+        if self.bulk_load_restore_settings is None:
+            return
+
+        index = self.config.destination_index
+        print(f'Restoring settings on "{index}": {self.bulk_load_restore_settings}')
+        self.destination_index_client.indices.put_settings(
+            index=index, body=self.bulk_load_restore_settings
+        )
+        self.bulk_load_restore_settings = None
+
+        try:
+            health = self.destination_index_client.cluster.health(
+                index=index,
+                wait_for_status="green",
+                timeout=self.config.bulk_load_timeout,
+                # the cluster holds the request for up to bulk_load_timeout, the client must wait longer
+                request_timeout=_time_seconds(self.config.bulk_load_timeout) + 30,
+                ignore=408,
+            )
+        except opensearchpy.exceptions.ConnectionTimeout:
+            health = {"timed_out": True, "status": "unknown"}
+        if health.get("timed_out"):
+            print(
+                f'[bold yellow]"{index}" did not become green within {self.config.bulk_load_timeout}, '
+                f'status is "{health["status"]}"[/bold yellow]'
+            )
+
+    def reindex_painless(self, query: Optional[dict] = None):
+        """
+        Reindexes with a reindex task on the cluster. With a ``query``, only the source documents
+        matching both it and the query of ``reindex_body`` are reindexed.
+        """
+        body = self.config.reindex_body
+        if query is not None:
+            if "query" in body["source"]:
+                query = {"bool": {"filter": [body["source"]["query"], query]}}
+            body = {**body, "source": {**body["source"], "query": query}}
+        if self.config.remote:
+            body = {
+                **body,
+                "source": {
+                    "remote": remote_source(self.source_client),
+                    "size": self.config.batch_size,
+                    **body["source"],
+                },
+            }
+
+        task = ReindexTask(
+            self.destination_index_client,
+            self.source_client,
+            self.version_control_index,
+            self.version,
+            poll_interval=self.config.task_poll_interval,
+            interrupted=self.interrupted,
+        )
+        if task.reattach():
+            print(f"Reattaching to running reindex task {task.task_id}")
+        else:
+            params = {"refresh": True}
+            if self.config.slices == "auto":
+                params["slices"] = "auto"
+            elif self.get_slice_count() > 1:
+                params["slices"] = self.config.slices
+            if self.config.requests_per_second is not None:
+                params["requests_per_second"] = self.config.requests_per_second
+            try:
+                task.start(body, **params)
+            except opensearchpy.exceptions.RequestError as e:
+                print(e)
+                raise e
+            print(f"Started reindex task {task.task_id}")
+
+        response = task.wait()
+        print(response)
+        self.record_metric(
+            "on_revision",
+            index=self.config.destination_index,
+            docs=response.get("created", 0)
+            + response.get("updated", 0)
+            + response.get("deleted", 0),
+            seconds=response.get("took", 0) / 1000,
+        )
+
+    def get_slice_count(self) -> int:
+        slices = self.config.slices
+        if slices == "auto":
+            settings = self.source_client.indices.get_settings(
+                index=self.config.source_index, name="index.number_of_shards"
+            )
+            # an alias or pattern may resolve to several indices, slice by the smallest
+            return min(
+                int(s["settings"]["index"]["number_of_shards"])
+                for s in settings.values()
+            )
+        if not isinstance(slices, int) or isinstance(slices, bool) or slices < 1:
             print(
-                f'Starting reindex from "{self.config.source_index}" to "{self.config.destination_index}"...'
+                f'[bold red]Expected "slices" to be a positive integer or "auto" but got "{slices}"[/bold red]'
             )
+            exit(1)
+        return slices
+
+    def reindex_python(self, reads: Optional[List[dict]] = None, total: int = None):
+        """
+        Reindexes by reading, transforming and bulk indexing the source documents.
 
-            # Before scroll, process current batch of hits
-            source_docs = data["hits"]["hits"]
+        :param reads: optionally, the keyword arguments of ``read_slice`` for each reader, e.g. to read
+            the documents matching a query. By default the source index is read in ``slices``.
+        :param total: the number of documents the reads return, for progress. Counted by default.
+        """
+        if self.config.use_async:
+            asyncio.run(self.reindex_python_async())
+            return
 
-            destination_docs = []
-            for doc in source_docs:
-                destination_doc = self.transform_document(doc["_source"])
-                destination_docs.append(destination_doc)
+        slices = self.get_slice_count()
+        search_after = [None] * slices
+        checkpoint = None
+        if self.config.checkpoint and reads is None:
+            self.checkpoint = checkpoint = self.load_checkpoint(slices)
+            slices = checkpoint.slices
+            search_after = [
+                checkpoint.search_after(slice_id) for slice_id in range(slices)
+            ]
+        # delta passes keep self.checkpoint, which is deleted once the revision completes
+        self.batch_checkpoint = checkpoint
 
-            response = bulk(
+        if reads is not None:
+            slices = 1
+            readers = [partial(self.read_slice, **read) for read in reads]
+        elif slices == 1:
+            readers = [partial(self.read_slice, search_after=search_after[0])]
+        else:
+            print(
+                f'Reindexing from "{self.config.source_index}" to "{self.config.destination_index}" using {slices} slices'
+            )
+            readers = [
+                partial(
+                    self.read_slice,
+                    slice_id,
+                    slices,
+                    search_after=search_after[slice_id],
+                )
+                for slice_id in range(slices)
+            ]
+
+        self._indexed = {}
+        self._indexed_lock = threading.Lock()
+        self.retry = self.create_retry()
+        self.dead_letter = self.create_dead_letter()
+        self.transform_pool = None
+        started = time.perf_counter()
+        try:
+            if self.config.transform_processes > 0:
+                self.transform_pool = self.create_transform_pool()
+            # started after the transform pool, whose processes must be forked before any thread
+            self.progress = self.create_progress(
+                slices, checkpoint.indexed() if checkpoint else 0, total
+            )
+            with self.progress, BulkWriter(
                 self.destination_client,
-                destination_docs,
-                index=self.config.destination_index,
-                refresh="wait_for",
+                self.config.destination_index,
+                concurrency=self.config.bulk_concurrency,
+                max_bytes_in_flight=self.config.bulk_max_bytes_in_flight,
+                batch_size=AdaptiveBatchSize(
+                    self.config.bulk_max_bytes, self.config.bulk_target_latency
+                )
+                if self.config.adaptive_bulk
+                else None,
+                retry=self.retry,
+                on_request=self.on_bulk_request if self.config.metrics else None,
+                on_retry=partial(
+                    self.record_metric, "on_retry", "bulk", reason="rejected"
+                )
+                if self.config.metrics
+                else None,
+                on_failure=self.on_bulk_failure
+                if self.dead_letter is not None
+                else None,
+                refresh="wait_for"
+                if self.config.refresh_policy == RefreshPolicy.batch
+                else False,
+            ) as self.bulk_writer:
+                Pipeline(self.config.queue_size).run(
+                    readers, self.transform_batch_hits, self.write_batch
+                )
+                self.bulk_writer.flush()
+        finally:
+            if self.transform_pool is not None:
+                self.transform_pool.close()
+            if checkpoint is not None:
+                checkpoint.save()
+            if self.dead_letter is not None:
+                self.dead_letter.close()
+                if self.dead_letter.count:
+                    print(
+                        f'[bold yellow]{self.dead_letter.count} documents failed and were written to "{self.config.dead_letter}"[/bold yellow]'
+                    )
+
+        if self.config.refresh_policy == RefreshPolicy.revision:
+            self.destination_client.indices.refresh(index=self.config.destination_index)
+        self.record_revision_metric(time.perf_counter() - started)
+
+    def create_progress(
+        self, slices: int, indexed: int = 0, total: int = None
+    ) -> ReindexProgress:
+        if total is None:
+            total = self.source_client.count(index=self.config.source_index)["count"]
+        return ReindexProgress(
+            self.progress_mode,
+            f'"{self.config.source_index}" to "{self.config.destination_index}"',
+            total,
+            slices,
+            indexed,
+            display=self.progress_display,
+        )
+
+    def record_metric(self, method: str, *args, **kwargs):
+        """Calls ``method`` of every observer in ``Config.metrics`` with the revision's version."""
+        for observer in self.config.metrics or []:
+            getattr(observer, method)(self.version, *args, **kwargs)
+
+    def record_revision_metric(self, seconds: float):
+        self.record_metric(
+            "on_revision",
+            index=self.config.destination_index,
+            docs=sum(self._indexed.values()),
+            seconds=seconds,
+        )
+
+    def on_bulk_request(self, docs: int, bytes: int, seconds: float):
+        self.record_metric("on_stage", "bulk", None, docs, seconds, bytes)
+
+    def create_retry(self) -> Retry:
+        return Retry(
+            self.config.max_retries,
+            self.config.retry_backoff,
+            # searches are retried a page of hits at a time
+            on_retry=partial(
+                self.record_metric, "on_retry", "read", self.config.batch_size
+            )
+            if self.config.metrics
+            else None,
+        )
+
+    def create_dead_letter(self) -> Optional[DeadLetter]:
+        if not self.config.dead_letter:
+            return None
+        if self.config.dead_letter_target == DeadLetterTarget.index:
+            return DeadLetterIndex(
+                self.destination_client,
+                self.config.dead_letter,
+                self.version,
+                retry=Retry(self.config.max_retries, self.config.retry_backoff),
+            )
+        return DeadLetterFile(self.config.dead_letter, self.version)
+
+    def on_bulk_failure(self, action: dict, source: Optional[dict], error: dict):
+        # the action line of a bulk request, e.g. {"index": {"_index": ..., "_id": ...}}
+        meta = next(iter(action.values()))
+        self.record_left_out([meta.get("_id")], [])
+        if self.config.op_type == OpType.update and source is not None:
+            source = source.get("doc")
+        self.dead_letter.write(
+            "bulk",
+            self.config.destination_index,
+            meta.get("_id"),
+            source,
+            error,
+            routing=meta.get("routing"),
+        )
+
+    def create_transform_pool(self) -> TransformPool:
+        if "fork" not in multiprocessing.get_all_start_methods():
+            print(
+                '[bold red]"transform_processes" is not supported on this platform[/bold red]'
+            )
+            exit(1)
+        return TransformPool(
+            self, self.config.transform_processes, self.config.transform_chunk_size
+        )
+
+    def load_checkpoint(self, slices: int) -> Checkpoint:
+        if self.config.reader != Reader.point_in_time:
+            print(
+                f'[bold red]"checkpoint" requires "reader" to be {Reader.point_in_time}[/bold red]'
+            )
+            exit(1)
+        if not self.config.checkpoint_sort or any(
+            "_shard_doc" in sort for sort in self.config.checkpoint_sort
+        ):
+            print(
+                '[bold red]"checkpoint" requires "checkpoint_sort", a sort on fields that are unique together and '
+                "don't change while the revision runs[/bold red]"
+            )
+            exit(1)
+
+        checkpoint = Checkpoint(
+            self.source_client,
+            self.version_control_index,
+            self.version,
+            slices,
+            interval=self.config.checkpoint_interval,
+            sort=self.config.checkpoint_sort,
+        )
+        if not self.config.preserve_ids:
+            print(
+                '[bold yellow]"preserve_ids" is disabled, documents indexed again after resuming will be duplicated[/bold yellow]'
+            )
+
+        if self.resume and checkpoint.load():
+            if checkpoint.sort != self.config.checkpoint_sort:
+                print(
+                    f"[bold red]The checkpoint of revision {self.version} was read with the sort {checkpoint.sort}, "
+                    f'not "checkpoint_sort". Run "reindexer run" without "--resume" to start over.[/bold red]'
+                )
+                exit(1)
+            print(
+                f"Resuming revision {self.version} from its checkpoint, {checkpoint.indexed()} documents already indexed"
+            )
+        elif self.resume:
+            print(
+                f"No checkpoint found for revision {self.version}, starting from the beginning"
+            )
+        return checkpoint
+
+    def read_slice(
+        self,
+        slice_id: int = None,
+        max_slices: int = None,
+        search_after: Optional[list] = None,
+        query: Optional[dict] = None,
+        preference: Optional[str] = None,
+    ) -> Iterator[Batch]:
+        """
+        Reads a slice of the source index, or the whole index if ``max_slices`` is None.
+
+        :param search_after: the sort values of the hit to resume reading after. Only supported by
+            ``Reader.point_in_time``.
+        :param query: optionally, only read the documents matching this query.
+        :param preference: optionally, the shards to read, e.g. "_shards:0". Always read with a scroll.
+        """
+        slice_body = None
+        if max_slices is not None:
+            slice_body = {"id": slice_id, "max": max_slices}
+
+        # searches of a point in time don't support a preference
+        if self.config.reader == Reader.point_in_time and preference is None:
+            pages = point_in_time_hits(
+                self.source_client,
+                self.config.source_index,
+                self.config.batch_size,
+                self.config.keep_alive,
+                slice_body=slice_body,
+                search_after=search_after,
+                query=query,
+                sort=self.config.checkpoint_sort,
+                retry=self.retry,
+            )
+        elif search_after is not None:
+            raise ValueError(
+                f"Resuming a read requires {Reader.point_in_time}, got {self.config.reader}"
+            )
+        else:
+            pages = scroll_hits(
+                self.source_client,
+                self.config.source_index,
+                self.config.batch_size,
+                self.config.keep_alive,
+                slice_body=slice_body,
+                query=query,
+                preference=preference,
+                retry=self.retry,
+            )
+
+        try:
+            started = time.perf_counter()
+            for seq, hits in enumerate(pages):
+                if self.interrupted.is_set():
+                    raise KeyboardInterrupt()
+                self.record_metric(
+                    "on_stage",
+                    "read",
+                    slice_id,
+                    len(hits),
+                    time.perf_counter() - started,
+                )
+                yield Batch(
+                    slice_id=slice_id,
+                    hits=hits,
+                    seq=seq,
+                    search_after=hits[-1].get("sort"),
+                )
+                started = time.perf_counter()
+        finally:
+            pages.close()
+
+    def transform_hit(self, hit: dict) -> Optional[dict]:
+        """
+        Transforms a hit of the source index before it is inserted into the destination index.
+        Override this instead of ``transform_document`` to read or change the hit's ``_id`` and
+        ``_routing`` along with its ``_source``. Return None to skip the document.
+        """
+        hit["_source"] = self.transform_document(hit["_source"])
+        return hit
+
+    def bulk_action(self, hit: dict) -> dict:
+        op_type = self.config.op_type
+        action = {"_op_type": op_type.value}
+        if self.config.preserve_ids:
+            for key in ("_id", "_routing"):
+                if key in hit:
+                    action[key] = hit[key]
+
+        if op_type == OpType.update:
+            action["doc"] = hit["_source"]
+            action["doc_as_upsert"] = True
+        else:
+            action["_source"] = hit["_source"]
+        return action
+
+    def transform_batch(self, docs: List[dict]) -> List[Optional[dict]]:
+        """
+        Transforms a batch of hits of the source index, see ``transform_hit``. Override this to
+        transform many documents at once. By default ``transform_hit``, and so ``transform_document``,
+        is called for every document.
+
+        With ``transform_processes`` this runs in worker processes, on chunks of the batch.
+        """
+        if self.config.columnar == TableFormat.arrow:
+            return arrow_to_hits(self.transform_columns(hits_to_arrow(docs)))
+        if self.config.columnar == TableFormat.columns:
+            return columns_to_hits(self.transform_columns(hits_to_columns(docs)))
+        return [self.transform_hit(doc) for doc in docs]
+
+    def transform_columns(self, table):
+        """
+        Transforms a batch of documents as a table when ``columnar`` is set, see ``TableFormat``.
+        The table has a column per top level field of ``_source``, plus ``_id``, ``_routing`` and
+        ``_missing``, see ``hits_to_columns``. Rows may be added or removed. Fields that are None are
+        written as null, unless the ``_missing`` column of their row lists them.
+
+        By default the table is converted back to hits and transformed by ``transform_hit``.
+        """
+        if self.config.columnar == TableFormat.arrow:
+            hits, to_table = arrow_to_hits(table), hits_to_arrow
+        else:
+            hits, to_table = columns_to_hits(table), hits_to_columns
+        return to_table(
+            [hit for hit in map(self.transform_hit, hits) if hit is not None]
+        )
+
+    def transform_hits(self, hits: List[dict]) -> List[Optional[dict]]:
+        if self.transform_pool is not None:
+            return self.transform_pool.transform(hits)
+        return self.transform_batch(hits)
+
+    def transform_hits_or_skip(
+        self,
+        hits: List[dict],
+        on_failure: Optional[Callable[[dict, Exception], None]] = None,
+    ) -> List[Optional[dict]]:
+        """
+        Transforms hits like ``transform_hits``. If the batch fails, its hits are transformed again
+        one at a time and those that fail are left out, after calling ``on_failure`` with the source
+        hit and the error.
+        """
+        # revisions may change hits in place before failing, keep the source documents.
+        # Hits sent to the transform pool are copied by the worker processes.
+        originals = pickle.dumps(hits) if self.transform_pool is None else None
+        try:
+            return self.transform_hits(hits)
+        except Exception:
+            pass
+
+        originals = originals or pickle.dumps(hits)
+        sources = pickle.loads(originals)
+        transformed = []
+        for hit, source in zip(pickle.loads(originals), sources):
+            try:
+                transformed.extend(self.transform_batch([hit]))
+            except Exception as e:
+                if on_failure is not None:
+                    on_failure(source, e)
+        return transformed
+
+    def on_transform_failure(self, hit: dict, error: Exception):
+        self.dead_letter.write(
+            "transform",
+            self.config.destination_index,
+            hit.get("_id"),
+            hit.get("_source"),
+            {"type": type(error).__name__, "reason": str(error)},
+            routing=hit.get("_routing"),
+        )
+
+    def record_left_out(self, ids: List[Optional[str]], docs: List[dict]):
+        """
+        Records the source documents with ``ids`` that weren't written, given the bulk actions ``docs``
+        they were transformed to. See ``left_out_ids``.
+        """
+        missing = len(ids) - len(docs)
+        if missing <= 0:
+            return
+        left_out = set(ids) - {doc.get("_id") for doc in docs}
+        with self._left_out_lock:
+            # unless the transform changed the ids of documents
+            if None not in left_out and len(left_out) == missing:
+                self.left_out_ids |= left_out
+            else:
+                self.left_out_count += missing
+
+    def transform_batch_hits(self, batch: Batch) -> Batch:
+        started = time.perf_counter()
+        # transforms may change hits in place
+        ids = [hit.get("_id") for hit in batch.hits]
+        if self.dead_letter is not None:
+            hits = self.transform_hits_or_skip(batch.hits, self.on_transform_failure)
+        else:
+            hits = self.transform_hits(batch.hits)
+
+        batch.docs = [self.bulk_action(hit) for hit in hits if hit is not None]
+        self.record_left_out(ids, batch.docs)
+        self.record_metric(
+            "on_stage",
+            "transform",
+            batch.slice_id,
+            len(batch.hits),
+            time.perf_counter() - started,
+        )
+        return batch
+
+    def write_batch(self, batch: Batch):
+        size = self.bulk_writer.write(batch.docs, partial(self.on_batch_indexed, batch))
+        self.progress.sent(batch.slice_id, size)
+
+    def on_batch_indexed(self, batch: Batch, success: int, errors: List[dict]):
+        if self.batch_checkpoint is not None and not errors:
+            self.batch_checkpoint.complete(
+                batch.slice_id, batch.seq, batch.search_after, success
             )
-            print(response)
 
-            data = self.source_client.scroll(scroll_id=sid, scroll="2m")
+        # bulk requests may complete on several threads at once
+        with self._indexed_lock:
+            self._indexed[batch.slice_id] = (
+                self._indexed.get(batch.slice_id, 0) + success
+            )
 
-            # Update the scroll ID
-            sid = data["_scroll_id"]
+        self.progress.advance(batch.slice_id, success)
+        if errors:
+            label = "" if batch.slice_id is None else f"Slice {batch.slice_id + 1}: "
+            print(
+                f"[bold red]{label}{len(errors)} documents failed to index[/bold red]"
+            )
 
-            # Get the number of results that returned in the last scroll
-            scroll_size = len(data["hits"]["hits"])
+    def replay_dead_letter(self):
+        """
+        Transforms and indexes the documents of the revision set aside in ``Config.dead_letter``
+        again, e.g. once the revision or the destination index's mappings have been fixed. Documents
+        that failed in the "transform" stage are transformed again, those that failed in the "bulk"
+        stage are only indexed again. Documents that fail again are set aside again.
+        """
+        if self.config.language != Language.python or not self.config.dead_letter:
+            print(
+                f'[bold red]Revision {self.version} is not a python revision with "dead_letter"[/bold red]'
+            )
+            exit(1)
 
-        self.source_client.clear_scroll(scroll_id=sid)
+        self.dead_letter = self.create_dead_letter()
+        records = self.dead_letter.read()
+        if len(records) == 0:
+            print(f"No documents of revision {self.version} to replay.")
+            return
+
+        started = time.time()
+        self.retry = self.create_retry()
+        self.transform_pool = None
+        indexed = 0
+
+        def on_response(success: int, errors: List[dict]):
+            nonlocal indexed
+            indexed += success
+
+        hits = {"transform": [], "bulk": []}
+        for record in records:
+            hit = {"_id": record["_id"], "_source": record["_source"]}
+            if record.get("_routing") is not None:
+                hit["_routing"] = record["_routing"]
+            hits[record["stage"]].append(hit)
+
+        with BulkWriter(
+            self.destination_client,
+            self.config.destination_index,
+            retry=self.retry,
+            on_failure=self.on_bulk_failure,
+        ) as writer:
+            size = self.config.batch_size
+            for i in range(0, len(hits["transform"]), size):
+                batch = Batch(slice_id=None, hits=hits["transform"][i : i + size])
+                writer.write(self.transform_batch_hits(batch).docs, on_response)
+            for i in range(0, len(hits["bulk"]), size):
+                docs = [self.bulk_action(hit) for hit in hits["bulk"][i : i + size]]
+                writer.write(docs, on_response)
+            writer.flush()
+
+        self.dead_letter.close()
+        # the records written while replaying are kept
+        self.dead_letter.remove(before=started)
+        self.destination_client.indices.refresh(index=self.config.destination_index)
+        print(
+            f"Replayed {len(records)} documents of revision {self.version}: {indexed} indexed, {self.dead_letter.count} failed again"
+        )
 
-    def read_and_exec_file(self, file_path):
+    async def reindex_python_async(self):
+        unsupported = [
+            option
+            for option, enabled in [
+                ("checkpoint", self.config.checkpoint),
+                ("adaptive_bulk", self.config.adaptive_bulk),
+                ("reader", self.config.reader != Reader.scroll),
+                ("transform_processes", self.config.transform_processes > 0),
+                ("dead_letter", self.config.dead_letter),
+                ("delta_field", self.config.delta_field),
+            ]
+            if enabled
+        ]
+        if unsupported:
+            print(
+                f'[bold red]"use_async" does not support {", ".join(unsupported)}[/bold red]'
+            )
+            exit(1)
+        # verification transforms source documents once the event loop and async clients are closed
+        if self.config.verify in (Verification.sample, Verification.full,) and any(
+            inspect.iscoroutinefunction(hook)
+            for hook in (self.transform_hit, self.transform_document)
+        ):
+            print(
+                f'[bold red]"verify" {self.config.verify} does not support "async def" transform hooks, use {Verification.count}[/bold red]'
+            )
+            exit(1)
+
+        from opensearch_reindexer.db import dynamically_import_async_clients
+
+        source_client, destination_client = dynamically_import_async_clients()
+        if source_client is None:
+            print(
+                '[bold red]"use_async" requires "async_source_client" to be defined in "./migrations/env.py"[/bold red]'
+            )
+            exit(1)
+
+        slices = self.get_slice_count()
+        self._indexed = {}
+        self._indexed_lock = threading.Lock()
+        started = time.perf_counter()
+        # None marks the end of the batches
+        queue = asyncio.Queue(maxsize=self.config.queue_size)
+        if slices == 1:
+            readers = [
+                asyncio.ensure_future(self.read_slice_async(source_client, queue))
+            ]
+        else:
+            readers = [
+                asyncio.ensure_future(
+                    self.read_slice_async(source_client, queue, slice_id, slices)
+                )
+                for slice_id in range(slices)
+            ]
+        writers = [
+            asyncio.ensure_future(self.write_batches_async(destination_client, queue))
+            for _ in range(self.config.bulk_concurrency)
+        ]
+
+        async def close_queue():
+            await asyncio.gather(*readers)
+            for _ in writers:
+                await queue.put(None)
+
+        try:
+            self.progress = self.create_progress(slices)
+            with self.progress:
+                await asyncio.gather(close_queue(), *writers)
+            if self.config.refresh_policy == RefreshPolicy.revision:
+                await destination_client.indices.refresh(
+                    index=self.config.destination_index
+                )
+            self.record_revision_metric(time.perf_counter() - started)
+        except BaseException:
+            for task in readers + writers:
+                task.cancel()
+            await asyncio.gather(*readers, *writers, return_exceptions=True)
+            raise
+        finally:
+            await source_client.close()
+            if destination_client is not source_client:
+                await destination_client.close()
+
+    async def read_slice_async(
+        self,
+        client,
+        queue: asyncio.Queue,
+        slice_id: int = None,
+        max_slices: int = None,
+    ):
+        from opensearchpy.helpers import async_scan
+
+        query = {}
+        if max_slices is not None:
+            query["slice"] = {"id": slice_id, "max": max_slices}
+
+        seq = 0
+        hits = []
+        started = time.perf_counter()
+        async for hit in async_scan(
+            client,
+            query=query,
+            index=self.config.source_index,
+            size=self.config.batch_size,
+            scroll=self.config.keep_alive,
+        ):
+            hits.append(hit)
+            if len(hits) == self.config.batch_size:
+                self.record_metric(
+                    "on_stage",
+                    "read",
+                    slice_id,
+                    len(hits),
+                    time.perf_counter() - started,
+                )
+                await queue.put(Batch(slice_id=slice_id, hits=hits, seq=seq))
+                seq += 1
+                hits = []
+                started = time.perf_counter()
+        if hits:
+            self.record_metric(
+                "on_stage", "read", slice_id, len(hits), time.perf_counter() - started
+            )
+            await queue.put(Batch(slice_id=slice_id, hits=hits, seq=seq))
+
+    async def transform_batch_hits_async(self, batch: Batch) -> Batch:
+        # revisions may define either hook as a coroutine, the hits of a batch are then transformed concurrently
+        started = time.perf_counter()
+        ids = [hit.get("_id") for hit in batch.hits]
+        if inspect.iscoroutinefunction(self.transform_hit):
+            hits = await asyncio.gather(*map(self.transform_hit, batch.hits))
+        elif inspect.iscoroutinefunction(self.transform_document):
+            sources = await asyncio.gather(
+                *(self.transform_document(hit["_source"]) for hit in batch.hits)
+            )
+            hits = batch.hits
+            for hit, source in zip(hits, sources):
+                hit["_source"] = source
+        else:
+            return self.transform_batch_hits(batch)
+
+        batch.docs = [self.bulk_action(hit) for hit in hits if hit is not None]
+        self.record_left_out(ids, batch.docs)
+        self.record_metric(
+            "on_stage",
+            "transform",
+            batch.slice_id,
+            len(batch.hits),
+            time.perf_counter() - started,
+        )
+        return batch
+
+    async def write_batches_async(self, client, queue: asyncio.Queue):
+        from opensearchpy.helpers import async_bulk
+
+        while True:
+            batch = await queue.get()
+            if batch is None:
+                return
+
+            batch = await self.transform_batch_hits_async(batch)
+
+            started = time.perf_counter()
+            success, errors = await async_bulk(
+                client,
+                batch.docs,
+                index=self.config.destination_index,
+                chunk_size=max(len(batch.docs), 1),
+                max_retries=self.config.max_retries,
+                initial_backoff=self.config.retry_backoff,
+                refresh="wait_for"
+                if self.config.refresh_policy == RefreshPolicy.batch
+                else False,
+            )
+            self.record_metric(
+                "on_stage",
+                "bulk",
+                None,
+                len(batch.docs),
+                time.perf_counter() - started,
+            )
+            self.on_batch_indexed(batch, success, errors)
+
+    def read_and_exec_file(self, file_path, namespace: Optional[dict] = None):
         with open(file_path, "r") as file:
             code = file.read()
-            exec(code, globals())
+            exec(code, globals() if namespace is None else namespace)
+
+    def load_migration(
+        self,
+        revision_file: str,
+        resume: bool,
+        progress: ProgressMode = ProgressMode.bar,
+    ) -> "BaseMigration":
+        file_path = os.path.join(os.getcwd(), "migrations/versions", revision_file)
+        # each revision gets its own namespace, so that several can be loaded at once
+        namespace = dict(globals())
+        print(file_path)
+        self.read_and_exec_file(file_path, namespace)
+
+        migration = namespace["Migration"](namespace["config"])
+        migration.version = self.extract_version_from_file_name(revision_file)
+        migration.resume = resume
+        migration.progress_mode = progress
+        return migration
+
+    @staticmethod
+    def run_revision(migration: "BaseMigration"):
+        try:
+            migration.before_revision()
+            # Execute migration
+            migration.reindex()
+            migration.after_revision()
+        finally:
+            migration.restore_bulk_load()
+        # only once bulk loading has finished, so that the alias never points to a half loaded index
+        migration.verify()
+        migration.swap_alias()
 
-    def handle_migration(self):
+    def handle_migration(
+        self,
+        resume: bool = False,
+        concurrency: int = 1,
+        progress: ProgressMode = ProgressMode.bar,
+    ):
         if not self.source_client.indices.exists(index=self.version_control_index):
             print(
                 f'Version control index "{self.version_control_index}" does not exist.\nCreate it by running "reindexer init-index"'
@@ -258,26 +1842,131 @@ class BaseMigration:
         if len(revisions_to_execute) > 0:
             self.on_setup()
             print(f"Revisions to be executed: {revisions_to_execute}")
-            path = os.getcwd()
-            for revision_file in revisions_to_execute:
-                file_path = os.path.join(path, "migrations/versions", revision_file)
-                print(file_path)
-
-                # Dynamically import the revision file
-                self.read_and_exec_file(file_path)
-
-                migration = Migration(config)
-                migration.before_revision()
-                # Execute migration
-                migration.reindex()
-                migration.after_revision()
-
-                new_version = self.extract_version_from_file_name(revision_file)
-                self.update_migration_version(new_version)
+            migrations = [
+                self.load_migration(revision_file, resume, progress)
+                for revision_file in revisions_to_execute
+            ]
+            if concurrency > 1:
+                # rich shows one live display at a time, so the revisions share one
+                display = create_display() if progress == ProgressMode.bar else None
+                for migration in migrations:
+                    migration.progress_display = display
+                with display or nullcontext():
+                    self.run_revisions_concurrently(migrations, concurrency)
+            else:
+                for migration in migrations:
+                    self.run_revision(migration)
+                    self.complete_revisions([migration])
+                    migration.retire_old_index()
         else:
             print("All revisions are up to date.")
         self.on_complete()
 
+    def handle_replay_dead_letter(self, version: int):
+        revision_files = [
+            revision_file
+            for revision_file in self.get_revisions()
+            if self.extract_version_from_file_name(revision_file) == version
+        ]
+        if len(revision_files) == 0:
+            print(
+                f'[bold red]Revision {version} not found in "./migrations/versions"[/bold red]'
+            )
+            exit(1)
+
+        self.load_migration(revision_files[0], resume=False).replay_dead_letter()
+
+    def complete_revisions(self, migrations: List["BaseMigration"]):
+        """
+        Moves "versionNum" to the last of the given revisions, which must have all been run, in order.
+        """
+        self.update_migration_version(migrations[-1].version)
+        for migration in migrations:
+            if migration.checkpoint is not None:
+                migration.checkpoint.delete()
+            if migration.config.delta_field:
+                delete_watermark(
+                    migration.source_client,
+                    migration.version_control_index,
+                    migration.version,
+                )
+
+    def run_revisions_concurrently(
+        self, migrations: List["BaseMigration"], concurrency: int
+    ):
+        """
+        Runs up to ``concurrency`` revisions at once. A revision starts once the revisions it depends on,
+        see ``revision_dependencies``, have completed. "versionNum" only moves past a revision once it and
+        every revision before it have completed. If a revision fails no new revision is started, and the
+        error is raised once the running revisions have finished. Ctrl-C stops the running revisions,
+        cancelling the reindex tasks of painless revisions. The old indices of the cutovers recorded are
+        retired last.
+        """
+        dependencies = revision_dependencies(migrations)
+        pending = {m.version: m for m in migrations}
+        running = {}
+        completed = set()
+        # revisions that have completed but can't be recorded in "versionNum" yet
+        unrecorded = list(migrations)
+        recorded = []
+        error = None
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            try:
+                while running or (pending and error is None):
+                    for version, migration in list(pending.items()):
+                        if error is not None or len(running) == concurrency:
+                            break
+                        if dependencies[version] <= completed:
+                            print(f"Starting revision {version}")
+                            del pending[version]
+                            running[
+                                executor.submit(self.run_revision, migration)
+                            ] = migration
+
+                    if not running:
+                        print(
+                            f"[bold red]Revisions {[*pending]} depend on revisions that don't run before them[/bold red]"
+                        )
+                        exit(1)
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        version = running.pop(future).version
+                        if future.exception() is not None:
+                            print(f"[bold red]Revision {version} failed[/bold red]")
+                            error = error or future.exception()
+                            continue
+                        print(f"Revision {version} complete")
+                        completed.add(version)
+
+                    recordable = []
+                    while unrecorded and unrecorded[0].version in completed:
+                        recordable.append(unrecorded.pop(0))
+                    if recordable:
+                        self.complete_revisions(recordable)
+                        recorded += recordable
+            except KeyboardInterrupt:
+                # Ctrl-C only interrupts the main thread, the revisions stop once they notice
+                print(
+                    "[bold yellow]Interrupted, stopping the running revisions[/bold yellow]"
+                )
+                for migration in running.values():
+                    migration.interrupted.set()
+                wait(running)
+                raise
+
+        # once no revision is running, as retiring may wait for cutover_grace_period
+        for migration in recorded:
+            migration.retire_old_index()
+        if error is not None:
+            if pending or unrecorded:
+                print(
+                    f"[bold yellow]Revisions {[m.version for m in unrecorded]} will run again on the next "
+                    f'"reindexer run"[/bold yellow]'
+                )
+            raise error
+
     def extract_version_from_file_name(self, file_name):
         self.valid_file_name(file_name)
         version = int(re.search(r"\d+", file_name).group())
@@ -0,0 +1,127 @@
+import threading
+import time
+from typing import Dict, List, Optional
+
+from opensearchpy import OpenSearch
+from opensearchpy.exceptions import NotFoundError
+
+
+def checkpoint_index(version_control_index: str) -> str:
+    """The name of the sidecar index in which the checkpoints of revisions are stored."""
+    return f"{version_control_index}-checkpoints"
+
+
+class Checkpoint:
+    """Tracks how far each slice of a python revision has been indexed.
+
+    Batches of a slice may finish indexing out of order. The checkpoint of a slice only moves
+    past a batch once it, and every batch read before it, has been indexed. Resuming from the
+    checkpoint may therefore index some documents again, but never skips one, as long as slices
+    are read in a ``sort`` on fields that are unique together and don't change while the revision
+    runs. The ``_shard_doc`` values of hits can't be resumed from, they are only meaningful within
+    the point in time that returned them.
+
+    Checkpoints are stored in a sidecar index of the version control index, one document per
+    revision, at most once every ``interval`` seconds and whenever ``save`` is called.
+
+    Arguments:
+        client (OpenSearch): The client of the cluster holding the version control index.
+        version_control_index (str): The name of the version control index.
+        revision (int): The version of the revision being checkpointed.
+        slices (int): The number of slices the source index is read with.
+        interval (float): The minimum number of seconds between two saves.
+        sort (Optional[List[dict]]): The sort slices are read in, whose values are checkpointed.
+    """
+
+    def __init__(
+        self,
+        client: OpenSearch,
+        version_control_index: str,
+        revision: int,
+        slices: int,
+        interval: float = 10.0,
+        sort: Optional[List[dict]] = None,
+    ):
+        self.client = client
+        self.index = checkpoint_index(version_control_index)
+        self.id = f"revision-{revision}"
+        self.revision = revision
+        self.slices = slices
+        self.interval = interval
+        self.sort = sort
+        # slice id -> {"search_after": [...], "indexed": int}
+        self.progress: Dict[str, dict] = {
+            str(slice_id): {"search_after": None, "indexed": 0}
+            for slice_id in range(slices)
+        }
+
+        # slice id -> sequence number of the next batch the checkpoint is waiting for
+        self._next: Dict[str, int] = {key: 0 for key in self.progress}
+        # slice id -> sequence number -> (search_after, indexed) of batches indexed out of order
+        self._done: Dict[str, Dict[int, tuple]] = {key: {} for key in self.progress}
+        self._saved_at = time.monotonic()
+        self._index_created = False
+        self._lock = threading.Lock()
+
+    def load(self) -> bool:
+        """Loads the stored checkpoint of the revision. Returns False if there is none."""
+        try:
+            source = self.client.get(index=self.index, id=self.id)["_source"]
+        except NotFoundError:
+            return False
+
+        self.slices = source["slices"]
+        self.sort = source.get("sort")
+        self.progress = source["progress"]
+        self._next = {key: 0 for key in self.progress}
+        self._done = {key: {} for key in self.progress}
+        return True
+
+    def search_after(self, slice_id: Optional[int]) -> Optional[list]:
+        return self.progress[str(slice_id or 0)]["search_after"]
+
+    def indexed(self) -> int:
+        return sum(p["indexed"] for p in self.progress.values())
+
+    def complete(
+        self, slice_id: Optional[int], seq: int, search_after: list, indexed: int
+    ) -> None:
+        """Records that the batch ``seq`` of a slice has been indexed."""
+        key = str(slice_id or 0)
+        with self._lock:
+            self._done[key][seq] = (search_after, indexed)
+            while self._next[key] in self._done[key]:
+                search_after, indexed = self._done[key].pop(self._next[key])
+                self.progress[key]["search_after"] = search_after
+                self.progress[key]["indexed"] += indexed
+                self._next[key] += 1
+
+            if time.monotonic() - self._saved_at >= self.interval:
+                self._save()
+
+    def save(self) -> None:
+        with self._lock:
+            self._save()
+
+    def delete(self) -> None:
+        self.client.delete(index=self.index, id=self.id, ignore=404)
+
+    def _save(self) -> None:
+        if not self._index_created:
+            # checkpoints are only ever read by id, their fields don't need to be indexed
+            self.client.indices.create(
+                index=self.index, body={"mappings": {"dynamic": False}}, ignore=400
+            )
+            self._index_created = True
+
+        self.client.index(
+            index=self.index,
+            id=self.id,
+            body={
+                "revision": self.revision,
+                "slices": self.slices,
+                "sort": self.sort,
+                "progress": self.progress,
+            },
+        )
+        self._saved_at = time.monotonic()
@@ -0,0 +1,80 @@
+from typing import Dict, List
+
+# Metadata of hits that is kept as columns of a table
+METADATA_COLUMNS = ("_id", "_routing")
+# The column listing the fields each hit doesn't have, so that they are left out again instead of
+# becoming null
+MISSING_COLUMN = "_missing"
+
+
+def hits_to_columns(hits: List[dict]) -> Dict[str, list]:
+    """Converts hits into a table of columns, one list of values per top level field of ``_source``,
+    plus an ``_id`` and, if any hit has one, a ``_routing`` column. Missing fields are None, and if
+    any hit misses a field a ``_missing`` column lists the fields of each hit that are missing.
+
+    Arguments:
+        hits (List[dict]): The hits to convert.
+
+    Returns:
+        Dict[str, list]: The columns, all with one value per hit.
+    """
+    names = {}
+    for hit in hits:
+        names.update(dict.fromkeys(hit["_source"]))
+
+    table = {"_id": [hit.get("_id") for hit in hits]}
+    if any("_routing" in hit for hit in hits):
+        table["_routing"] = [hit.get("_routing") for hit in hits]
+    missing = [[name for name in names if name not in hit["_source"]] for hit in hits]
+    if any(missing):
+        table[MISSING_COLUMN] = missing
+    for name in names:
+        table[name] = [hit["_source"].get(name) for hit in hits]
+    return table
+
+
+def columns_to_hits(table: Dict[str, list]) -> List[dict]:
+    """Converts a table of columns back into hits. Fields that are None are left out of ``_source`` if
+    the ``_missing`` column lists them, other fields that are None are kept as null.
+
+    Arguments:
+        table (Dict[str, list]): The columns, all of the same length.
+
+    Returns:
+        List[dict]: The hits, one per row.
+    """
+    names = list(table)
+    rows = zip(*(table[name] for name in names))
+    return [_row_to_hit(dict(zip(names, row))) for row in rows]
+
+
+def hits_to_arrow(hits: List[dict]):
+    """Converts hits into a ``pyarrow.Table`` with the same columns as ``hits_to_columns``."""
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            'TableFormat.arrow requires pyarrow, install it with "pip install pyarrow"'
+        ) from e
+
+    return pyarrow.Table.from_pydict(hits_to_columns(hits))
+
+
+def arrow_to_hits(table) -> List[dict]:
+    """Converts a ``pyarrow.Table`` back into hits, like ``columns_to_hits``."""
+    return [_row_to_hit(row) for row in table.to_pylist()]
+
+
+def _row_to_hit(row: dict) -> dict:
+    hit = {}
+    for name in METADATA_COLUMNS:
+        value = row.pop(name, None)
+        if value is not None:
+            hit[name] = value
+    missing = set(row.pop(MISSING_COLUMN, None) or ())
+    hit["_source"] = {
+        name: value
+        for name, value in row.items()
+        if value is not None or name not in missing
+    }
+    return hit
@@ -1,15 +1,18 @@
 import importlib.util
 import os
-from typing import Union
+from types import ModuleType
+from typing import TYPE_CHECKING, Optional, Tuple, Union
 
 from opensearchpy import OpenSearch
 
+if TYPE_CHECKING:
+    # only available when opensearch-py's async extra is installed
+    from opensearchpy import AsyncOpenSearch
 
-def dynamically_import_migrations() -> Union[
-    tuple[OpenSearch, OpenSearch, str], tuple[None, None]
-]:
+
+def import_env() -> Optional[ModuleType]:
     """
-    Dynamically imports the necessary migration files and returns the 'source_client' from the 'env.py' file.
+    Dynamically imports the necessary migration files and returns the 'env.py' module, or None if it doesn't exist.
     """
     try:
         # Obtain the file's path
@@ -29,7 +32,31 @@ def dynamically_import_migrations() -> Union[
         init_spec.loader.exec_module(init)
         spec.loader.exec_module(env)
 
-        return env.source_client, env.destination_client, env.VERSION_CONTROL_INDEX
+        return env
     except FileNotFoundError:
         pass
-    return None, None
+    return None
+
+
+def dynamically_import_migrations() -> Union[
+    tuple[OpenSearch, OpenSearch, str], tuple[None, None]
+]:
+    """
+    Dynamically imports the necessary migration files and returns the 'source_client' from the 'env.py' file.
+    """
+    env = import_env()
+    if env is None:
+        return None, None
+    return env.source_client, env.destination_client, env.VERSION_CONTROL_INDEX
+
+
+def dynamically_import_async_clients() -> Tuple[
+    Optional["AsyncOpenSearch"], Optional["AsyncOpenSearch"]
+]:
+    """
+    Returns the optional 'async_source_client' and 'async_destination_client' from the 'env.py' file.
+    'async_destination_client' defaults to 'async_source_client'. Both are None if they are not defined.
+    """
+    env = import_env()
+    source_client = getattr(env, "async_source_client", None)
+    return source_client, getattr(env, "async_destination_client", source_client)
@@ -0,0 +1,254 @@
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+from opensearchpy import OpenSearch
+from opensearchpy.helpers import scan
+
+from opensearch_reindexer.retry import Retry
+from opensearch_reindexer.writer import BulkWriter
+
+# Mappings of dead-letter indices. Sources and errors are stored but not indexed, so that documents
+# that failed because of a mapping conflict don't fail again.
+DEAD_LETTER_MAPPINGS = {
+    "dynamic": False,
+    "properties": {
+        "time": {"type": "double"},
+        "revision": {"type": "integer"},
+        "stage": {"type": "keyword"},
+        "index": {"type": "keyword"},
+        "id": {"type": "keyword"},
+        "routing": {"type": "keyword"},
+        "source": {"type": "object", "enabled": False},
+        "error": {"type": "object", "enabled": False},
+    },
+}
+
+
+class DeadLetter(ABC):
+    """Sets aside the documents of a revision that could not be transformed or indexed, so that they
+    can be inspected and replayed later instead of failing the revision.
+
+    Records are dicts with the ``time``, ``revision``, ``stage``, ``index``, ``_id``, ``_routing``,
+    ``_source`` and ``error`` of a document.
+
+    Arguments:
+        revision (Optional[int]): The version of the revision whose documents are set aside.
+    """
+
+    def __init__(self, revision: Optional[int]):
+        self.revision = revision
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def write(
+        self,
+        stage: str,
+        index: str,
+        id: Optional[str],
+        source: Optional[dict],
+        error: dict,
+        routing: Optional[str] = None,
+    ) -> None:
+        """
+        Records a document that failed.
+
+        Arguments:
+            stage (str): Where the document failed, "transform" or "bulk".
+            index (str): The index the document was written to.
+            id (Optional[str]): The document's ``_id``.
+            source (Optional[dict]): The document's ``_source``. For the "transform" stage this is the
+                source document, for the "bulk" stage the transformed document.
+            error (dict): The error, e.g. the bulk item returned by OpenSearch, or the "type" and
+                "reason" of an exception.
+            routing (Optional[str]): The document's ``_routing``.
+        """
+        record = {
+            "time": time.time(),
+            "revision": self.revision,
+            "stage": stage,
+            "index": index,
+            "_id": id,
+            "_routing": routing,
+            "_source": source,
+            "error": error,
+        }
+        with self._lock:
+            self._append(record)
+            self.count += 1
+
+    @abstractmethod
+    def read(self) -> List[dict]:
+        """Returns the records of the revision."""
+
+    @abstractmethod
+    def remove(self, before: float) -> None:
+        """Removes the records of the revision written before ``before``, a ``time.time()``."""
+
+    def close(self) -> None:
+        pass
+
+    @abstractmethod
+    def _append(self, record: dict) -> None:
+        """Stores a record, called with the lock held."""
+
+
+class DeadLetterFile(DeadLetter):
+    """Appends records to a file, one JSON object per line.
+
+    Arguments:
+        path (str): The file to append to.
+        revision (Optional[int]): The version of the revision whose documents are set aside.
+    """
+
+    def __init__(self, path: str, revision: Optional[int] = None):
+        super().__init__(revision)
+        self.path = path
+        self._file = None
+
+    def _append(self, record: dict) -> None:
+        if self._file is None:
+            self._file = open(self.path, "a")
+        self._file.write(json.dumps(record, default=str) + "\n")
+        self._file.flush()
+
+    def _records(self) -> List[dict]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path) as file:
+            return [json.loads(line) for line in file if line.strip()]
+
+    def read(self) -> List[dict]:
+        return [
+            record
+            for record in self._records()
+            if record.get("revision") == self.revision
+        ]
+
+    def remove(self, before: float) -> None:
+        with self._lock:
+            self._close_file()
+            kept = [
+                record
+                for record in self._records()
+                if record.get("revision") != self.revision or record["time"] >= before
+            ]
+            # replace the file at once, so that records are never lost half written
+            temporary = f"{self.path}.tmp"
+            with open(temporary, "w") as file:
+                file.writelines(json.dumps(record) + "\n" for record in kept)
+            os.replace(temporary, self.path)
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_file()
+
+
+class DeadLetterIndex(DeadLetter):
+    """Indexes records into an index, which is created with ``DEAD_LETTER_MAPPINGS`` if it doesn't
+    exist. Records are sent in bulk requests of ``buffer_size`` documents, and when closed.
+
+    Arguments:
+        client (OpenSearch): The client of the cluster the index is on.
+        index (str): The index to write to.
+        revision (Optional[int]): The version of the revision whose documents are set aside.
+        buffer_size (int): The number of records sent per bulk request.
+        retry (Retry): How records that fail with a transient error are retried.
+    """
+
+    def __init__(
+        self,
+        client: OpenSearch,
+        index: str,
+        revision: Optional[int] = None,
+        buffer_size: int = 100,
+        retry: Optional[Retry] = None,
+    ):
+        super().__init__(revision)
+        self.client = client
+        self.index = index
+        self.buffer_size = buffer_size
+        self.retry = retry
+        self._buffer: List[dict] = []
+        self._created = False
+
+    def _append(self, record: dict) -> None:
+        self._buffer.append(record)
+        if len(self._buffer) >= self.buffer_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        if not self._created:
+            if not self.client.indices.exists(index=self.index):
+                self.client.indices.create(
+                    index=self.index, body={"mappings": DEAD_LETTER_MAPPINGS}
+                )
+            self._created = True
+        docs = [
+            {
+                "_source": {
+                    "time": record["time"],
+                    "revision": record["revision"],
+                    "stage": record["stage"],
+                    "index": record["index"],
+                    "id": record["_id"],
+                    "routing": record["_routing"],
+                    "source": record["_source"],
+                    "error": record["error"],
+                },
+            }
+            for record in self._buffer
+        ]
+        with BulkWriter(
+            self.client, self.index, retry=self.retry, refresh="wait_for"
+        ) as writer:
+            writer.write(docs)
+        self._buffer = []
+
+    def _query(self, before: Optional[float] = None) -> dict:
+        filters = [{"term": {"revision": self.revision}}]
+        if before is not None:
+            filters.append({"range": {"time": {"lt": before}}})
+        return {"query": {"bool": {"filter": filters}}}
+
+    def read(self) -> List[dict]:
+        if not self.client.indices.exists(index=self.index):
+            return []
+        return [
+            {
+                "time": hit["_source"]["time"],
+                "revision": hit["_source"]["revision"],
+                "stage": hit["_source"]["stage"],
+                "index": hit["_source"]["index"],
+                "_id": hit["_source"].get("id"),
+                "_routing": hit["_source"].get("routing"),
+                "_source": hit["_source"].get("source"),
+                "error": hit["_source"].get("error"),
+            }
+            for hit in scan(self.client, query=self._query(), index=self.index)
+        ]
+
+    def remove(self, before: float) -> None:
+        with self._lock:
+            self._flush()
+        if self.client.indices.exists(index=self.index):
+            self.client.delete_by_query(
+                index=self.index,
+                body=self._query(before),
+                conflicts="proceed",
+                refresh=True,
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
@@ -0,0 +1,145 @@
+from typing import Dict, List, Optional, Tuple, Union
+
+from opensearchpy import OpenSearch
+from opensearchpy.exceptions import NotFoundError
+
+from opensearch_reindexer.checkpoint import checkpoint_index
+
+# Tracks changes with the sequence number of each shard instead of a field of the documents
+SEQ_NO = "_seq_no"
+
+# The value of the watermark field, or the sequence number of each shard by shard number
+Mark = Union[None, str, float, Dict[str, int]]
+
+
+class Watermark:
+    """Finds the documents of an index that changed since a high-water mark.
+
+    With a field of the documents, e.g. an "updated_at" date, the mark is the field's largest value
+    and documents whose field is at least the mark are changed. Documents without the field are
+    never changed. With ``SEQ_NO`` the mark is the largest sequence number of each shard, which
+    grows with every write to the shard, and documents with a larger sequence number are changed.
+
+    Deleted documents are never changed.
+
+    Arguments:
+        client (OpenSearch): The client of the cluster the index is on.
+        index (str): The index whose changes are tracked.
+        field (str): The watermark field, or ``SEQ_NO``.
+    """
+
+    def __init__(self, client: OpenSearch, index: str, field: str):
+        self.client = client
+        self.index = index
+        self.field = field
+        self._shards: Optional[int] = None
+
+    def shards(self) -> int:
+        if self._shards is None:
+            settings = self.client.indices.get_settings(
+                index=self.index, name="index.number_of_shards"
+            )
+            if len(settings) != 1:
+                raise ValueError(
+                    f'"{SEQ_NO}" requires "{self.index}" to be a single index, '
+                    f"got {', '.join(settings)}"
+                )
+            (index_settings,) = settings.values()
+            self._shards = int(index_settings["settings"]["index"]["number_of_shards"])
+        return self._shards
+
+    def take(self) -> Mark:
+        """Returns the current high-water mark, None if no document has the field."""
+        if self.field != SEQ_NO:
+            response = self.client.search(
+                index=self.index,
+                body={"size": 0, "aggs": {"mark": {"max": {"field": self.field}}}},
+            )
+            mark = response["aggregations"]["mark"]
+            return mark.get("value_as_string", mark["value"])
+
+        marks = {}
+        for shard in range(self.shards()):
+            hits = self.client.search(
+                index=self.index,
+                preference=f"_shards:{shard}",
+                body={
+                    "size": 1,
+                    "sort": [{SEQ_NO: "desc"}],
+                    "seq_no_primary_term": True,
+                    "_source": False,
+                },
+            )["hits"]["hits"]
+            marks[str(shard)] = hits[0]["_seq_no"] if hits else -1
+        return marks
+
+    def queries(self, mark: Mark) -> List[Tuple[Optional[str], dict]]:
+        """
+        Returns the queries matching the documents changed since ``mark``, with the ``preference`` of
+        the shard they must be run on, or None if they apply to the whole index.
+        """
+        if self.field != SEQ_NO:
+            if mark is None:
+                return [(None, {"exists": {"field": self.field}})]
+            return [(None, {"range": {self.field: {"gte": mark}}})]
+        return [
+            (f"_shards:{shard}", {"range": {SEQ_NO: {"gt": seq_no}}})
+            for shard, seq_no in mark.items()
+        ]
+
+    def changed(self, mark: Mark) -> int:
+        """Returns the number of documents changed since ``mark``."""
+        return sum(
+            self.client.count(
+                index=self.index, body={"query": query}, preference=preference
+            )["count"]
+            for preference, query in self.queries(mark)
+        )
+
+
+def store_watermark(
+    client: OpenSearch,
+    version_control_index: str,
+    revision: Optional[int],
+    field: str,
+    mark: Mark,
+) -> None:
+    """Stores the high-water mark a revision's last pass copied changes up to next to its checkpoint."""
+    if revision is None:
+        return
+    index = checkpoint_index(version_control_index)
+    client.indices.create(
+        index=index, body={"mappings": {"dynamic": False}}, ignore=400
+    )
+    client.index(
+        index=index,
+        id=f"revision-{revision}-watermark",
+        body={"revision": revision, "field": field, "watermark": mark},
+    )
+
+
+def stored_watermark(
+    client: OpenSearch, version_control_index: str, revision: Optional[int]
+) -> Optional[dict]:
+    """Returns the "field" and "watermark" stored by ``store_watermark``, None if there are none."""
+    if revision is None:
+        return None
+    try:
+        return client.get(
+            index=checkpoint_index(version_control_index),
+            id=f"revision-{revision}-watermark",
+        )["_source"]
+    except NotFoundError:
+        return None
+
+
+def delete_watermark(
+    client: OpenSearch, version_control_index: str, revision: Optional[int]
+) -> None:
+    if revision is None:
+        return
+    client.delete(
+        index=checkpoint_index(version_control_index),
+        id=f"revision-{revision}-watermark",
+        ignore=404,
+    )
@@ -21,10 +21,10 @@ def create_or_update_alias(client: OpenSearch, alias: str, index_name: str) -> N
         client.indices.update_aliases(
             body={
                 "actions": [
-                    {
-                        "remove": {"index": i, "alias": alias}
+                    *(
+                        {"remove": {"index": i, "alias": alias}}
                         for i in client.indices.get_alias(name=alias)
-                    },
+                    ),
                     {"add": {"index": index_name, "alias": alias}},
                 ]
             }
@@ -45,3 +45,57 @@ def increment_index(index_name) -> str:
         return "-".join(index_name.split("-")[:-1]) + "-" + str(suffix + 1)
     except ValueError:
         return index_name + "-0"
+
+
+def clone_client(client: OpenSearch) -> OpenSearch:
+    """Create a new client with the same hosts and connection settings as an existing client.
+    The new client has its own connection pool, which makes it suitable for use in a separate thread.
+
+    Arguments:
+        client (OpenSearch): The client to clone.
+
+    Returns:
+        OpenSearch: A new client connected to the same hosts.
+    """
+    transport = client.transport
+    return OpenSearch(
+        hosts=transport.hosts,
+        connection_class=transport.connection_class,
+        serializer=transport.serializer,
+        max_retries=transport.max_retries,
+        retry_on_status=transport.retry_on_status,
+        retry_on_timeout=transport.retry_on_timeout,
+        **transport.kwargs,
+    )
+
+
+def remote_source(client: OpenSearch) -> dict:
+    """Build the ``source.remote`` block of a reindex from remote that reads from the cluster of a client.
+    Uses the client's first host, its basic authentication and its timeout.
+
+    Arguments:
+        client (OpenSearch): The client of the cluster to read from.
+
+    Returns:
+        dict: The ``host`` and, if the client has them, ``username``, ``password``, ``socket_timeout``
+        and ``connect_timeout`` of the remote cluster.
+    """
+    transport = client.transport
+    host = {**transport.kwargs, **transport.hosts[0]}
+    scheme = host.get("scheme") or ("https" if host.get("use_ssl") else "http")
+    remote = {
+        "host": f"{scheme}://{host.get('host', 'localhost')}:{host.get('port', 9200)}"
+        f"{host.get('url_prefix', '')}"
+    }
+
+    auth = host.get("http_auth")
+    if isinstance(auth, str):
+        auth = auth.split(":", 1)
+    if isinstance(auth, (tuple, list)):
+        remote["username"], remote["password"] = auth
+
+    timeout = host.get("timeout")
+    if timeout is not None:
+        remote["socket_timeout"] = f"{timeout}s"
+        remote["connect_timeout"] = f"{timeout}s"
+    return remote
@@ -0,0 +1,176 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import IO, Dict, Optional, Tuple, Union
+
+# Stages of a python revision, in the order a batch goes through them
+STAGES = ("read", "transform", "bulk")
+
+
+class MetricsObserver:
+    """Receives the metrics of revisions as they run. Override the methods of interest and pass
+    instances to ``Config.metrics``. Methods may be called from several threads at once.
+    """
+
+    def on_stage(
+        self,
+        revision: Optional[int],
+        stage: str,
+        slice_id: Optional[int],
+        docs: int,
+        seconds: float,
+        bytes: int = 0,
+    ) -> None:
+        """Called each time a stage, one of ``STAGES``, has processed a batch of documents. ``bulk`` is
+        reported once per bulk request, with the size in bytes of the request, and without a slice."""
+
+    def on_retry(
+        self, revision: Optional[int], stage: str, docs: int, reason: str
+    ) -> None:
+        """Called before ``docs`` documents are sent or read again, e.g. after being ``"rejected"``."""
+
+    def on_revision(
+        self, revision: Optional[int], index: str, docs: int, seconds: float
+    ) -> None:
+        """Called once a revision has reindexed ``docs`` documents into ``index``."""
+
+
+class JsonLinesMetrics(MetricsObserver):
+    """Writes every metric as a line of JSON, with an ``event`` of "stage", "retry" or "revision".
+
+    Arguments:
+        file (Union[str, IO[str]]): The path of the file to append to, or an open text file.
+    """
+
+    def __init__(self, file: Union[str, IO[str]]):
+        self.file = open(file, "a") if isinstance(file, str) else file
+        self._lock = threading.Lock()
+
+    def _write(self, event: str, **fields) -> None:
+        line = json.dumps({"event": event, "time": time.time(), **fields})
+        with self._lock:
+            self.file.write(line + "\n")
+            self.file.flush()
+
+    def on_stage(self, revision, stage, slice_id, docs, seconds, bytes=0):
+        self._write(
+            "stage",
+            revision=revision,
+            stage=stage,
+            slice=slice_id,
+            docs=docs,
+            seconds=seconds,
+            bytes=bytes,
+        )
+
+    def on_retry(self, revision, stage, docs, reason):
+        self._write("retry", revision=revision, stage=stage, docs=docs, reason=reason)
+
+    def on_revision(self, revision, index, docs, seconds):
+        self._write(
+            "revision",
+            revision=revision,
+            index=index,
+            docs=docs,
+            seconds=seconds,
+            docs_per_second=docs / seconds if seconds > 0 else 0.0,
+        )
+
+
+class PrometheusMetrics(MetricsObserver):
+    """Aggregates metrics into counters in the Prometheus text exposition format.
+
+    With a ``path`` the metrics are written to that file whenever a revision completes, e.g. for
+    node_exporter's textfile collector. ``render`` returns them at any time.
+
+    Arguments:
+        path (str): Optionally, the file to write the metrics to.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        # (revision, stage) -> [batches, docs, seconds, bytes]
+        self.stages: Dict[Tuple[str, str], list] = defaultdict(lambda: [0, 0, 0.0, 0])
+        # (revision, stage, reason) -> docs
+        self.retries: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        # (revision, index) -> docs per second
+        self.revisions: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def on_stage(self, revision, stage, slice_id, docs, seconds, bytes=0):
+        with self._lock:
+            totals = self.stages[(str(revision), stage)]
+            totals[0] += 1
+            totals[1] += docs
+            totals[2] += seconds
+            totals[3] += bytes
+
+    def on_retry(self, revision, stage, docs, reason):
+        with self._lock:
+            self.retries[(str(revision), stage, reason)] += docs
+
+    def on_revision(self, revision, index, docs, seconds):
+        with self._lock:
+            self.revisions[(str(revision), index)] = (
+                docs / seconds if seconds > 0 else 0.0
+            )
+        if self.path is not None:
+            self.write(self.path)
+
+    def render(self) -> str:
+        lines = []
+
+        def metric(name: str, kind: str, help: str, samples: Dict[str, float]):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(
+                f"{name}{{{labels}}} {value}" for labels, value in samples.items()
+            )
+
+        with self._lock:
+            stages = {
+                f'revision="{revision}",stage="{stage}"': totals
+                for (revision, stage), totals in self.stages.items()
+            }
+            for i, (name, help) in enumerate(
+                [
+                    ("reindexer_batches_total", "Batches processed by each stage."),
+                    ("reindexer_documents_total", "Documents processed by each stage."),
+                    ("reindexer_stage_seconds_total", "Time spent in each stage."),
+                    ("reindexer_bytes_total", "Bytes sent by each stage."),
+                ]
+            ):
+                metric(
+                    name,
+                    "counter",
+                    help,
+                    {labels: totals[i] for labels, totals in stages.items()},
+                )
+            metric(
+                "reindexer_retried_documents_total",
+                "counter",
+                "Documents sent or read again.",
+                {
+                    f'revision="{revision}",stage="{stage}",reason="{reason}"': docs
+                    for (revision, stage, reason), docs in self.retries.items()
+                },
+            )
+            metric(
+                "reindexer_revision_documents_per_second",
+                "gauge",
+                "Documents reindexed per second by completed revisions.",
+                {
+                    f'revision="{revision}",index="{index}"': rate
+                    for (revision, index), rate in self.revisions.items()
+                },
+            )
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        # replace the file at once, so that it is never read half written
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as file:
+            file.write(self.render())
+        os.replace(temporary, path)
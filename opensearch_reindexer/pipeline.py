@@ -0,0 +1,123 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from queue import Empty, Full, Queue
+from typing import Any, Callable, Iterator, List, Optional
+
+# Marks the end of a stream of batches
+_DONE = object()
+
+# How often, in seconds, a blocked stage checks whether the pipeline was stopped
+_POLL_INTERVAL = 0.1
+
+
+class PipelineAborted(Exception):
+    """Raised in a stage when another stage of the pipeline has failed."""
+
+
+@dataclass
+class Batch:
+    slice_id: Optional[int]
+    hits: List[dict]
+    # the position of the batch within its slice
+    seq: int = 0
+    docs: List[Any] = field(default_factory=list)
+    # the sort values of the last hit, to resume reading after this batch
+    search_after: Optional[list] = None
+
+
+class Pipeline:
+    """Runs read, transform and write stages concurrently, connected by bounded queues.
+
+    Every reader runs in its own thread and puts batches on the read queue. A single
+    transform thread moves batches from the read queue to the write queue and the
+    writer runs on the calling thread. While batch N is being written, batch N + 1 is
+    being transformed and batch N + 2 is being read. At most ``queue_size`` batches
+    wait in each queue so memory stays bounded.
+
+    Arguments:
+        queue_size (int): The maximum number of batches waiting between two stages.
+    """
+
+    def __init__(self, queue_size: int):
+        self.read_queue = Queue(maxsize=queue_size)
+        self.write_queue = Queue(maxsize=queue_size)
+        self.stopped = threading.Event()
+
+    def run(
+        self,
+        readers: List[Callable[[], Iterator[Batch]]],
+        transform: Callable[[Batch], Batch],
+        write: Callable[[Batch], None],
+    ) -> None:
+        with ThreadPoolExecutor(
+            max_workers=len(readers) + 1, thread_name_prefix="reindexer"
+        ) as executor:
+            futures = [
+                executor.submit(self._stage, self._read, reader) for reader in readers
+            ]
+            futures.append(
+                executor.submit(self._stage, self._transform, transform, len(readers))
+            )
+            try:
+                self._stage(self._write, write)
+            except PipelineAborted:
+                # the stage that failed first raises its own error below
+                pass
+
+            for future in futures:
+                error = future.exception()
+                if error is not None and not isinstance(error, PipelineAborted):
+                    raise error
+
+    def _stage(self, fn: Callable, *args) -> None:
+        try:
+            fn(*args)
+        except BaseException:
+            self.stopped.set()
+            raise
+
+    def _put(self, queue: Queue, item) -> None:
+        while True:
+            if self.stopped.is_set():
+                raise PipelineAborted()
+            try:
+                queue.put(item, timeout=_POLL_INTERVAL)
+                return
+            except Full:
+                pass
+
+    def _get(self, queue: Queue):
+        while True:
+            if self.stopped.is_set():
+                raise PipelineAborted()
+            try:
+                return queue.get(timeout=_POLL_INTERVAL)
+            except Empty:
+                pass
+
+    def _read(self, reader: Callable[[], Iterator[Batch]]) -> None:
+        batches = reader()
+        try:
+            for batch in batches:
+                self._put(self.read_queue, batch)
+        finally:
+            # releases any server side resources held by the reader, e.g. scroll contexts
+            batches.close()
+        self._put(self.read_queue, _DONE)
+
+    def _transform(self, transform: Callable[[Batch], Batch], readers: int) -> None:
+        while readers > 0:
+            batch = self._get(self.read_queue)
+            if batch is _DONE:
+                readers -= 1
+                continue
+            self._put(self.write_queue, transform(batch))
+        self._put(self.write_queue, _DONE)
+
+    def _write(self, write: Callable[[Batch], None]) -> None:
+        while True:
+            batch = self._get(self.write_queue)
+            if batch is _DONE:
+                return
+            write(batch)
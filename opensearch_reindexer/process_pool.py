@@ -0,0 +1,67 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+# The migration transforming documents in a worker process
+_migration = None
+
+
+def _init_worker(migration_class: type, config) -> None:
+    global _migration
+    # clients aren't shared with worker processes, so BaseMigration.__init__ is skipped
+    _migration = migration_class.__new__(migration_class)
+    _migration.config = config
+
+
+def _transform_chunk(docs: List[dict]) -> List[Optional[dict]]:
+    return _migration.transform_batch(docs)
+
+
+def _ready() -> None:
+    pass
+
+
+class TransformPool:
+    """Runs a migration's ``transform_batch`` in a pool of worker processes, so that CPU bound
+    transforms are not limited to one core by the GIL.
+
+    Worker processes are forked when the pool is created, which should happen before any other
+    threads are started. The fork start method isn't available on Windows. Workers receive a copy
+    of the migration without its clients, so transforms run in the pool must not use
+    ``source_client`` or ``destination_client``.
+
+    Arguments:
+        migration (BaseMigration): The migration whose ``transform_batch`` is run.
+        processes (int): The number of worker processes.
+        chunk_size (int): The number of documents sent to a worker process at a time.
+    """
+
+    def __init__(self, migration, processes: int, chunk_size: int):
+        self.chunk_size = chunk_size
+        self.executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_worker,
+            initargs=(type(migration), migration.config),
+        )
+        # start the worker processes now, rather than from the pipeline's threads
+        for future in [self.executor.submit(_ready) for _ in range(processes)]:
+            future.result()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def transform(self, docs: List[dict]) -> List[Optional[dict]]:
+        chunks = [
+            docs[i : i + self.chunk_size] for i in range(0, len(docs), self.chunk_size)
+        ]
+        transformed = []
+        for chunk in self.executor.map(_transform_chunk, chunks):
+            transformed.extend(chunk)
+        return transformed
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,195 @@
+import json
+import sys
+import threading
+import time
+from enum import Enum
+from typing import Dict, Optional
+
+from rich import print
+from rich.progress import (
+    BarColumn,
+    Progress,
+    ProgressColumn,
+    Task,
+    TextColumn,
+    TimeRemainingColumn,
+)
+from rich.text import Text
+
+
+class ProgressMode(Enum):
+    # a live progress bar per slice
+    bar = "bar"
+    # a line of JSON every few seconds, for CI logs
+    json = "json"
+    # only a summary once the revision completes
+    quiet = "quiet"
+
+
+class _CountColumn(ProgressColumn):
+    def render(self, task: Task) -> Text:
+        total = "?" if task.total is None else f"{int(task.total):,}"
+        return Text(f"{int(task.completed):,}/{total}")
+
+
+class _RateColumn(ProgressColumn):
+    def render(self, task: Task) -> Text:
+        elapsed = task.elapsed or 0
+        if not elapsed:
+            return Text("")
+        docs = (task.completed - task.fields["initial"]) / elapsed
+        megabytes = task.fields["bytes"] / elapsed / 2**20
+        return Text(f"{docs:,.0f} docs/s {megabytes:.1f} MB/s")
+
+
+def create_display() -> Progress:
+    """Creates the live display progress bars are shown in. Rich shows one live display at a time, so
+    revisions that run at once share one."""
+    return Progress(
+        TextColumn("{task.description}"),
+        BarColumn(),
+        _CountColumn(),
+        _RateColumn(),
+        TimeRemainingColumn(),
+    )
+
+
+class ReindexProgress:
+    """Shows how many documents of each slice of a python revision have been indexed, with documents
+    and bytes per second and the time remaining.
+
+    Arguments:
+        mode (ProgressMode): How progress is shown.
+        description (str): What is being reindexed, e.g. '"source" to "destination"'.
+        total (Optional[int]): The number of documents to index, or None if unknown.
+        slices (int): The number of slices the source index is read with.
+        indexed (int): The number of documents already indexed, e.g. before resuming from a checkpoint.
+        interval (float): The minimum number of seconds between two lines of JSON.
+        display (Optional[Progress]): A live display shared with other revisions, see
+            ``create_display``, which is started and stopped by its owner. By default the progress
+            bars get a display of their own.
+    """
+
+    def __init__(
+        self,
+        mode: ProgressMode,
+        description: str,
+        total: Optional[int],
+        slices: int = 1,
+        indexed: int = 0,
+        interval: float = 10.0,
+        display: Optional[Progress] = None,
+    ):
+        self.mode = mode
+        self.description = description
+        self.total = total
+        self.slices = slices
+        self.interval = interval
+        self.initial = indexed
+        self.indexed = indexed
+        self.bytes = 0
+        # slice id -> documents indexed
+        self.slice_indexed: Dict[Optional[int], int] = {}
+        self._started = time.monotonic()
+        self._logged_at = self._started
+        self._lock = threading.Lock()
+
+        self._progress: Optional[Progress] = None
+        self._shared = display is not None
+        self._tasks = {}
+        if mode == ProgressMode.bar:
+            self._progress = display or create_display()
+            self._tasks[None] = self._add_task(description, total, indexed)
+            if slices > 1:
+                # slices are about the same size
+                slice_total = None if total is None else -(-total // slices)
+                for slice_id in range(slices):
+                    self._tasks[slice_id] = self._add_task(
+                        f"  slice {slice_id + 1}", slice_total, 0
+                    )
+
+    def _add_task(self, description: str, total: Optional[int], indexed: int):
+        return self._progress.add_task(
+            description, total=total, completed=indexed, initial=indexed, bytes=0
+        )
+
+    def __enter__(self):
+        if self._progress is not None and not self._shared:
+            self._progress.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._progress is not None:
+            if self._shared:
+                # the display outlives the revision, whose summary replaces its bars
+                for task_id in self._tasks.values():
+                    self._progress.remove_task(task_id)
+            else:
+                self._progress.stop()
+        self.summary()
+
+    def sent(self, slice_id: Optional[int], bytes: int) -> None:
+        """Records that ``bytes`` bytes of a slice's documents were sent to the destination cluster."""
+        with self._lock:
+            self.bytes += bytes
+            if self._progress is not None:
+                for key in {None, slice_id}:
+                    task = self._progress.tasks[self._tasks[key]]
+                    self._progress.update(
+                        self._tasks[key], bytes=task.fields["bytes"] + bytes
+                    )
+
+    def advance(self, slice_id: Optional[int], docs: int) -> None:
+        """Records that ``docs`` documents of a slice have been indexed."""
+        with self._lock:
+            self.indexed += docs
+            self.slice_indexed[slice_id] = self.slice_indexed.get(slice_id, 0) + docs
+            log = (
+                self.mode == ProgressMode.json
+                and time.monotonic() - self._logged_at >= self.interval
+            )
+            if log:
+                self._logged_at = time.monotonic()
+            if self._progress is not None:
+                for key in {None, slice_id}:
+                    self._progress.advance(self._tasks[key], docs)
+        if log:
+            self.log()
+
+    def state(self) -> dict:
+        elapsed = time.monotonic() - self._started
+        rate = (self.indexed - self.initial) / elapsed if elapsed > 0 else 0.0
+        remaining = None
+        if self.total is not None and rate > 0:
+            remaining = max(self.total - self.indexed, 0) / rate
+        return {
+            "description": self.description,
+            "indexed": self.indexed,
+            "total": self.total,
+            "docs_per_second": round(rate, 1),
+            "bytes_per_second": round(self.bytes / elapsed if elapsed > 0 else 0.0, 1),
+            "eta_seconds": None if remaining is None else round(remaining, 1),
+            "slices": {
+                str(slice_id or 0): indexed
+                for slice_id, indexed in sorted(
+                    self.slice_indexed.items(), key=lambda item: item[0] or 0
+                )
+            },
+        }
+
+    def log(self) -> None:
+        # printed without rich, so that the line stays valid JSON
+        with self._lock:
+            line = json.dumps(self.state())
+        sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+
+    def summary(self) -> None:
+        if self.mode == ProgressMode.json:
+            self.log()
+            return
+        state = self.state()
+        print(
+            f"Indexed {state['indexed']:,} documents from {self.description}, "
+            f"{state['docs_per_second']:,.0f} docs/s"
+        )
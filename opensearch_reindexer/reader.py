@@ -0,0 +1,132 @@
+from typing import Iterator, List, Optional
+
+from opensearchpy import OpenSearch
+
+from opensearch_reindexer.retry import Retry
+
+# Sorts hits in index order, the most efficient order to page through a point in time
+SHARD_DOC_SORT = [{"_shard_doc": "asc"}]
+
+
+def scroll_hits(
+    client: OpenSearch,
+    index: str,
+    size: int,
+    keep_alive: str,
+    slice_body: Optional[dict] = None,
+    query: Optional[dict] = None,
+    preference: Optional[str] = None,
+    retry: Optional[Retry] = None,
+) -> Iterator[List[dict]]:
+    """Reads all documents of an index, one page of hits at a time, using the scroll API.
+
+    Arguments:
+        client (OpenSearch): The client to search with.
+        index (str): The index to read.
+        size (int): The number of hits per page.
+        keep_alive (str): How long the scroll context is kept alive between pages, e.g. "2m".
+        slice_body (dict): Optionally, the slice of the index to read, e.g. {"id": 0, "max": 2}.
+        query (dict): Optionally, only read the documents matching this query.
+        preference (str): Optionally, the shards to read, e.g. "_shards:0".
+        retry (Retry): Optionally, how searches that fail with a transient error are retried.
+
+    Returns:
+        Iterator[List[dict]]: Pages of hits. The scroll context is cleared once the iterator is
+        exhausted or closed.
+    """
+    retry = retry or Retry(max_retries=0)
+    body = {}
+    if slice_body is not None:
+        body["slice"] = slice_body
+    if query is not None:
+        body["query"] = query
+    params = {}
+    if preference is not None:
+        params["preference"] = preference
+
+    # Init scroll by search
+    data = retry.call(
+        client.search, index=index, scroll=keep_alive, size=size, body=body, **params
+    )
+
+    # Get the scroll ID
+    sid = data["_scroll_id"]
+    try:
+        # Get the number of results that returned in the last scroll
+        while len(data["hits"]["hits"]) > 0:
+            yield data["hits"]["hits"]
+
+            data = retry.call(client.scroll, scroll_id=sid, scroll=keep_alive)
+
+            # Update the scroll ID
+            sid = data["_scroll_id"]
+    finally:
+        client.clear_scroll(scroll_id=sid)
+
+
+def point_in_time_hits(
+    client: OpenSearch,
+    index: str,
+    size: int,
+    keep_alive: str,
+    slice_body: Optional[dict] = None,
+    search_after: Optional[list] = None,
+    query: Optional[dict] = None,
+    sort: Optional[List[dict]] = None,
+    retry: Optional[Retry] = None,
+) -> Iterator[List[dict]]:
+    """Reads all documents of an index, one page of hits at a time, using a point in time and
+    ``search_after``. Unlike a scroll, reading can be resumed from the sort values of the last hit
+    of a page, which are found in ``hit["sort"]``.
+
+    Arguments:
+        client (OpenSearch): The client to search with.
+        index (str): The index to read.
+        size (int): The number of hits per page.
+        keep_alive (str): How long the point in time is kept alive between pages, e.g. "2m".
+        slice_body (dict): Optionally, the slice of the index to read, e.g. {"id": 0, "max": 2}.
+        search_after (list): Optionally, the sort values of the hit to resume reading after.
+        query (dict): Optionally, only read the documents matching this query.
+        sort (List[dict]): The sort the index is read in, ``SHARD_DOC_SORT`` by default. Resuming in
+            another point in time requires a sort on fields that are unique together.
+        retry (Retry): Optionally, how searches that fail with a transient error are retried.
+
+    Returns:
+        Iterator[List[dict]]: Pages of hits. The point in time is deleted once the iterator is
+        exhausted or closed.
+    """
+    retry = retry or Retry(max_retries=0)
+    # the point in time APIs are called through the transport to support all 2.x clients
+    pit_id = retry.call(
+        client.transport.perform_request,
+        "POST",
+        f"/{index}/_search/point_in_time",
+        params={"keep_alive": keep_alive},
+    )["pit_id"]
+    try:
+        while True:
+            body = {
+                "size": size,
+                "pit": {"id": pit_id, "keep_alive": keep_alive},
+                "sort": sort or SHARD_DOC_SORT,
+            }
+            if slice_body is not None:
+                body["slice"] = slice_body
+            if search_after is not None:
+                body["search_after"] = search_after
+            if query is not None:
+                body["query"] = query
+
+            data = retry.call(client.search, body=body)
+            # the point in time id may change between searches
+            pit_id = data.get("pit_id", pit_id)
+
+            hits = data["hits"]["hits"]
+            if len(hits) == 0:
+                return
+            yield hits
+            search_after = hits[-1]["sort"]
+    finally:
+        client.transport.perform_request(
+            "DELETE", "/_search/point_in_time", body={"pit_id": [pit_id]}
+        )
@@ -0,0 +1,68 @@
+import random
+import time
+from typing import Callable, Optional, TypeVar
+
+from opensearchpy.exceptions import ConnectionError, ConnectionTimeout, TransportError
+
+T = TypeVar("T")
+
+# Statuses of requests and bulk items that may succeed when sent again: rejected because the
+# cluster is overloaded (es_rejected_execution_exception), or a node being unavailable
+RETRY_STATUSES = (429, 502, 503, 504)
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether a request that failed with ``error`` may succeed when sent again. Timeouts are not,
+    as the request may have been executed."""
+    if isinstance(error, ConnectionTimeout):
+        return False
+    if isinstance(error, ConnectionError):
+        return True
+    return isinstance(error, TransportError) and error.status_code in RETRY_STATUSES
+
+
+class Retry:
+    """Retries transient failures with exponential backoff and full jitter.
+
+    Arguments:
+        max_retries (int): How many times a request is sent again.
+        initial_backoff (float): The longest backoff in seconds after the first failure, doubled
+            after each further failure.
+        max_backoff (float): The longest backoff in seconds.
+        on_retry (Callable[[str], None]): Optionally, called with the reason before each retry.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 8,
+        initial_backoff: float = 0.5,
+        max_backoff: float = 60.0,
+        on_retry: Optional[Callable[[str], None]] = None,
+    ):
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.on_retry = on_retry
+
+    def can_retry(self, attempt: int) -> bool:
+        return attempt < self.max_retries
+
+    def backoff(self, attempt: int) -> float:
+        """How long to wait for before the retry that follows ``attempt`` failed attempts, in seconds."""
+        return random.uniform(
+            0, min(self.max_backoff, self.initial_backoff * 2**attempt)
+        )
+
+    def call(self, function: Callable[..., T], *args, **kwargs) -> T:
+        """Calls ``function`` until it doesn't raise a transient error, or retries are exhausted."""
+        attempt = 0
+        while True:
+            try:
+                return function(*args, **kwargs)
+            except TransportError as e:
+                if not is_transient(e) or not self.can_retry(attempt):
+                    raise
+                if self.on_retry is not None:
+                    self.on_retry(f"status {e.status_code}")
+                time.sleep(self.backoff(attempt))
+                attempt += 1
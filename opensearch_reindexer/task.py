@@ -0,0 +1,190 @@
+import threading
+import time
+from typing import Dict, Optional
+
+from opensearchpy import OpenSearch
+from opensearchpy.exceptions import NotFoundError
+from rich import print
+
+from opensearch_reindexer.checkpoint import checkpoint_index
+
+
+def stored_tasks(client: OpenSearch, version_control_index: str) -> Dict[int, dict]:
+    """
+    Returns the reindex tasks of painless revisions that have been started and not yet completed.
+
+    Arguments:
+        client (OpenSearch): The client of the cluster holding the version control index.
+        version_control_index (str): The name of the version control index.
+
+    Returns:
+        Dict[int, dict]: The ``task`` id of each revision's task, and whether it is ``remote``, i.e. runs on
+        the destination cluster, by the revision's version.
+    """
+    try:
+        hits = client.search(
+            index=checkpoint_index(version_control_index),
+            body={"query": {"match_all": {}}},
+            size=1000,
+        )["hits"]["hits"]
+    except NotFoundError:
+        return {}
+    return {
+        hit["_source"]["revision"]: hit["_source"]
+        for hit in hits
+        if "task" in hit["_source"]
+    }
+
+
+class ReindexTaskError(Exception):
+    """Raised when a reindex task fails or completes with failures."""
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m{seconds:02d}s"
+    if minutes:
+        return f"{minutes}m{seconds:02d}s"
+    return f"{seconds}s"
+
+
+class ReindexTask:
+    """Follows a reindex that runs as a task on the cluster, submitted with ``wait_for_completion=false``.
+
+    The task's id is stored in the sidecar index of the version control index, next to the checkpoints
+    of python revisions, until ``forget`` is called. A revision that is run again while its task is still
+    running reattaches to it instead of starting a second reindex. Nothing is stored without a revision.
+
+    Arguments:
+        client (OpenSearch): The client of the cluster running the reindex.
+        version_control_client (OpenSearch): The client of the cluster holding the version control index.
+        version_control_index (str): The name of the version control index.
+        revision (Optional[int]): The version of the revision the reindex belongs to.
+        poll_interval (float): The number of seconds between two polls of the ``_tasks`` API.
+        interrupted (Optional[threading.Event]): Optionally, interrupts ``wait`` like Ctrl-C once set, e.g.
+            from the main thread while the task is followed from another one.
+    """
+
+    def __init__(
+        self,
+        client: OpenSearch,
+        version_control_client: OpenSearch,
+        version_control_index: str,
+        revision: Optional[int],
+        poll_interval: float = 5.0,
+        interrupted: Optional[threading.Event] = None,
+    ):
+        self.client = client
+        self.version_control_client = version_control_client
+        self.index = checkpoint_index(version_control_index)
+        self.id = f"revision-{revision}-task" if revision is not None else None
+        self.revision = revision
+        self.poll_interval = poll_interval
+        self.interrupted = interrupted
+        self.task_id: Optional[str] = None
+
+    def start(self, body: dict, **params) -> str:
+        response = self.client.reindex(body=body, wait_for_completion=False, **params)
+        self.task_id = response["task"]
+        if self.id is None:
+            return self.task_id
+
+        self.version_control_client.indices.create(
+            index=self.index, body={"mappings": {"dynamic": False}}, ignore=400
+        )
+        self.version_control_client.index(
+            index=self.index,
+            id=self.id,
+            body={
+                "revision": self.revision,
+                "task": self.task_id,
+                # whether the task runs on the destination cluster
+                "remote": self.client is not self.version_control_client,
+            },
+            refresh=True,
+        )
+        return self.task_id
+
+    def reattach(self) -> bool:
+        """Looks up the stored task of the revision. Returns False if there is none, or if the cluster
+        no longer knows about it."""
+        if self.id is None:
+            return False
+        try:
+            self.task_id = self.version_control_client.get(
+                index=self.index, id=self.id
+            )["_source"]["task"]
+            self.client.tasks.get(task_id=self.task_id)
+        except NotFoundError:
+            self.task_id = None
+            return False
+        return True
+
+    def wait(self) -> dict:
+        """
+        Polls the task until it completes, printing its progress. Cancels the task if interrupted.
+
+        Returns:
+            dict: The response of the reindex, as returned by a reindex that waits for completion.
+        """
+        try:
+            while True:
+                task = self.client.tasks.get(task_id=self.task_id)
+                self.print_progress(task)
+                if task.get("completed"):
+                    break
+                self._sleep()
+        except KeyboardInterrupt:
+            self.cancel()
+            raise
+
+        # the reindex has ended, running the revision again must start a new one
+        self.forget()
+        if "error" in task:
+            raise ReindexTaskError(
+                f"Reindex task {self.task_id} failed: {task['error']}"
+            )
+        response = task.get("response", {})
+        failures = response.get("failures") or []
+        if failures:
+            raise ReindexTaskError(
+                f"Reindex task {self.task_id} completed with {len(failures)} failures, "
+                f"the first was: {failures[0]}"
+            )
+        return response
+
+    def _sleep(self) -> None:
+        if self.interrupted is None:
+            time.sleep(self.poll_interval)
+        elif self.interrupted.wait(self.poll_interval):
+            raise KeyboardInterrupt()
+
+    def print_progress(self, task: dict) -> None:
+        status = task["task"]["status"]
+        done = status["created"] + status["updated"] + status["deleted"]
+        total = status["total"]
+        elapsed = task["task"]["running_time_in_nanos"] / 1e9
+        rate = done / elapsed if elapsed > 0 else 0.0
+
+        message = f"Task {self.task_id}: {done}/{total} documents, {rate:.0f} docs/s"
+        if not task.get("completed") and rate > 0 and total > done:
+            message += f", ETA {_format_duration((total - done) / rate)}"
+        if status.get("version_conflicts"):
+            message += f", {status['version_conflicts']} version conflicts"
+        failures = task.get("response", {}).get("failures")
+        if failures:
+            message += f", [bold red]{len(failures)} failures[/bold red]"
+        print(message)
+
+    def cancel(self) -> None:
+        print(f"[bold yellow]Cancelling reindex task {self.task_id}[/bold yellow]")
+        self.client.tasks.cancel(task_id=self.task_id)
+        self.forget()
+
+    def forget(self) -> None:
+        """Removes the stored task, so that running the revision again starts a new reindex."""
+        if self.id is None:
+            return
+        self.version_control_client.delete(index=self.index, id=self.id, ignore=404)
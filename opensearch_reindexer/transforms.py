@@ -0,0 +1,312 @@
+import json
+from copy import deepcopy
+from dataclasses import dataclass
+from typing import Any, Callable, List, Tuple
+
+# Types fields can be converted to
+CONVERT_TYPES = ("string", "integer", "long", "float", "double", "boolean")
+
+
+@dataclass
+class Rename:
+    """Renames ``field`` to ``to``. Both may be dotted paths to nested fields."""
+
+    field: str
+    to: str
+
+
+@dataclass
+class Remove:
+    """Removes ``field``."""
+
+    field: str
+
+
+@dataclass
+class Set:
+    """Sets ``field`` to ``value``. With ``override=False`` only missing or null fields are set."""
+
+    field: str
+    value: Any
+    override: bool = True
+
+
+@dataclass
+class Convert:
+    """Converts the value of ``field`` to ``type``, one of ``CONVERT_TYPES``."""
+
+    field: str
+    type: str
+
+    def __post_init__(self):
+        if self.type not in CONVERT_TYPES:
+            raise ValueError(
+                f'Expected a type of {", ".join(CONVERT_TYPES)} but got "{self.type}"'
+            )
+
+
+@dataclass
+class JsonEncode:
+    """Replaces the value of ``field`` with its compact JSON encoding."""
+
+    field: str
+
+
+def _split(path: str) -> Tuple[tuple, str]:
+    parts = path.split(".")
+    return tuple(parts[:-1]), parts[-1]
+
+
+def _parent(doc: dict, path: tuple):
+    for key in path:
+        doc = doc.get(key)
+        if not isinstance(doc, dict):
+            return None
+    return doc
+
+
+def _ensure_parent(doc: dict, path: tuple) -> dict:
+    for key in path:
+        if not isinstance(doc.get(key), dict):
+            doc[key] = {}
+        doc = doc[key]
+    return doc
+
+
+def _to_string(value) -> str:
+    # matches painless' String.valueOf
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _to_boolean(value) -> bool:
+    if isinstance(value, str):
+        return value.lower() == "true"
+    return bool(value)
+
+
+_CONVERTERS = {
+    "string": _to_string,
+    "integer": int,
+    "long": int,
+    "float": float,
+    "double": float,
+    "boolean": _to_boolean,
+}
+
+
+def compile_transforms(operations: List[Any]) -> Callable[[dict], dict]:
+    """Compiles a list of field operations into a single function that applies all of them to a
+    document, in order. The operations are turned into Python source once, so transforming a
+    document doesn't loop over or inspect the operations.
+
+    Arguments:
+        operations (List[Any]): ``Rename``, ``Remove``, ``Set``, ``Convert`` and ``JsonEncode`` operations.
+
+    Returns:
+        Callable[[dict], dict]: A function that transforms a document's ``_source`` in place and returns it.
+    """
+    namespace = {
+        "_parent": _parent,
+        "_ensure_parent": _ensure_parent,
+        "_deepcopy": deepcopy,
+        "_json_dumps": json.dumps,
+    }
+    lines = ["def transform(doc):"]
+
+    def parent(path: tuple, create: bool = False) -> str:
+        if not path:
+            return "doc"
+        return f"{'_ensure_parent' if create else '_parent'}(doc, {path!r})"
+
+    for i, op in enumerate(operations):
+        path, key = _split(op.field)
+        if not isinstance(op, Set):
+            lines.append(f"    _p = {parent(path)}")
+
+        if isinstance(op, Rename):
+            to_path, to_key = _split(op.to)
+            lines += [
+                f"    if _p is not None and {key!r} in _p:",
+                f"        _v = _p.pop({key!r})",
+                f"        {parent(to_path, create=True)}[{to_key!r}] = _v",
+            ]
+        elif isinstance(op, Remove):
+            lines += [
+                "    if _p is not None:",
+                f"        _p.pop({key!r}, None)",
+            ]
+        elif isinstance(op, Set):
+            namespace[f"_v{i}"] = op.value
+            value = f"_v{i}"
+            if isinstance(op.value, (dict, list)):
+                # documents must not share mutable values
+                value = f"_deepcopy(_v{i})"
+            if op.override:
+                lines.append(f"    {parent(path, create=True)}[{key!r}] = {value}")
+            else:
+                lines += [
+                    f"    _p = {parent(path, create=True)}",
+                    f"    if _p.get({key!r}) is None:",
+                    f"        _p[{key!r}] = {value}",
+                ]
+        elif isinstance(op, Convert):
+            namespace[f"_convert{i}"] = _CONVERTERS[op.type]
+            lines += [
+                f"    if _p is not None and _p.get({key!r}) is not None:",
+                f"        _p[{key!r}] = _convert{i}(_p[{key!r}])",
+            ]
+        elif isinstance(op, JsonEncode):
+            lines += [
+                f"    if _p is not None and {key!r} in _p:",
+                f"        _p[{key!r}] = _json_dumps(_p[{key!r}], separators=(',', ':'), ensure_ascii=False)",
+            ]
+        else:
+            raise ValueError(f"Unsupported transform operation {op!r}")
+    lines.append("    return doc")
+
+    exec("\n".join(lines), namespace)
+    return namespace["transform"]
+
+
+# Painless functions used by the scripts generated by to_painless
+_PAINLESS_FUNCTIONS = {
+    "parentOf": """Map parentOf(Map doc, List path) {
+  def p = doc;
+  for (String key : path) {
+    if (!(p instanceof Map)) { return null; }
+    p = p.get(key);
+  }
+  return p instanceof Map ? p : null;
+}""",
+    "ensureParent": """Map ensureParent(Map doc, List path) {
+  Map p = doc;
+  for (String key : path) {
+    if (!(p.get(key) instanceof Map)) { p.put(key, new HashMap()); }
+    p = p.get(key);
+  }
+  return p;
+}""",
+    # escapes strings like json.dumps(ensure_ascii=False), painless has no char literals
+    "jsonEncode": r"""String jsonString(String s) {
+  StringBuilder sb = new StringBuilder('"');
+  for (int i = 0; i < s.length(); ++i) {
+    char c = s.charAt(i);
+    if (c == 34) { sb.append('\\"'); }
+    else if (c == 92) { sb.append('\\\\'); }
+    else if (c == 8) { sb.append('\\b'); }
+    else if (c == 9) { sb.append('\\t'); }
+    else if (c == 10) { sb.append('\\n'); }
+    else if (c == 12) { sb.append('\\f'); }
+    else if (c == 13) { sb.append('\\r'); }
+    else if (c < 32) { sb.append(c < 16 ? '\\u000' : '\\u001').append(Integer.toHexString(c % 16)); }
+    else { sb.append(s.substring(i, i + 1)); }
+  }
+  return sb.append('"').toString();
+}
+String jsonEncode(def v) {
+  if (v == null) { return 'null'; }
+  if (v instanceof String) { return jsonString(v); }
+  if (v instanceof Map) {
+    StringBuilder sb = new StringBuilder('{');
+    boolean first = true;
+    for (def entry : v.entrySet()) {
+      if (!first) { sb.append(','); }
+      first = false;
+      sb.append(jsonString(entry.getKey().toString())).append(':').append(jsonEncode(entry.getValue()));
+    }
+    return sb.append('}').toString();
+  }
+  if (v instanceof List) {
+    StringBuilder sb = new StringBuilder('[');
+    boolean first = true;
+    for (def item : v) {
+      if (!first) { sb.append(','); }
+      first = false;
+      sb.append(jsonEncode(item));
+    }
+    return sb.append(']').toString();
+  }
+  return v.toString();
+}""",
+}
+
+_PAINLESS_CONVERTERS = {
+    "string": "String.valueOf(v)",
+    "integer": "v instanceof String ? Integer.parseInt(v) : ((Number) v).intValue()",
+    "long": "v instanceof String ? Long.parseLong(v) : ((Number) v).longValue()",
+    "float": "v instanceof String ? Float.parseFloat(v) : ((Number) v).floatValue()",
+    "double": "v instanceof String ? Double.parseDouble(v) : ((Number) v).doubleValue()",
+    "boolean": "v instanceof Boolean ? v : (v instanceof String ? v.equalsIgnoreCase('true') : ((Number) v).doubleValue() != 0)",
+}
+
+
+def _painless_string(value: str) -> str:
+    # painless string literals only escape quotes and backslashes, any other character is literal
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def to_painless(operations: List[Any]) -> dict:
+    """Converts a list of field operations into an equivalent painless script, to run them
+    server side in a reindex.
+
+    Arguments:
+        operations (List[Any]): ``Rename``, ``Remove``, ``Set``, ``Convert`` and ``JsonEncode`` operations.
+
+    Returns:
+        dict: The script, to be used as the "script" of a reindex body.
+    """
+    functions = set()
+    params = {}
+    statements = []
+
+    def parent(path: tuple, create: bool = False) -> str:
+        if not path:
+            return "ctx._source"
+        function = "ensureParent" if create else "parentOf"
+        functions.add(function)
+        return f"{function}(ctx._source, [{', '.join(map(_painless_string, path))}])"
+
+    for i, op in enumerate(operations):
+        path, key = _split(op.field)
+        key = _painless_string(key)
+        if not isinstance(op, Set):
+            statements.append(f"p = {parent(path)};")
+
+        if isinstance(op, Rename):
+            to_path, to_key = _split(op.to)
+            statements.append(
+                f"if (p != null && p.containsKey({key})) "
+                f"{{ def v = p.remove({key}); {parent(to_path, create=True)}.put({_painless_string(to_key)}, v); }}"
+            )
+        elif isinstance(op, Remove):
+            statements.append(f"if (p != null) {{ p.remove({key}); }}")
+        elif isinstance(op, Set):
+            params[f"v{i}"] = op.value
+            if op.override:
+                statements.append(
+                    f"{parent(path, create=True)}.put({key}, params.v{i});"
+                )
+            else:
+                statements.append(
+                    f"p = {parent(path, create=True)}; if (p.get({key}) == null) {{ p.put({key}, params.v{i}); }}"
+                )
+        elif isinstance(op, Convert):
+            statements.append(
+                f"if (p != null && p.get({key}) != null) "
+                f"{{ def v = p.get({key}); p.put({key}, {_PAINLESS_CONVERTERS[op.type]}); }}"
+            )
+        elif isinstance(op, JsonEncode):
+            functions.add("jsonEncode")
+            statements.append(
+                f"if (p != null && p.containsKey({key})) {{ p.put({key}, jsonEncode(p.get({key}))); }}"
+            )
+        else:
+            raise ValueError(f"Unsupported transform operation {op!r}")
+
+    # painless functions must be declared before any statement
+    source = [_PAINLESS_FUNCTIONS[name] for name in sorted(functions)]
+    source.append("def p;")
+    source += statements
+    return {"lang": "painless", "source": "\n".join(source), "params": params}
@@ -0,0 +1,80 @@
+import hashlib
+import json
+from typing import Callable, Iterable, List, Optional
+
+# Digests are summed modulo this, so that a hash doesn't depend on the order documents are read in
+DIGEST_MODULUS = 2**128
+
+
+def canonical(source: Optional[dict]) -> bytes:
+    """Serializes a document with sorted keys, so that equal documents serialize the same."""
+    return json.dumps(
+        source, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    ).encode()
+
+
+def digest(id: Optional[str], source: Optional[dict]) -> int:
+    """A 128 bit digest of a document's ``_id``, if given, and ``_source``."""
+    data = canonical(source) if id is None else f"{id}\0".encode() + canonical(source)
+    return int.from_bytes(hashlib.blake2b(data, digest_size=16).digest(), "big")
+
+
+class StreamingHash:
+    """An order independent hash of a stream of documents, with a constant size. Hashes of the
+    slices of an index add up to the hash of the whole index, however it was sliced.
+
+    Arguments:
+        include_ids (bool): Whether the ``_id`` of documents is part of the hash.
+    """
+
+    def __init__(self, include_ids: bool = True):
+        self.include_ids = include_ids
+        self.count = 0
+        self.value = 0
+
+    def add(self, hits: Iterable[dict]) -> None:
+        for hit in hits:
+            id = hit.get("_id") if self.include_ids else None
+            self.value = (self.value + digest(id, hit["_source"])) % DIGEST_MODULUS
+            self.count += 1
+
+    def __add__(self, other: "StreamingHash") -> "StreamingHash":
+        total = StreamingHash(self.include_ids)
+        total.count = self.count + other.count
+        total.value = (self.value + other.value) % DIGEST_MODULUS
+        return total
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, StreamingHash)
+            and self.count == other.count
+            and self.value == other.value
+        )
+
+    def __repr__(self) -> str:
+        return f"{self.count} documents, hash {self.value:032x}"
+
+
+def hash_pages(
+    pages: Iterable[List[dict]],
+    include_ids: bool = True,
+    transform: Optional[Callable[[List[dict]], List[Optional[dict]]]] = None,
+) -> StreamingHash:
+    """
+    Hashes pages of hits, e.g. of ``reader.scroll_hits``, one page at a time.
+
+    Arguments:
+        pages (Iterable[List[dict]]): The pages of hits to hash.
+        include_ids (bool): Whether the ``_id`` of documents is part of the hash.
+        transform (Callable): Optionally, transforms the hits of a page before they are hashed. Hits
+            transformed to None are left out.
+
+    Returns:
+        StreamingHash: The hash of the documents.
+    """
+    hashed = StreamingHash(include_ids)
+    for hits in pages:
+        if transform is not None:
+            hits = [hit for hit in transform(hits) if hit is not None]
+        hashed.add(hits)
+    return hashed
@@ -0,0 +1,352 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, NamedTuple, Optional
+
+from opensearchpy import OpenSearch
+from opensearchpy.exceptions import TransportError
+from opensearchpy.helpers import BulkIndexError, expand_action
+from rich import print
+
+from opensearch_reindexer.helper import clone_client
+from opensearch_reindexer.retry import RETRY_STATUSES, Retry, is_transient
+
+# Called with the number of documents indexed and the errors of the bulk requests of a write
+OnResponse = Callable[[int, List[dict]], None]
+# Called with the number of documents, size in bytes and duration in seconds of each bulk request
+OnRequest = Callable[[int, int, float], None]
+# Called with the action, source (None for deletes) and error of each document that failed permanently
+OnFailure = Callable[[dict, Optional[dict], dict], None]
+
+
+class _WriteResponse:
+    """Reports the documents of a ``write`` as one response, once all of them have been indexed or
+    have failed, whichever bulk requests they were sent in."""
+
+    def __init__(self, docs: int, on_response: Optional[OnResponse]):
+        self.pending = docs
+        self.on_response = on_response
+        self.success = 0
+        self.errors = []
+        self._lock = threading.Lock()
+
+    def __call__(self, docs: int, success: int, errors: List[dict]) -> None:
+        with self._lock:
+            self.pending -= docs
+            self.success += success
+            self.errors.extend(errors)
+            if self.pending > 0 or self.on_response is None:
+                return
+        self.on_response(self.success, self.errors)
+
+
+class _BulkItem(NamedTuple):
+    # the serialized action and source lines of a document, encoded as UTF-8
+    body: bytes
+    # the action and source of a document, reported when it fails to index
+    data: tuple
+    # the write the document belongs to
+    write: _WriteResponse
+
+
+class AdaptiveBatchSize:
+    """Adjusts the size in bytes of bulk requests from their latency and rejections.
+
+    The size starts at a quarter of ``max_bytes``. It grows while bulk requests complete in less
+    than half of ``target_latency`` and shrinks when they take longer than ``target_latency``.
+    When the cluster rejects a request the size is halved.
+
+    Arguments:
+        max_bytes (int): The largest size in bytes of a bulk request.
+        target_latency (float): The desired duration in seconds of a bulk request.
+        min_bytes (int): The smallest size in bytes of a bulk request.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        target_latency: float,
+        min_bytes: int = 64 * 1024,
+    ):
+        self.max_bytes = max_bytes
+        self.min_bytes = min(min_bytes, max_bytes)
+        self.target_latency = target_latency
+        self.bytes = max(self.min_bytes, max_bytes // 4)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            if latency > self.target_latency:
+                self._resize(self.bytes // 2, f"latency {latency:.2f}s")
+            elif latency < self.target_latency / 2:
+                self._resize(int(self.bytes * 1.5), f"latency {latency:.2f}s")
+
+    def reject(self) -> None:
+        """Shrinks the size after a rejection."""
+        with self._lock:
+            self._resize(self.bytes // 2, "rejected by cluster")
+
+    def _resize(self, size: int, reason: str) -> None:
+        size = max(self.min_bytes, min(self.max_bytes, size))
+        if size != self.bytes:
+            self.bytes = size
+            print(f"Bulk request size set to {size} bytes ({reason})")
+
+
+class BulkWriter:
+    """Sends bulk requests to an index, optionally from a pool of worker threads.
+
+    With a ``concurrency`` of 1 every request is sent on the calling thread. Otherwise up to
+    ``concurrency`` requests are in flight at the same time, each worker thread using its own
+    client so that requests don't queue behind each other for a connection. ``write`` blocks
+    while the serialized size of the requests in flight would exceed ``max_bytes_in_flight``.
+
+    With ``batch_size`` documents are sent in bulk requests whose size is adjusted by an
+    ``AdaptiveBatchSize``, instead of one bulk request per ``write``. Large writes are split, and
+    the documents of small writes are held back until they fill a request, or until ``flush``.
+
+    Bulk requests and documents that fail with a transient error, such as a rejection by an
+    overloaded cluster, are sent again after backing off, as configured by ``retry``. Only the
+    documents that failed are sent again. Documents that still fail are passed to ``on_failure`` if
+    given. Otherwise they are collected per request and raised as a single ``BulkIndexError`` by the
+    next call to ``write`` or ``flush``, once all requests in flight have completed.
+
+    Arguments:
+        client (OpenSearch): The client to send bulk requests with.
+        index (str): The index documents are written to.
+        concurrency (int): The maximum number of bulk requests in flight.
+        max_bytes_in_flight (int): The maximum size in bytes of the bulk requests in flight.
+        batch_size (AdaptiveBatchSize): Optionally, adjusts the size of bulk requests.
+        retry (Retry): How failed requests and documents are retried. Defaults to ``Retry()``.
+        on_request (OnRequest): Optionally, called after each bulk request.
+        on_retry (Callable[[int], None]): Optionally, called with the number of failed documents
+            before they are sent again.
+        on_failure (OnFailure): Optionally, called with each document that failed permanently.
+        **params: Additional query parameters passed to every bulk request, e.g. ``refresh``.
+    """
+
+    def __init__(
+        self,
+        client: OpenSearch,
+        index: str,
+        concurrency: int = 1,
+        max_bytes_in_flight: int = 100 * 1024 * 1024,
+        batch_size: Optional[AdaptiveBatchSize] = None,
+        retry: Optional[Retry] = None,
+        on_request: Optional[OnRequest] = None,
+        on_retry: Optional[Callable[[int], None]] = None,
+        on_failure: Optional[OnFailure] = None,
+        **params,
+    ):
+        self.client = client
+        self.index = index
+        self.concurrency = concurrency
+        self.max_bytes_in_flight = max_bytes_in_flight
+        self.batch_size = batch_size
+        self.retry = retry or Retry()
+        self.on_request = on_request
+        self.on_retry = on_retry
+        self.on_failure = on_failure
+        self.params = params
+
+        self.errors: List[dict] = []
+        # documents held back until they fill a bulk request, with batch_size
+        self._buffer: List[_BulkItem] = []
+        self._buffer_bytes = 0
+        self._bytes_in_flight = 0
+        self._condition = threading.Condition()
+        self._futures: List[Future] = []
+        self._local = threading.local()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if concurrency > 1:
+            self._executor = ThreadPoolExecutor(
+                max_workers=concurrency, thread_name_prefix="reindexer-bulk"
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        try:
+            if exc_type is None:
+                self.flush()
+        finally:
+            self.close()
+
+    def write(self, docs: List[dict], on_response: OnResponse = None) -> int:
+        """
+        Sends ``docs`` in one or more bulk requests and returns their serialized size in bytes.
+        ``on_response`` is called once all of them have been indexed or have failed, right away if
+        there are none.
+        """
+        self._raise_on_failure()
+        if not docs:
+            if on_response is not None:
+                on_response(0, [])
+            return 0
+
+        items = self._serialize(docs, _WriteResponse(len(docs), on_response))
+        size = sum(len(item.body) for item in items)
+        if self.batch_size is None:
+            self._submit(items)
+            return size
+
+        self._buffer += items
+        self._buffer_bytes += size
+        while self._buffer_bytes >= self.batch_size.bytes:
+            self._submit(self._take(self.batch_size.bytes))
+        return size
+
+    def _take(self, max_bytes: int) -> List[_BulkItem]:
+        """Takes the documents of a bulk request of up to ``max_bytes`` from the buffer."""
+        taken = 0
+        size = 0
+        # a document larger than max_bytes is sent on its own
+        while taken < len(self._buffer) and (
+            taken == 0 or size + len(self._buffer[taken].body) <= max_bytes
+        ):
+            size += len(self._buffer[taken].body)
+            taken += 1
+        items = self._buffer[:taken]
+        del self._buffer[:taken]
+        self._buffer_bytes -= size
+        return items
+
+    def _submit(self, items: List[_BulkItem]) -> None:
+        if self._executor is None:
+            self._send(items)
+            self._raise_on_failure()
+            return
+
+        size = sum(len(item.body) for item in items)
+        with self._condition:
+            # a single request larger than the limit is still sent once nothing else is in flight
+            while (
+                self._bytes_in_flight > 0
+                and self._bytes_in_flight + size > self.max_bytes_in_flight
+            ):
+                self._condition.wait()
+            self._bytes_in_flight += size
+
+        self._futures = [f for f in self._futures if not f.done() or f.exception()]
+        self._futures.append(self._executor.submit(self._send_in_flight, items, size))
+
+    def flush(self) -> None:
+        """Sends the documents held back, waits for all requests in flight and raises any failures."""
+        while self._buffer:
+            self._submit(self._take(self.batch_size.bytes))
+        for future in self._futures:
+            future.exception()
+        self._raise_on_failure()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def _serialize(self, docs: List[dict], write: _WriteResponse) -> List[_BulkItem]:
+        serializer = self.client.transport.serializer
+        items = []
+        for doc in docs:
+            action, data = expand_action(doc)
+            if data is None:
+                body = (serializer.dumps(action) + "\n").encode("utf-8")
+                items.append(_BulkItem(body, (action,), write))
+            else:
+                body = (
+                    serializer.dumps(action) + "\n" + serializer.dumps(data) + "\n"
+                ).encode("utf-8")
+                items.append(_BulkItem(body, (action, data), write))
+        return items
+
+    def _client(self) -> OpenSearch:
+        if self._executor is None:
+            return self.client
+        if not hasattr(self._local, "client"):
+            self._local.client = clone_client(self.client)
+        return self._local.client
+
+    def _send_in_flight(self, items: List[_BulkItem], size: int):
+        try:
+            self._send(items)
+        finally:
+            with self._condition:
+                self._bytes_in_flight -= size
+                self._condition.notify_all()
+
+    def _send(self, items: List[_BulkItem]):
+        # the documents, documents indexed and errors of each write the items belong to
+        writes = {}
+        for item in items:
+            writes.setdefault(id(item.write), [item.write, 0, 0, []])[1] += 1
+        errors = []
+        attempt = 0
+        while items:
+            rejected = []
+            body = b"".join(item.body for item in items)
+            started = time.monotonic()
+            try:
+                response = self._client().bulk(
+                    body=body,
+                    index=self.index,
+                    **self.params,
+                )
+            except TransportError as e:
+                if not is_transient(e) or not self.retry.can_retry(attempt):
+                    raise
+                rejected = items
+            else:
+                latency = time.monotonic() - started
+                if self.batch_size is not None:
+                    self.batch_size.record(latency)
+                if self.on_request is not None:
+                    self.on_request(len(items), len(body), latency)
+
+                for item, result in zip(items, response["items"]):
+                    op_type, result = next(iter(result.items()))
+                    status = result.get("status", 500)
+                    if 200 <= status < 300:
+                        writes[id(item.write)][2] += 1
+                    elif status in RETRY_STATUSES and self.retry.can_retry(attempt):
+                        rejected.append(item)
+                    elif self.on_failure is not None:
+                        self.on_failure(
+                            item.data[0],
+                            item.data[1] if len(item.data) > 1 else None,
+                            result,
+                        )
+                    else:
+                        # include original document source
+                        if len(item.data) > 1:
+                            result["data"] = item.data[1]
+                        errors.append({op_type: result})
+                        writes[id(item.write)][3].append({op_type: result})
+
+            if rejected:
+                if self.on_retry is not None:
+                    self.on_retry(len(rejected))
+                if self.batch_size is not None:
+                    self.batch_size.reject()
+                time.sleep(self.retry.backoff(attempt))
+                attempt += 1
+            items = rejected
+
+        if errors:
+            with self._condition:
+                self.errors.extend(errors)
+        for write, docs, success, write_errors in writes.values():
+            write(docs, success, write_errors)
+
+    def _raise_on_failure(self) -> None:
+        failed = [f for f in self._futures if f.done() and f.exception()]
+        if not failed and not self.errors:
+            return
+
+        # let requests in flight complete so that their failures are reported too
+        for future in self._futures:
+            future.exception()
+        for future in self._futures:
+            if future.exception() is not None:
+                raise future.exception()
+        raise BulkIndexError(
+            f"{len(self.errors)} document(s) failed to index.", self.errors
+        )
@@ -8,6 +8,13 @@ from opensearchpy.exceptions import NotFoundError
 from opensearchpy.helpers import bulk
 
 from opensearch_reindexer import Language, helper
+from opensearch_reindexer.transforms import (
+    Convert,
+    JsonEncode,
+    Rename,
+    compile_transforms,
+    to_painless,
+)
 
 REINDEXER_VERSION = "reindexer_version"
 REINDEXER_SOURCE_INDEX = "reindexer_source_index"
@@ -98,6 +105,20 @@ class TestOpensearchReindexerHelper:
         assert ALIAS_INDEX not in aliases
         assert ALIAS_MODIFIED_INDEX in aliases
 
+    def test_create_or_update_alias_removes_alias_from_every_other_index(
+        self, clean_up
+    ):
+        # Test that an alias pointing to several indices ends up pointing to just one
+        client = get_os_client()
+        client.indices.create(index=ALIAS_INDEX)
+        client.indices.create(index=ALIAS_MODIFIED_INDEX)
+        client.indices.put_alias(name=ALIAS, index=ALIAS_INDEX)
+        client.indices.put_alias(name=ALIAS, index=ALIAS_MODIFIED_INDEX)
+
+        helper.create_or_update_alias(client, ALIAS, ALIAS_MODIFIED_INDEX)
+
+        assert list(client.indices.get_alias(name=ALIAS)) == [ALIAS_MODIFIED_INDEX]
+
     def test_create_or_update_alias_returns_none(self, clean_up):
         # Test that the function returns None
         client = get_os_client()
@@ -748,6 +769,147 @@ class TestOpensearchReindexer:
             index=REINDEXER_REVISION_3,
         ) == {"a": 1, "c": '{"a":"a","b":"b","c":"2"}'}
 
+    def test_painless_transforms_match_compiled_transforms(self, clean_up):
+        client = get_os_client()
+        source = {
+            "größe": "3",
+            # one key, painless doesn't keep the order of keys
+            "c": {"ü": ['line\nbreak\ttab "quoted" back\\slash \x01']},
+        }
+        client.index(index=REINDEXER_SOURCE_INDEX, id="1", body=source, refresh=True)
+        operations = [
+            Rename("größe", "maße.größe"),
+            Convert("maße.größe", "integer"),
+            JsonEncode("c"),
+        ]
+
+        client.reindex(
+            body={
+                "source": {"index": REINDEXER_SOURCE_INDEX},
+                "dest": {"index": REINDEXER_REVISION_1},
+                "script": to_painless(operations),
+            },
+            refresh=True,
+        )
+
+        assert search(client=client, index=REINDEXER_REVISION_1) == compile_transforms(
+            operations
+        )(source)
+
+    def test_setup_and_run_revisions_python_with_slices(self, clean_up, load_data):
+        import opensearch_reindexer as osr
+
+        source_client = get_os_client()
+
+        osr.init()
+        osr.init_index()
+
+        osr.revision("revision_1", str(Language.python.value))
+        osr.revision("revision_2", str(Language.python.value))
+        osr.revision("revision_3", str(Language.python.value))
+
+        modify_revision_files_python()
+        modify_revision_config("1_revision_1", ["slices=2"])
+        modify_revision_config("2_revision_2", ['slices="auto"'])
+        modify_revision_config("3_revision_3", ["slices=3"])
+
+        osr.run()
+
+        expected_count = source_client.count(index=REINDEXER_SOURCE_INDEX)["count"]
+        assert (
+            source_client.count(index=REINDEXER_REVISION_1)["count"] == expected_count
+        )
+        assert (
+            source_client.count(index=REINDEXER_REVISION_2)["count"] == expected_count
+        )
+        assert (
+            source_client.count(index=REINDEXER_REVISION_3)["count"] == expected_count
+        )
+
+        assert search(
+            client=source_client,
+            index=REINDEXER_REVISION_3,
+        ) == {"a": 1, "c": json.dumps({"a": "a", "b": "b", "c": 2})}
+
+    def test_should_restore_destination_settings_after_bulk_load(
+        self, clean_up, load_data
+    ):
+        import opensearch_reindexer as osr
+
+        source_client = get_os_client()
+
+        osr.init()
+        osr.init_index()
+
+        osr.revision("revision_1", str(Language.python.value))
+        modify_revision_file(
+            file_name="1_revision_1",
+            modifications=[
+                ['SOURCE_INDEX = ""', f"SOURCE_INDEX = '{REINDEXER_SOURCE_INDEX}'"],
+                [
+                    'DESTINATION_INDEX = ""',
+                    f"DESTINATION_INDEX = '{REINDEXER_REVISION_1}'",
+                ],
+            ],
+        )
+        modify_revision_config(
+            "1_revision_1", ["bulk_load=True", 'bulk_load_timeout="1s"']
+        )
+
+        osr.run()
+
+        settings = source_client.indices.get_settings(
+            index=REINDEXER_REVISION_1, flat_settings=True
+        )[REINDEXER_REVISION_1]["settings"]
+        assert settings["index.number_of_replicas"] == "1"
+        assert settings.get("index.refresh_interval") != "-1"
+        assert (
+            source_client.count(index=REINDEXER_REVISION_1)["count"]
+            == source_client.count(index=REINDEXER_SOURCE_INDEX)["count"]
+        )
+
+    def test_python_revision_should_preserve_ids(self, clean_up, load_data):
+        import opensearch_reindexer as osr
+
+        source_client = get_os_client()
+
+        osr.init()
+        osr.init_index()
+
+        osr.revision("revision_1", str(Language.python.value))
+        osr.revision("revision_2", str(Language.python.value))
+        osr.revision("revision_3", str(Language.python.value))
+        modify_revision_files_python()
+        modify_revision_config("2_revision_2", ["op_type=OpType.create"])
+        modify_revision_config("3_revision_3", ["op_type=OpType.update"])
+        for file_name in ["2_revision_2", "3_revision_3"]:
+            modify_revision_file(
+                file_name=file_name,
+                modifications=[
+                    [
+                        "import BaseMigration, Config, Language",
+                        "import BaseMigration, Config, Language, OpType",
+                    ]
+                ],
+            )
+
+        osr.run()
+
+        source_ids = {
+            hit["_id"]
+            for hit in source_client.search(
+                index=REINDEXER_SOURCE_INDEX, body={"size": 10000}
+            )["hits"]["hits"]
+        }
+        for index in [REINDEXER_REVISION_1, REINDEXER_REVISION_2, REINDEXER_REVISION_3]:
+            destination_ids = {
+                hit["_id"]
+                for hit in source_client.search(index=index, body={"size": 10000})[
+                    "hits"
+                ]["hits"]
+            }
+            assert destination_ids == source_ids
+
 
 def modify_revision_files_python():
     modify_revision_file(
@@ -920,6 +1082,20 @@ def modify_revision_file(file_name: str, modifications: list[list[str]]):
         f.write(contents)
 
 
+def modify_revision_config(file_name: str, options: list[str]):
+    # Append keyword arguments to the Config(...) call of a python revision
+    modify_revision_file(
+        file_name=file_name,
+        modifications=[
+            [
+                "language=Language.python,",
+                "language=Language.python,"
+                + "".join(f"\n    {option}," for option in options),
+            ],
+        ],
+    )
+
+
 def modify_destination_client_env_file():
     # Open the file in read-only mode and read its contents into a string
     with open(f"./migrations/env.py", "r") as f:
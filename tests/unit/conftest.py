@@ -0,0 +1,53 @@
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from benchmarks.fake_opensearch import FakeOpenSearch
+
+VERSION_CONTROL_INDEX = "reindexer_version"
+
+ENV = """import os
+
+from opensearchpy import OpenSearch
+
+VERSION_CONTROL_INDEX = "reindexer_version"
+
+source_client = OpenSearch(hosts=[os.environ["REINDEXER_TEST_URL"]])
+destination_client = source_client
+"""
+
+
+@pytest.fixture()
+def fake():
+    with FakeOpenSearch() as fake:
+        yield fake
+
+
+@pytest.fixture()
+def project(fake, tmp_path, monkeypatch):
+    """A reindexer project whose clients connect to ``fake``, initialized with "versionNum" 0."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("REINDEXER_TEST_URL", fake.url)
+    Path("migrations/versions").mkdir(parents=True)
+    Path("migrations/__init__.py").write_text("")
+    Path("migrations/env.py").write_text(ENV)
+    fake.load(VERSION_CONTROL_INDEX, [{"versionNum": 0}])
+    return tmp_path
+
+
+def write_revision(version: int, config: str, migration: str = "pass") -> None:
+    """Writes a revision with the keyword arguments of its ``Config`` and the body of its ``Migration``."""
+    Path(f"migrations/versions/{version}_revision.py").write_text(
+        f"class Migration(BaseMigration):\n{textwrap.indent(textwrap.dedent(migration), '    ')}\n\n"
+        f"config = Config({config})\n"
+    )
+
+
+def version_num(fake: FakeOpenSearch) -> int:
+    (document,) = fake.indices[VERSION_CONTROL_INDEX].values()
+    return document["versionNum"]
+
+
+def documents(count: int) -> list:
+    return [{"n": n, "name": f"document {n}"} for n in range(count)]
@@ -0,0 +1,148 @@
+from pathlib import Path
+
+import pytest
+
+from opensearch_reindexer.base import BaseMigration
+from opensearch_reindexer.progress import ProgressMode
+from tests.unit.conftest import documents, version_num, write_revision
+
+ASYNC = (
+    'source_index="src", destination_index="dst", language=Language.python, '
+    "batch_size=10, use_async=True"
+)
+
+ASYNC_ENV = """
+from opensearchpy import AsyncOpenSearch
+
+async_source_client = AsyncOpenSearch(hosts=[os.environ["REINDEXER_TEST_URL"]])
+"""
+
+
+@pytest.fixture()
+def async_project(project, fake):
+    with open(Path("migrations/env.py"), "a") as env:
+        env.write(ASYNC_ENV)
+    fake.load("src", documents(100))
+    return project
+
+
+def migrate() -> None:
+    BaseMigration().handle_migration(progress=ProgressMode.quiet)
+
+
+@pytest.mark.parametrize("slices", [1, 3])
+def test_async_revision_copies_every_document(async_project, fake, slices):
+    write_revision(
+        1,
+        f"{ASYNC}, slices={slices}, bulk_concurrency=4, verify=Verification.full",
+        """
+        def transform_document(self, doc):
+            doc["name"] = doc["name"].upper()
+            return doc
+        """,
+    )
+
+    migrate()
+
+    assert len(fake.indices["dst"]) == 100
+    assert fake.indices["dst"]["7"] == {"n": 7, "name": "DOCUMENT 7"}
+    assert version_num(fake) == 1
+
+
+def test_async_transform_document_runs_concurrently(async_project, fake):
+    write_revision(
+        1,
+        ASYNC,
+        """
+        running = 0
+        most_running = 0
+
+        async def transform_document(self, doc):
+            Migration.running += 1
+            Migration.most_running = max(Migration.most_running, Migration.running)
+            await asyncio.sleep(0.01)
+            Migration.running -= 1
+            doc["name"] = doc["name"].upper()
+            if Migration.most_running < 2:
+                raise ValueError("documents of a batch were transformed one at a time")
+            return doc
+        """,
+    )
+
+    migrate()
+
+    assert fake.indices["dst"]["7"] == {"n": 7, "name": "DOCUMENT 7"}
+    assert version_num(fake) == 1
+
+
+def test_async_transform_hit_skips_documents(async_project, fake):
+    write_revision(
+        1,
+        f"{ASYNC}, verify=Verification.count",
+        """
+        async def transform_hit(self, hit):
+            return None if hit["_source"]["n"] % 2 else hit
+        """,
+    )
+
+    migrate()
+
+    assert set(fake.indices["dst"]) == {str(n) for n in range(0, 100, 2)}
+    assert version_num(fake) == 1
+
+
+def test_async_transform_errors_fail_the_revision(async_project, fake):
+    write_revision(
+        1,
+        ASYNC,
+        """
+        async def transform_document(self, doc):
+            if doc["n"] == 42:
+                raise ValueError("transform failed")
+            return doc
+        """,
+    )
+
+    with pytest.raises(ValueError, match="transform failed"):
+        migrate()
+    assert version_num(fake) == 0
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        'checkpoint=True, checkpoint_sort=[{"n": "asc"}]',
+        "reader=Reader.point_in_time",
+        'dead_letter="dead_letter.jsonl"',
+    ],
+)
+def test_async_rejects_unsupported_options(async_project, fake, config):
+    write_revision(1, f"{ASYNC}, {config}")
+
+    with pytest.raises(SystemExit):
+        migrate()
+    assert not fake.indices.get("dst")
+
+
+def test_async_transform_rejects_verification_of_documents(async_project, fake):
+    write_revision(
+        1,
+        f"{ASYNC}, verify=Verification.sample",
+        """
+        async def transform_document(self, doc):
+            return doc
+        """,
+    )
+
+    with pytest.raises(SystemExit):
+        migrate()
+    assert not fake.indices.get("dst")
+
+
+def test_async_requires_async_client(project, fake):
+    fake.load("src", documents(10))
+    write_revision(1, ASYNC)
+
+    with pytest.raises(SystemExit):
+        migrate()
+    assert version_num(fake) == 0
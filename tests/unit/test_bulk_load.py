@@ -0,0 +1,30 @@
+import pytest
+
+from opensearch_reindexer.base import BaseMigration, _time_seconds
+from opensearch_reindexer.progress import ProgressMode
+from tests.unit.conftest import documents, version_num, write_revision
+
+
+def test_time_seconds():
+    assert _time_seconds("5m") == 300
+    assert _time_seconds("1.5s") == 1.5
+    assert _time_seconds("250ms") == 0.25
+    with pytest.raises(ValueError):
+        _time_seconds("5 minutes")
+
+
+def test_restore_bulk_load_warns_when_not_green(project, fake, capsys):
+    fake.load("src", documents(10))
+    fake.health = "yellow"
+    write_revision(
+        1,
+        'source_index="src", destination_index="dst", language=Language.python, '
+        'bulk_load=True, bulk_load_timeout="1s"',
+    )
+
+    BaseMigration().handle_migration(progress=ProgressMode.quiet)
+
+    assert "did not become green within 1s" in capsys.readouterr().out
+    assert fake.settings["dst"]["index.refresh_interval"] == "1s"
+    assert len(fake.indices["dst"]) == 10
+    assert version_num(fake) == 1
@@ -0,0 +1,78 @@
+import pytest
+
+from opensearch_reindexer.base import BaseMigration
+from opensearch_reindexer.checkpoint import checkpoint_index
+from tests.unit.conftest import (
+    VERSION_CONTROL_INDEX,
+    documents,
+    version_num,
+    write_revision,
+)
+
+CHECKPOINT = (
+    'source_index="src", destination_index="dst", language=Language.python, batch_size=10, '
+    "reader=Reader.point_in_time, checkpoint=True"
+)
+
+
+def test_checkpoint_requires_checkpoint_sort(project, fake):
+    fake.load("src", documents(10))
+    write_revision(1, CHECKPOINT)
+
+    with pytest.raises(SystemExit):
+        BaseMigration().handle_migration()
+    assert version_num(fake) == 0
+
+
+def test_resume_reads_a_new_point_in_time_without_skipping(project, fake, monkeypatch):
+    fake.load("src", documents(100))
+    write_revision(
+        1,
+        f'{CHECKPOINT}, checkpoint_sort=[{{"n": "asc"}}]',
+        """
+        def transform_document(self, doc):
+            if doc["n"] == int(os.environ.get("FAIL_AT", -1)):
+                raise ValueError("transform failed")
+            return doc
+        """,
+    )
+    monkeypatch.setenv("FAIL_AT", "55")
+    with pytest.raises(ValueError):
+        BaseMigration().handle_migration()
+    checkpoint = fake.indices[checkpoint_index(VERSION_CONTROL_INDEX)]["revision-1"]
+    assert checkpoint["progress"]["0"]["search_after"] is not None
+
+    # documents read before the checkpoint are deleted, which moves every other document in a new
+    # point in time
+    for id in range(10):
+        del fake.indices["src"][str(id)]
+    fake.indices["dst"].clear()
+    monkeypatch.delenv("FAIL_AT")
+    BaseMigration().handle_migration(resume=True)
+
+    (after,) = checkpoint["progress"]["0"]["search_after"]
+    assert set(fake.indices["dst"]) == {str(n) for n in range(after + 1, 100)}
+    assert version_num(fake) == 1
+
+
+def test_checkpoint_moves_past_fully_skipped_batch(project, fake, monkeypatch):
+    fake.load("src", documents(100))
+    write_revision(
+        1,
+        f'{CHECKPOINT}, checkpoint_sort=[{{"n": "asc"}}]',
+        """
+        def transform_hit(self, hit):
+            # every document of the second batch is skipped
+            if 10 <= hit["_source"]["n"] < 20:
+                return None
+            if hit["_source"]["n"] == 95:
+                raise ValueError("transform failed")
+            return hit
+        """,
+    )
+    with pytest.raises(ValueError):
+        BaseMigration().handle_migration()
+
+    checkpoint = fake.indices[checkpoint_index(VERSION_CONTROL_INDEX)]["revision-1"]
+    assert checkpoint["progress"]["0"]["search_after"] == [89]
+    assert checkpoint["progress"]["0"]["indexed"] == 80
@@ -0,0 +1,27 @@
+import opensearch_reindexer as osr
+from opensearch_reindexer.base import BaseMigration
+from opensearch_reindexer.progress import ProgressMode
+from tests.unit.conftest import documents, version_num, write_revision
+
+
+def test_run_called_from_python_uses_plain_defaults(project, monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        BaseMigration, "handle_migration", lambda self, **kwargs: calls.append(kwargs)
+    )
+
+    osr.run()
+
+    assert calls == [{"resume": False, "concurrency": 1, "progress": ProgressMode.bar}]
+
+
+def test_run_called_from_python_runs_revisions(project, fake):
+    fake.load("src", documents(10))
+    write_revision(
+        1, 'source_index="src", destination_index="dst", language=Language.python'
+    )
+
+    osr.run()
+
+    assert len(fake.indices["dst"]) == 10
+    assert version_num(fake) == 1
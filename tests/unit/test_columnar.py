@@ -0,0 +1,87 @@
+import pytest
+
+from opensearch_reindexer.base import BaseMigration
+from opensearch_reindexer.columnar import (
+    MISSING_COLUMN,
+    arrow_to_hits,
+    columns_to_hits,
+    hits_to_arrow,
+    hits_to_columns,
+)
+from opensearch_reindexer.progress import ProgressMode
+from tests.unit.conftest import write_revision
+
+HITS = [
+    {"_id": "1", "_source": {"a": 1, "b": None, "c": {"d": None, "e": [1, 2]}}},
+    {"_id": "2", "_routing": "x", "_source": {"a": 2, "c": {"d": "f"}}},
+    {"_id": "3", "_source": {"b": "g"}},
+]
+
+
+def test_columns_round_trip_keeps_nulls_and_missing_fields():
+    assert columns_to_hits(hits_to_columns(HITS)) == HITS
+
+
+def test_columns_list_missing_fields():
+    table = hits_to_columns(HITS)
+
+    assert table == {
+        "_id": ["1", "2", "3"],
+        "_routing": [None, "x", None],
+        MISSING_COLUMN: [[], ["b"], ["a", "c"]],
+        "a": [1, 2, None],
+        "b": [None, None, "g"],
+        "c": [{"d": None, "e": [1, 2]}, {"d": "f"}, None],
+    }
+
+
+def test_columns_without_missing_fields():
+    hits = [{"_id": "1", "_source": {"a": None}}, {"_id": "2", "_source": {"a": 1}}]
+    table = hits_to_columns(hits)
+
+    assert set(table) == {"_id", "a"}
+    assert columns_to_hits(table) == hits
+
+
+def test_columns_transformed_rows_keep_missing_fields():
+    table = hits_to_columns(HITS)
+    # the rows of every column are filtered alike, and a column is added
+    table = {name: values[1:] for name, values in table.items()}
+    table["h"] = [None, True]
+
+    assert columns_to_hits(table) == [
+        {"_id": "2", "_routing": "x", "_source": {"a": 2, "c": {"d": "f"}, "h": None}},
+        {"_id": "3", "_source": {"b": "g", "h": True}},
+    ]
+
+
+def test_arrow_round_trip_keeps_nulls_and_missing_fields():
+    pytest.importorskip("pyarrow")
+    hits = [
+        {"_id": "1", "_source": {"a": 1, "b": None}},
+        {"_id": "2", "_source": {"a": 2}},
+    ]
+
+    assert arrow_to_hits(hits_to_arrow(hits)) == hits
+
+
+def test_columnar_revision_keeps_nulls(project, fake):
+    fake.load("src", [{"n": 0, "name": None}, {"n": 1}, {"n": 2, "name": "document 2"}])
+    write_revision(
+        1,
+        'source_index="src", destination_index="dst", language=Language.python, '
+        "columnar=TableFormat.columns",
+        """
+        def transform_columns(self, table):
+            table["n"] = [n * 10 for n in table["n"]]
+            return table
+        """,
+    )
+
+    BaseMigration().handle_migration(progress=ProgressMode.quiet)
+
+    assert fake.indices["dst"] == {
+        "0": {"n": 0, "name": None},
+        "1": {"n": 10},
+        "2": {"n": 20, "name": "document 2"},
+    }
@@ -0,0 +1,126 @@
+import signal
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from opensearch_reindexer.base import BaseMigration, Config, revision_dependencies
+from opensearch_reindexer.checkpoint import checkpoint_index
+from opensearch_reindexer.progress import ProgressMode
+from tests.unit.conftest import (
+    VERSION_CONTROL_INDEX,
+    documents,
+    version_num,
+    write_revision,
+)
+
+
+def revision(version: int, source_index=None, destination_index=None, **config):
+    return SimpleNamespace(
+        version=version,
+        config=Config(
+            source_index=source_index, destination_index=destination_index, **config
+        ),
+    )
+
+
+def test_revision_dependencies():
+    migrations = [
+        revision(1, "orders", "orders-v2"),
+        revision(2, "users", "users-v2"),
+        revision(3, "orders-v2", "orders-v3"),
+        revision(4, "logs-*", "logs"),
+        revision(5, "logs-2024", "archive", alias="orders"),
+        revision(6, ["users", "accounts"], "accounts-v2"),
+        revision(7, "orders", "orders-v4", depends_on=[2, 99]),
+        revision(8, "orders", "orders-v5", depends_on=[]),
+    ]
+
+    assert revision_dependencies(migrations) == {
+        1: set(),
+        2: set(),
+        3: {1},
+        4: set(),
+        5: {1, 4},
+        6: {2},
+        # only the revisions that are run are waited for
+        7: {2},
+        8: set(),
+    }
+
+
+def test_version_num_waits_for_earlier_revisions(project, fake, monkeypatch):
+    updates = []
+    update_migration_version = BaseMigration.update_migration_version
+    monkeypatch.setattr(
+        BaseMigration,
+        "update_migration_version",
+        lambda self, version: updates.append(version)
+        or update_migration_version(self, version),
+    )
+    fake.load("src1", documents(10))
+    fake.load("src2", documents(10))
+    write_revision(
+        1,
+        'source_index="src1", destination_index="dst1", language=Language.python',
+        """
+        def after_revision(self):
+            time.sleep(0.5)
+        """,
+    )
+    write_revision(
+        2, 'source_index="src2", destination_index="dst2", language=Language.python'
+    )
+
+    BaseMigration().handle_migration(concurrency=2, progress=ProgressMode.quiet)
+
+    # revision 2 completed first, but is only recorded with revision 1
+    assert updates == [2]
+    assert version_num(fake) == 2
+
+
+def test_failed_revision_is_not_recorded(project, fake):
+    fake.load("src1", documents(10))
+    fake.load("src2", documents(10))
+    write_revision(
+        1,
+        'source_index="src1", destination_index="dst1", language=Language.python',
+        """
+        def after_revision(self):
+            raise ValueError("revision failed")
+        """,
+    )
+    write_revision(
+        2, 'source_index="src2", destination_index="dst2", language=Language.python'
+    )
+
+    with pytest.raises(ValueError):
+        BaseMigration().handle_migration(concurrency=2, progress=ProgressMode.quiet)
+    assert len(fake.indices["dst2"]) == 10
+    assert version_num(fake) == 0
+
+
+def test_interrupt_cancels_painless_tasks(project, fake):
+    fake.reindex_docs_per_second = 100
+    for n in (1, 2):
+        fake.load(f"src{n}", documents(5000))
+        write_revision(
+            n,
+            f'reindex_body={{"source": {{"index": "src{n}"}}, "dest": {{"index": "dst{n}"}}}}, '
+            "language=Language.painless, task_poll_interval=0.05",
+        )
+    # Ctrl-C, once the tasks have started
+    timer = threading.Timer(
+        0.5, signal.pthread_kill, (threading.main_thread().ident, signal.SIGINT)
+    )
+    timer.start()
+
+    with pytest.raises(KeyboardInterrupt):
+        BaseMigration().handle_migration(concurrency=2)
+    timer.join()
+
+    assert len(fake.tasks) == 2
+    assert all(task["cancelled"] for task in fake.tasks.values())
+    # running the revisions again starts new tasks
+    assert not fake.indices[checkpoint_index(VERSION_CONTROL_INDEX)]
+    assert version_num(fake) == 0
@@ -0,0 +1,139 @@
+import time
+
+import pytest
+
+from opensearch_reindexer.base import BaseMigration
+from opensearch_reindexer.progress import ProgressMode
+from tests.unit.conftest import documents, version_num, write_revision
+
+
+def cutover_revision(config: str = "") -> None:
+    write_revision(
+        1,
+        f'alias="orders", cutover=True, language=Language.python, {config}',
+    )
+
+
+def migrate() -> None:
+    BaseMigration().handle_migration(progress=ProgressMode.quiet)
+
+
+@pytest.mark.parametrize(
+    "policy, closed, indices",
+    [
+        ("keep", set(), {"orders-1", "orders-2"}),
+        ("close", {"orders-1"}, {"orders-1", "orders-2"}),
+        ("delete", set(), {"orders-2"}),
+    ],
+)
+def test_cutover_swaps_alias_and_retires_old_index(
+    project, fake, policy, closed, indices
+):
+    fake.load("orders-1", documents(10))
+    fake.aliases["orders"] = {"orders-1"}
+    cutover_revision(f"cutover_old_index=OldIndexPolicy.{policy}")
+
+    migrate()
+
+    assert fake.aliases["orders"] == {"orders-2"}
+    assert len(fake.indices["orders-2"]) == 10
+    # bulk load settings are restored before the swap
+    assert fake.settings["orders-2"]["index.refresh_interval"] == "1s"
+    assert fake.closed == closed
+    assert {"orders-1", "orders-2"} & set(fake.indices) == indices
+    assert version_num(fake) == 1
+
+
+def test_cutover_starts_from_source_index_without_alias(project, fake):
+    fake.load("orders-1", documents(10))
+    cutover_revision('source_index="orders-1"')
+
+    migrate()
+
+    assert fake.aliases["orders"] == {"orders-2"}
+    assert len(fake.indices["orders-2"]) == 10
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        # no alias
+        'cutover=True, source_index="orders-1", language=Language.python',
+        # an alias that doesn't exist, and no source_index
+        'alias="orders", cutover=True, language=Language.python',
+    ],
+)
+def test_cutover_requires_index_to_cut_over_from(project, fake, config):
+    fake.load("orders-1", documents(10))
+    write_revision(1, config)
+
+    with pytest.raises(SystemExit):
+        migrate()
+    assert "orders-2" not in fake.indices
+    assert version_num(fake) == 0
+
+
+def test_cutover_rejects_alias_of_several_indices(project, fake):
+    fake.load("orders-1", documents(10))
+    fake.load("orders-archive", documents(10))
+    fake.aliases["orders"] = {"orders-1", "orders-archive"}
+    cutover_revision()
+
+    with pytest.raises(SystemExit):
+        migrate()
+    assert "orders-2" not in fake.indices
+    assert fake.aliases["orders"] == {"orders-1", "orders-archive"}
+
+
+def test_alias_ends_up_on_destination_index_only(project, fake):
+    fake.load("src", documents(10))
+    fake.load("old", documents(10))
+    fake.aliases["orders"] = {"src", "old"}
+    write_revision(
+        1,
+        'source_index="src", destination_index="dst", alias="orders", '
+        "language=Language.python",
+    )
+
+    migrate()
+
+    assert fake.aliases["orders"] == {"dst"}
+    assert {"src", "old", "dst"} <= set(fake.indices)
+
+
+def test_interrupted_grace_period_does_not_cut_over_again(project, fake, monkeypatch):
+    fake.load("orders-1", documents(10))
+    fake.aliases["orders"] = {"orders-1"}
+    cutover_revision("cutover_old_index=OldIndexPolicy.delete, cutover_grace_period=60")
+    sleep = time.sleep
+
+    def interrupt_grace_period(seconds):
+        if seconds == 60:
+            raise KeyboardInterrupt
+        sleep(seconds)
+
+    monkeypatch.setattr(time, "sleep", interrupt_grace_period)
+    with pytest.raises(KeyboardInterrupt):
+        migrate()
+
+    assert version_num(fake) == 1
+    assert fake.aliases["orders"] == {"orders-2"}
+    assert "orders-1" in fake.indices
+
+    # the revision is up to date
+    with pytest.raises(SystemExit):
+        migrate()
+    assert "orders-3" not in fake.indices
+    assert fake.aliases["orders"] == {"orders-2"}
+
+
+def test_concurrent_cutover_retires_old_index(project, fake):
+    fake.load("orders-1", documents(10))
+    fake.aliases["orders"] = {"orders-1"}
+    cutover_revision("cutover_old_index=OldIndexPolicy.delete")
+
+    BaseMigration().handle_migration(concurrency=2, progress=ProgressMode.quiet)
+
+    assert version_num(fake) == 1
+    assert fake.aliases["orders"] == {"orders-2"}
+    assert "orders-1" not in fake.indices
@@ -0,0 +1,99 @@
+import time
+
+import pytest
+from opensearchpy import OpenSearch
+
+from opensearch_reindexer.base import BaseMigration
+from opensearch_reindexer.dead_letter import DeadLetter, DeadLetterFile, DeadLetterIndex
+from opensearch_reindexer.progress import ProgressMode
+from tests.unit.conftest import documents, version_num, write_revision
+
+ERROR = {"type": "ValueError", "reason": "failed"}
+
+
+def test_dead_letter_is_abstract():
+    with pytest.raises(TypeError):
+        DeadLetter(1)
+
+
+@pytest.fixture(params=["file", "index"])
+def dead_letters(request, tmp_path):
+    """Creates the dead letters of a revision, all in the same file or index."""
+    if request.param == "file":
+        path = str(tmp_path / "dead-letter.jsonl")
+        return lambda revision: DeadLetterFile(path, revision)
+    fake = request.getfixturevalue("fake")
+    client = OpenSearch(hosts=[fake.url])
+    return lambda revision: DeadLetterIndex(client, "dead-letter", revision)
+
+
+def test_dead_letter_records_by_revision(dead_letters):
+    first, second = dead_letters(1), dead_letters(2)
+    first.write("transform", "dst", "1", {"n": 1}, ERROR)
+    second.write("bulk", "dst", "2", {"n": 2}, ERROR, routing="r")
+    first.close()
+    second.close()
+
+    (record,) = dead_letters(2).read()
+    assert {key: value for key, value in record.items() if key != "time"} == {
+        "revision": 2,
+        "stage": "bulk",
+        "index": "dst",
+        "_id": "2",
+        "_routing": "r",
+        "_source": {"n": 2},
+        "error": ERROR,
+    }
+    assert first.count == 1
+    assert [record["_id"] for record in dead_letters(1).read()] == ["1"]
+
+
+def test_dead_letter_remove_keeps_later_records(dead_letters):
+    dead_letter = dead_letters(1)
+    dead_letter.write("transform", "dst", "1", {"n": 1}, ERROR)
+    dead_letter.close()
+    before = time.time()
+    dead_letter.write("transform", "dst", "2", {"n": 2}, ERROR)
+    other = dead_letters(2)
+    other.write("transform", "dst", "3", {"n": 3}, ERROR)
+    other.close()
+
+    dead_letter.remove(before)
+
+    assert [record["_id"] for record in dead_letters(1).read()] == ["2"]
+    assert [record["_id"] for record in dead_letters(2).read()] == ["3"]
+
+
+@pytest.mark.parametrize("target", ["file", "index"])
+def test_replay_dead_letter(project, fake, monkeypatch, target):
+    fake.load("src", documents(20))
+    # fails to index until the destination index is fixed
+    fake.failing = {"5"}
+    monkeypatch.setenv("FAIL_AT", "3")
+    write_revision(
+        1,
+        'source_index="src", destination_index="dst", language=Language.python, '
+        f'dead_letter="dead-letter", dead_letter_target=DeadLetterTarget.{target}',
+        """
+        def transform_document(self, doc):
+            if doc["n"] == int(os.environ.get("FAIL_AT", -1)):
+                raise ValueError("transform failed")
+            return doc
+        """,
+    )
+    BaseMigration().handle_migration(progress=ProgressMode.quiet)
+    assert set(fake.indices["dst"]) == {str(n) for n in range(20)} - {"3", "5"}
+    assert version_num(fake) == 1
+
+    # the revision is fixed, the destination index isn't
+    monkeypatch.delenv("FAIL_AT")
+    BaseMigration().handle_replay_dead_letter(1)
+    assert set(fake.indices["dst"]) == {str(n) for n in range(20)} - {"5"}
+
+    fake.failing = set()
+    BaseMigration().handle_replay_dead_letter(1)
+    assert set(fake.indices["dst"]) == {str(n) for n in range(20)}
+    assert fake.indices["dst"]["3"] == {"n": 3, "name": "document 3"}
+
+    migration = BaseMigration().load_migration("1_revision.py", resume=False)
+    assert migration.create_dead_letter().read() == []
@@ -0,0 +1,58 @@
+import pytest
+
+from opensearch_reindexer.base import BaseMigration
+from opensearch_reindexer.checkpoint import checkpoint_index
+from tests.unit.conftest import (
+    VERSION_CONTROL_INDEX,
+    documents,
+    version_num,
+    write_revision,
+)
+
+DELTA = (
+    'source_index="src", destination_index="dst", language=Language.python, '
+    'delta_field="updated_at"'
+)
+
+
+@pytest.mark.parametrize("config", ["preserve_ids=False", "op_type=OpType.create"])
+def test_delta_passes_must_overwrite_copied_documents(project, fake, config):
+    fake.load("src", documents(10))
+    write_revision(1, f"{DELTA}, {config}")
+
+    with pytest.raises(SystemExit):
+        BaseMigration().handle_migration()
+    assert not fake.indices.get("dst")
+    assert version_num(fake) == 0
+
+
+def test_resume_copies_changes_since_stored_watermark(project, fake, monkeypatch):
+    fake.load("src", [{**doc, "updated_at": doc["n"]} for doc in documents(100)])
+    write_revision(
+        1,
+        f"{DELTA}, batch_size=10, reader=Reader.point_in_time, checkpoint=True, "
+        'checkpoint_sort=[{"n": "asc"}]',
+        """
+        def transform_document(self, doc):
+            if doc["n"] == int(os.environ.get("FAIL_AT", -1)):
+                raise ValueError("transform failed")
+            return doc
+        """,
+    )
+    monkeypatch.setenv("FAIL_AT", "55")
+    with pytest.raises(ValueError):
+        BaseMigration().handle_migration()
+    assert fake.indices["dst"]["3"]["name"] == "document 3"
+
+    # a copied document changes below the mark a new run would take
+    fake.indices["src"]["3"] = {"n": 3, "name": "changed", "updated_at": 100}
+    fake.indices["src"]["60"] = {"n": 60, "name": "changed", "updated_at": 101}
+    monkeypatch.delenv("FAIL_AT")
+    BaseMigration().handle_migration(resume=True)
+
+    assert fake.indices["dst"]["3"]["name"] == "changed"
+    assert fake.indices["dst"]["60"]["name"] == "changed"
+    assert len(fake.indices["dst"]) == 100
+    assert version_num(fake) == 1
+    # the checkpoint and watermark of the completed revision are deleted
+    assert fake.indices[checkpoint_index(VERSION_CONTROL_INDEX)] == {}
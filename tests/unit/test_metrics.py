@@ -0,0 +1,133 @@
+import io
+import json
+from pathlib import Path
+
+from opensearch_reindexer.base import BaseMigration
+from opensearch_reindexer.metrics import JsonLinesMetrics, PrometheusMetrics
+from opensearch_reindexer.progress import ProgressMode
+from tests.unit.conftest import documents, version_num
+
+REVISION = """from opensearch_reindexer.metrics import JsonLinesMetrics, PrometheusMetrics
+
+
+class Migration(BaseMigration):
+    pass
+
+
+config = Config(
+    source_index="src",
+    destination_index="dst",
+    language=Language.python,
+    batch_size=10,
+    retry_backoff=0,
+    metrics=[JsonLinesMetrics("metrics.jsonl"), PrometheusMetrics("metrics.prom")],
+)
+"""
+
+
+def test_prometheus_metrics_render():
+    metrics = PrometheusMetrics()
+    metrics.on_stage(1, "read", 0, 10, 0.5)
+    metrics.on_stage(1, "read", 1, 5, 0.25)
+    metrics.on_stage(1, "bulk", None, 15, 1.0, bytes=300)
+    metrics.on_retry(1, "bulk", 3, "rejected")
+    metrics.on_retry(1, "bulk", 2, "rejected")
+    metrics.on_revision(1, "dst", 15, 2.0)
+
+    assert metrics.render() == (
+        "# HELP reindexer_batches_total Batches processed by each stage.\n"
+        "# TYPE reindexer_batches_total counter\n"
+        'reindexer_batches_total{revision="1",stage="read"} 2\n'
+        'reindexer_batches_total{revision="1",stage="bulk"} 1\n'
+        "# HELP reindexer_documents_total Documents processed by each stage.\n"
+        "# TYPE reindexer_documents_total counter\n"
+        'reindexer_documents_total{revision="1",stage="read"} 15\n'
+        'reindexer_documents_total{revision="1",stage="bulk"} 15\n'
+        "# HELP reindexer_stage_seconds_total Time spent in each stage.\n"
+        "# TYPE reindexer_stage_seconds_total counter\n"
+        'reindexer_stage_seconds_total{revision="1",stage="read"} 0.75\n'
+        'reindexer_stage_seconds_total{revision="1",stage="bulk"} 1.0\n'
+        "# HELP reindexer_bytes_total Bytes sent by each stage.\n"
+        "# TYPE reindexer_bytes_total counter\n"
+        'reindexer_bytes_total{revision="1",stage="read"} 0\n'
+        'reindexer_bytes_total{revision="1",stage="bulk"} 300\n'
+        "# HELP reindexer_retried_documents_total Documents sent or read again.\n"
+        "# TYPE reindexer_retried_documents_total counter\n"
+        'reindexer_retried_documents_total{revision="1",stage="bulk",reason="rejected"} 5\n'
+        "# HELP reindexer_revision_documents_per_second Documents reindexed per second by completed revisions.\n"
+        "# TYPE reindexer_revision_documents_per_second gauge\n"
+        'reindexer_revision_documents_per_second{revision="1",index="dst"} 7.5\n'
+    )
+
+
+def test_json_lines_metrics():
+    file = io.StringIO()
+    metrics = JsonLinesMetrics(file)
+    metrics.on_stage(1, "bulk", None, 15, 1.0, bytes=300)
+    metrics.on_retry(1, "bulk", 3, "rejected")
+    metrics.on_revision(1, "dst", 15, 2.0)
+
+    events = [json.loads(line) for line in file.getvalue().splitlines()]
+    assert all(isinstance(event.pop("time"), float) for event in events)
+    assert events == [
+        {
+            "event": "stage",
+            "revision": 1,
+            "stage": "bulk",
+            "slice": None,
+            "docs": 15,
+            "seconds": 1.0,
+            "bytes": 300,
+        },
+        {
+            "event": "retry",
+            "revision": 1,
+            "stage": "bulk",
+            "docs": 3,
+            "reason": "rejected",
+        },
+        {
+            "event": "revision",
+            "revision": 1,
+            "index": "dst",
+            "docs": 15,
+            "seconds": 2.0,
+            "docs_per_second": 7.5,
+        },
+    ]
+
+
+def test_revision_reports_metrics(project, fake):
+    fake.load("src", documents(100))
+    fake.rejection_rate = 0.2
+    Path("migrations/versions/1_revision.py").write_text(REVISION)
+
+    BaseMigration().handle_migration(progress=ProgressMode.quiet)
+    assert version_num(fake) == 1
+
+    events = [
+        json.loads(line) for line in Path("metrics.jsonl").read_text().splitlines()
+    ]
+    docs = {}
+    for event in events:
+        if event["event"] == "stage":
+            docs[event["stage"]] = docs.get(event["stage"], 0) + event["docs"]
+    # rejected documents are sent again
+    retried = sum(event["docs"] for event in events if event["event"] == "retry")
+    assert retried == fake.rejections > 0
+    assert docs == {"read": 100, "transform": 100, "bulk": 100 + retried}
+    (revision,) = [event for event in events if event["event"] == "revision"]
+    assert revision["revision"] == 1
+    assert revision["index"] == "dst"
+    assert revision["docs"] == 100
+
+    prometheus = Path("metrics.prom").read_text()
+    assert 'reindexer_documents_total{revision="1",stage="read"} 100\n' in prometheus
+    assert 'reindexer_batches_total{revision="1",stage="transform"} 10\n' in prometheus
+    assert (
+        f'reindexer_retried_documents_total{{revision="1",stage="bulk",reason="rejected"}} {retried}\n'
+        in prometheus
+    )
+    assert 'reindexer_revision_documents_per_second{revision="1",index="dst"}' in (
+        prometheus
+    )
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from opensearch_reindexer.base import BaseMigration
+from opensearch_reindexer.process_pool import TransformPool
+from opensearch_reindexer.progress import ProgressMode
+from tests.unit.conftest import documents, version_num, write_revision
+
+POOL = (
+    'source_index="src", destination_index="dst", language=Language.python, '
+    "batch_size=20, transform_processes=2, transform_chunk_size=5"
+)
+
+
+class Squares:
+    config = None
+
+    def transform_batch(self, docs):
+        if any(doc < 0 for doc in docs):
+            raise ValueError("negative document")
+        return [(doc * doc, os.getpid()) for doc in docs]
+
+
+def test_transform_pool_keeps_order_of_chunks():
+    with TransformPool(Squares(), processes=2, chunk_size=3) as pool:
+        transformed = pool.transform(list(range(10)))
+
+    assert [square for square, _ in transformed] == [n * n for n in range(10)]
+    assert os.getpid() not in {pid for _, pid in transformed}
+
+
+def test_transform_pool_raises_worker_errors():
+    with TransformPool(Squares(), processes=2, chunk_size=3) as pool:
+        with pytest.raises(ValueError, match="negative document"):
+            pool.transform([1, 2, 3, -4])
+
+
+def test_revision_transforms_in_worker_processes(project, fake):
+    fake.load("src", documents(100))
+    write_revision(
+        1,
+        POOL,
+        """
+        def transform_document(self, doc):
+            doc["pid"] = os.getpid()
+            return doc
+        """,
+    )
+
+    BaseMigration().handle_migration(progress=ProgressMode.quiet)
+
+    assert len(fake.indices["dst"]) == 100
+    pids = {doc["pid"] for doc in fake.indices["dst"].values()}
+    assert os.getpid() not in pids
+    assert version_num(fake) == 1
+
+
+def test_revision_fails_on_worker_error(project, fake):
+    fake.load("src", documents(100))
+    write_revision(
+        1,
+        POOL,
+        """
+        def transform_document(self, doc):
+            if doc["n"] == 42:
+                raise ValueError("transform failed")
+            return doc
+        """,
+    )
+
+    with pytest.raises(ValueError, match="transform failed"):
+        BaseMigration().handle_migration(progress=ProgressMode.quiet)
+    assert version_num(fake) == 0
@@ -0,0 +1,19 @@
+from opensearch_reindexer.base import BaseMigration
+from tests.unit.conftest import documents, version_num, write_revision
+
+
+def test_concurrent_revisions_share_progress_display(project, fake):
+    fake.load("src1", documents(50))
+    fake.load("src2", documents(50))
+    write_revision(
+        1, 'source_index="src1", destination_index="dst1", language=Language.python'
+    )
+    write_revision(
+        2, 'source_index="src2", destination_index="dst2", language=Language.python'
+    )
+
+    BaseMigration().handle_migration(concurrency=2)
+
+    assert len(fake.indices["dst1"]) == 50
+    assert len(fake.indices["dst2"]) == 50
+    assert version_num(fake) == 2
@@ -0,0 +1,99 @@
+import pytest
+from opensearchpy import OpenSearch
+
+from opensearch_reindexer.base import BaseMigration
+from opensearch_reindexer.helper import remote_source
+from opensearch_reindexer.progress import ProgressMode
+from tests.unit.conftest import documents, version_num, write_revision
+
+REMOTE = (
+    'reindex_body={"source": {"index": "src", "query": {"term": {"n": 1}}}, '
+    '"dest": {"index": "dst"}}, language=Language.painless, remote=True, '
+    "batch_size=500, task_poll_interval=0.05"
+)
+
+
+def migrate() -> None:
+    BaseMigration().handle_migration(progress=ProgressMode.quiet)
+
+
+def test_remote_source_from_client():
+    client = OpenSearch(
+        hosts=[{"host": "source.example", "port": 9201}],
+        use_ssl=True,
+        http_auth=("user", "secret"),
+        timeout=30,
+    )
+
+    assert remote_source(client) == {
+        "host": "https://source.example:9201",
+        "username": "user",
+        "password": "secret",
+        "socket_timeout": "30s",
+        "connect_timeout": "30s",
+    }
+
+
+def test_remote_source_with_url_prefix_and_string_auth():
+    client = OpenSearch(
+        hosts=[{"host": "source.example", "url_prefix": "/search"}],
+        http_auth="user:secret",
+    )
+
+    assert remote_source(client) == {
+        "host": "http://source.example:9200/search",
+        "username": "user",
+        "password": "secret",
+    }
+
+
+def test_remote_revision_reindexes_from_source_client(project, fake):
+    fake.load("src", documents(10))
+    write_revision(1, REMOTE)
+
+    migrate()
+
+    (request,) = fake.reindex_requests
+    assert request == {
+        "source": {
+            "remote": {"host": fake.url},
+            "size": 500,
+            "index": "src",
+            "query": {"term": {"n": 1}},
+        },
+        "dest": {"index": "dst"},
+    }
+    assert version_num(fake) == 1
+
+
+def test_remote_block_of_reindex_body_is_kept(project, fake):
+    fake.load("src", documents(10))
+    write_revision(
+        1,
+        'reindex_body={"source": {"index": "src", "remote": {"host": "https://other:9200"}}, '
+        '"dest": {"index": "dst"}}, language=Language.painless, remote=True, '
+        "task_poll_interval=0.05",
+    )
+
+    migrate()
+
+    (request,) = fake.reindex_requests
+    assert request["source"]["remote"] == {"host": "https://other:9200"}
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        f"{REMOTE}, slices=2",
+        'source_index="src", destination_index="dst", language=Language.python, remote=True',
+    ],
+)
+def test_remote_rejects_unsupported_options(project, fake, config):
+    fake.load("src", documents(10))
+    write_revision(1, config)
+
+    with pytest.raises(SystemExit):
+        migrate()
+    assert fake.reindex_requests == []
+    assert "dst" not in fake.indices
+    assert version_num(fake) == 0
@@ -0,0 +1,78 @@
+import pytest
+from opensearchpy.exceptions import ConnectionError, ConnectionTimeout, TransportError
+
+from opensearch_reindexer.retry import Retry, is_transient
+
+
+def failing(errors: list):
+    """A function raising ``errors`` one call at a time, then returning "done"."""
+    calls = []
+
+    def function():
+        calls.append(None)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return "done"
+
+    function.calls = calls
+    return function
+
+
+@pytest.mark.parametrize(
+    "error, transient",
+    [
+        (TransportError(429, "es_rejected_execution_exception"), True),
+        (TransportError(503, "unavailable"), True),
+        (TransportError(400, "mapper_parsing_exception"), False),
+        (ConnectionError("N/A", "refused"), True),
+        (ConnectionTimeout("TIMEOUT", "timed out"), False),
+    ],
+)
+def test_is_transient(error, transient):
+    assert is_transient(error) == transient
+
+
+def test_can_retry_up_to_max_retries():
+    retry = Retry(max_retries=2)
+    assert [retry.can_retry(attempt) for attempt in range(4)] == [
+        True,
+        True,
+        False,
+        False,
+    ]
+
+
+def test_backoff_is_jittered_below_exponential_bound():
+    retry = Retry(initial_backoff=0.5, max_backoff=3.0)
+    for attempt, bound in enumerate([0.5, 1.0, 2.0, 3.0, 3.0]):
+        backoffs = [retry.backoff(attempt) for _ in range(200)]
+        assert all(0 <= backoff <= bound for backoff in backoffs)
+        assert len(set(backoffs)) > 1
+
+
+def test_call_retries_transient_errors():
+    reasons = []
+    retry = Retry(initial_backoff=0, on_retry=reasons.append)
+    function = failing([TransportError(429, "rejected"), TransportError(503, "")])
+
+    assert retry.call(function) == "done"
+    assert len(function.calls) == 3
+    assert reasons == ["status 429", "status 503"]
+
+
+def test_call_raises_permanent_errors():
+    retry = Retry(initial_backoff=0)
+    function = failing([TransportError(400, "mapper_parsing_exception")])
+
+    with pytest.raises(TransportError):
+        retry.call(function)
+    assert len(function.calls) == 1
+
+
+def test_call_raises_once_retries_are_exhausted():
+    retry = Retry(max_retries=2, initial_backoff=0)
+    function = failing([TransportError(429, "rejected")] * 3)
+
+    with pytest.raises(TransportError):
+        retry.call(function)
+    assert len(function.calls) == 3
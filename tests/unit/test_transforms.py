@@ -0,0 +1,60 @@
+import json
+
+from opensearch_reindexer.transforms import (
+    Convert,
+    JsonEncode,
+    Remove,
+    Rename,
+    Set,
+    compile_transforms,
+    to_painless,
+)
+
+ESCAPED = {"text": 'line\nbreak\ttab "quoted" back\\slash \x01 \x1f größe'}
+
+
+def test_compiled_json_encode_escapes_like_json_dumps():
+    transform = compile_transforms([JsonEncode("c")])
+
+    assert transform({"c": ESCAPED}) == {
+        "c": json.dumps(ESCAPED, separators=(",", ":"), ensure_ascii=False)
+    }
+    assert transform({"c": ESCAPED})["c"] == (
+        '{"text":"line\\nbreak\\ttab \\"quoted\\" back\\\\slash \\u0001 \\u001f größe"}'
+    )
+
+
+def test_compiled_transforms_with_non_ascii_fields():
+    transform = compile_transforms(
+        [
+            Rename("größe", "maße.größe"),
+            Convert("maße.größe", "integer"),
+            Set("straße", "x"),
+            Remove("ü"),
+        ]
+    )
+
+    assert transform({"größe": "3", "ü": 1}) == {"maße": {"größe": 3}, "straße": "x"}
+
+
+def test_painless_json_encode_escapes_control_characters():
+    source = to_painless([JsonEncode("c")])["source"]
+
+    # quotes, backslashes, the short escapes of json.dumps and other control characters
+    for escape in ("'\\\\\"'", "'\\\\\\\\'", "'\\\\n'", "'\\\\t'", "'\\\\r'"):
+        assert escape in source
+    assert "c < 32" in source
+    assert "jsonString(entry.getKey().toString())" in source
+
+
+def test_painless_field_names_are_literal():
+    script = to_painless(
+        [Rename("größe", "maße.größe"), Remove("it's"), Set("a\\b", "x")]
+    )
+
+    assert "\\u00" not in script["source"]
+    assert "p.containsKey('größe')" in script["source"]
+    assert "ensureParent(ctx._source, ['maße']).put('größe', v)" in script["source"]
+    assert "p.remove('it\\'s')" in script["source"]
+    assert "ctx._source.put('a\\\\b', params.v2)" in script["source"]
+    assert script["params"] == {"v2": "x"}
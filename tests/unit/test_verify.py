@@ -0,0 +1,45 @@
+import pytest
+
+from opensearch_reindexer.base import BaseMigration
+from opensearch_reindexer.progress import ProgressMode
+from tests.unit.conftest import documents, version_num, write_revision
+
+LEAVES_OUT = """
+def transform_hit(self, hit):
+    if hit["_source"]["n"] == 4:
+        raise ValueError("transform failed")
+    return None if hit["_source"]["n"] % 2 else hit
+"""
+
+
+@pytest.mark.parametrize("mode", ["count", "full"])
+def test_verification_accounts_for_skipped_and_set_aside_documents(project, fake, mode):
+    fake.load("src", documents(20))
+    write_revision(
+        1,
+        'source_index="src", destination_index="dst", language=Language.python, '
+        f'dead_letter="dead-letter.jsonl", verify=Verification.{mode}',
+        LEAVES_OUT,
+    )
+
+    BaseMigration().handle_migration(progress=ProgressMode.quiet)
+
+    assert len(fake.indices["dst"]) == 9
+    assert version_num(fake) == 1
+
+
+def test_count_verification_fails_on_missing_documents(project, fake):
+    fake.load("src", documents(20))
+    write_revision(
+        1,
+        'source_index="src", destination_index="dst", language=Language.python, '
+        "verify=Verification.count",
+        """
+        def after_revision(self):
+            self.destination_client.delete(index="dst", id="0")
+        """,
+    )
+
+    with pytest.raises(SystemExit):
+        BaseMigration().handle_migration(progress=ProgressMode.quiet)
+    assert version_num(fake) == 0
@@ -0,0 +1,115 @@
+import pytest
+from opensearchpy import OpenSearch
+from opensearchpy.helpers import BulkIndexError
+
+from opensearch_reindexer.retry import Retry
+from opensearch_reindexer.writer import AdaptiveBatchSize, BulkWriter
+
+
+def actions(start: int, count: int) -> list:
+    return [
+        {"_op_type": "index", "_id": str(n), "_source": {"n": n, "text": "x" * 50}}
+        for n in range(start, start + count)
+    ]
+
+
+def adaptive_writer(fake, requests: list, **kwargs) -> BulkWriter:
+    return BulkWriter(
+        OpenSearch(hosts=[fake.url]),
+        "dst",
+        # requests of 4KB, which don't grow
+        batch_size=AdaptiveBatchSize(4096, target_latency=60.0, min_bytes=4096),
+        on_request=lambda docs, bytes, seconds: requests.append((docs, bytes)),
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_adaptive_bulk_combines_small_writes(fake, concurrency):
+    requests, responses = [], []
+    with adaptive_writer(fake, requests, concurrency=concurrency) as writer:
+        for start in range(0, 100, 5):
+            writer.write(
+                actions(start, 5), lambda *response: responses.append(response)
+            )
+
+    assert len(fake.indices["dst"]) == 100
+    assert responses == [(5, [])] * 20
+    assert len(requests) < 20
+    assert all(bytes <= 4096 for _, bytes in requests)
+
+
+def test_adaptive_bulk_splits_large_writes(fake):
+    requests, responses = [], []
+    with adaptive_writer(fake, requests) as writer:
+        writer.write(actions(0, 100), lambda *response: responses.append(response))
+
+    assert len(fake.indices["dst"]) == 100
+    assert responses == [(100, [])]
+    assert len(requests) > 1
+    assert sum(docs for docs, _ in requests) == 100
+
+
+def test_rejected_documents_are_sent_again(fake):
+    fake.rejection_rate = 0.3
+    requests, retries = [], []
+    with BulkWriter(
+        OpenSearch(hosts=[fake.url]),
+        "dst",
+        retry=Retry(initial_backoff=0),
+        on_request=lambda docs, bytes, seconds: requests.append(docs),
+        on_retry=retries.append,
+    ) as writer:
+        writer.write(actions(0, 100))
+
+    assert len(fake.indices["dst"]) == 100
+    assert fake.rejections > 0
+    # only the documents rejected by a request are sent in the next one
+    assert requests == [100] + retries
+    assert sum(retries) == fake.rejections
+
+
+def test_permanent_failures_are_passed_to_on_failure(fake):
+    fake.failing = {"3", "7"}
+    failures, retries = [], []
+    with BulkWriter(
+        OpenSearch(hosts=[fake.url]),
+        "dst",
+        retry=Retry(initial_backoff=0),
+        on_retry=retries.append,
+        on_failure=lambda action, source, error: failures.append(
+            (action["index"]["_id"], source["n"], error["status"])
+        ),
+    ) as writer:
+        writer.write(actions(0, 10))
+
+    assert sorted(failures) == [("3", 3, 400), ("7", 7, 400)]
+    assert retries == []
+    assert len(fake.indices["dst"]) == 8
+
+
+def test_permanent_failures_raise_without_on_failure(fake):
+    fake.failing = {"3"}
+    writer = BulkWriter(OpenSearch(hosts=[fake.url]), "dst")
+    with pytest.raises(BulkIndexError) as raised:
+        with writer:
+            writer.write(actions(0, 10))
+
+    ((error,),) = [item.values() for item in raised.value.errors]
+    assert error["_id"] == "3"
+    assert error["data"]["n"] == 3
+
+
+def test_write_returns_size_in_bytes(fake):
+    docs = [{"_id": str(n), "_source": {"text": "é" * 50}} for n in range(10)]
+    requests = []
+    with BulkWriter(
+        OpenSearch(hosts=[fake.url]),
+        "dst",
+        on_request=lambda docs, bytes, seconds: requests.append(bytes),
+    ) as writer:
+        size = writer.write(docs)
+
+    # "é" is 2 bytes in UTF-8
+    assert size == requests[0] > 10 * 100
+    assert fake.indices["dst"]["0"] == {"text": "é" * 50}